@@ -4,10 +4,22 @@ from typing import Any
 import os
 import json
 
-__all__ = ["initialize_custom_smg2_adapter_maker"]
+__all__ = ["initialize_custom_smg2_adapter_maker", "export_adapter_maker", "import_adapter_maker"]
 
 
 __CONFIG_FILE_NAME__ = "adapter_config.json"
+__ADAPTER_MAKER_FIELDS__ = [
+    "FONT_COLORS",
+    "FONT_SIZES",
+    "RACE_TIMES",
+    "PICTURE_NAMES",
+    "PICTURE_CODES",
+    "MESSAGE_SOUNDS",
+    "TALK_TYPES",
+    "BALLOON_TYPES",
+    "CAMERA_TYPES",
+    "POOL_COMMENTS"
+]
 
 
 def initialize_custom_smg2_adapter_maker() -> type[SuperMarioGalaxy2Adapter]:
@@ -17,9 +29,7 @@ def initialize_custom_smg2_adapter_maker() -> type[SuperMarioGalaxy2Adapter]:
 
     :return: a copy of the SMG2 adapter class.
     """
-    adapter_maker: type[SuperMarioGalaxy2Adapter] = type("CustomSuperMarioGalaxy2Adapter",
-                                                         tuple([SuperMarioGalaxy2Adapter]),
-                                                         dict(SuperMarioGalaxy2Adapter.__dict__))
+    adapter_maker = _copy_smg2_adapter_maker_()
     config_data: dict[str, Any] | None = None
 
     # Try to load config data from file
@@ -38,7 +48,8 @@ def initialize_custom_smg2_adapter_maker() -> type[SuperMarioGalaxy2Adapter]:
             "message_sounds": adapter_maker.MESSAGE_SOUNDS,
             "talk_types": adapter_maker.TALK_TYPES,
             "balloon_types": adapter_maker.BALLOON_TYPES,
-            "camera_types": adapter_maker.CAMERA_TYPES
+            "camera_types": adapter_maker.CAMERA_TYPES,
+            "pool_comments": adapter_maker.POOL_COMMENTS
         }
 
         with open(__CONFIG_FILE_NAME__, "w", encoding="utf-8-sig") as f:
@@ -58,6 +69,7 @@ def initialize_custom_smg2_adapter_maker() -> type[SuperMarioGalaxy2Adapter]:
     _check_list_and_elements_type_(config_data, "talk_types", str)
     _check_list_and_elements_type_(config_data, "balloon_types", str)
     _check_list_and_elements_type_(config_data, "camera_types", str)
+    _check_element_type_(config_data, "pool_comments", bool)
 
     # Overwrite adapter maker's lists
     if "font_colors" in config_data:
@@ -87,9 +99,53 @@ def initialize_custom_smg2_adapter_maker() -> type[SuperMarioGalaxy2Adapter]:
     if "camera_types" in config_data:
         adapter_maker.CAMERA_TYPES = config_data["camera_types"]
 
+    if "pool_comments" in config_data:
+        adapter_maker.POOL_COMMENTS = config_data["pool_comments"]
+
+    adapter_maker.compile_tag_tables()
+    return adapter_maker
+
+
+def export_adapter_maker(adapter_maker: type[SuperMarioGalaxy2Adapter]) -> dict[str, Any]:
+    """
+    Collects the configurable name lists of the given adapter maker. Unlike custom adapter makers, the result can be
+    pickled, so it can be passed to worker processes and turned back into an adapter maker there.
+
+    :param adapter_maker: the adapter maker.
+    :return: the adapter maker's configurable lists.
+    """
+    return {field: getattr(adapter_maker, field) for field in __ADAPTER_MAKER_FIELDS__}
+
+
+def import_adapter_maker(adapter_data: dict[str, Any]) -> type[SuperMarioGalaxy2Adapter]:
+    """
+    Creates a copy of the SMG2 adapter class using the lists collected by ``export_adapter_maker``.
+
+    :param adapter_data: the adapter maker's configurable lists.
+    :return: a copy of the SMG2 adapter class.
+    """
+    adapter_maker = _copy_smg2_adapter_maker_()
+
+    for field, value in adapter_data.items():
+        setattr(adapter_maker, field, value)
+
+    adapter_maker.compile_tag_tables()
     return adapter_maker
 
 
+def _copy_smg2_adapter_maker_() -> type[SuperMarioGalaxy2Adapter]:
+    return type("CustomSuperMarioGalaxy2Adapter", tuple([SuperMarioGalaxy2Adapter]),
+                dict(SuperMarioGalaxy2Adapter.__dict__))
+
+
+def _check_element_type_(config_data: dict, key: str, element_type: type):
+    if key not in config_data:
+        return
+
+    if type(config_data[key]) != element_type:
+        raise SyntaxError(f"Config entry '{key}' is not of type '{str(element_type)}'")
+
+
 def _check_list_and_elements_type_(config_data: dict, key: str, element_type: type):
     if key not in config_data:
         return
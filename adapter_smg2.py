@@ -1,9 +1,19 @@
 from __future__ import annotations
 from pymsb import LMSAdapter, LMSException, BinaryMemoryIO
+from msbttext import split_tag
 import io
+import struct
+import weakref
 
 __all__ = ["SuperMarioGalaxy2Adapter"]
 
+# SMG2 text files are always big-endian
+_TAG_HEADER_STRUCT_ = struct.Struct(">3H")  # Group ID, tag ID, data size
+_U16_STRUCT_ = struct.Struct(">H")
+_U16_PAIR_STRUCT_ = struct.Struct(">2H")
+_NUMBER_TAG_STRUCT_ = struct.Struct(">iI")  # Default value, argument index
+_STRING_TAG_STRUCT_ = struct.Struct(">2I")  # Default pointer, argument index
+
 
 class SuperMarioGalaxy2Adapter(LMSAdapter):
     """
@@ -13,6 +23,23 @@ class SuperMarioGalaxy2Adapter(LMSAdapter):
         super(SuperMarioGalaxy2Adapter, self).__init__()
         self.charset = "utf-16-be"
         self.set_big_endian()
+        # Offsets of the comments written to every attributes section, dropped together with the section's stream
+        self._comment_pools_: weakref.WeakKeyDictionary[BinaryMemoryIO, dict[str, int]] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def compile_tag_tables(cls):
+        """
+        Builds the lookup tables that are used to encode and decode tags from the class's name lists. This has to be
+        called again whenever the name lists of the class are replaced.
+        """
+        cls._font_color_ids_ = _create_name_ids_(cls.FONT_COLORS)
+        cls._font_size_ids_ = _create_name_ids_(cls.FONT_SIZES)
+        cls._race_time_ids_ = _create_name_ids_(cls.RACE_TIMES)
+        cls._picture_ids_ = _create_name_ids_(cls.PICTURE_NAMES)
+        cls._color_tags_ = [f"[color:{name}]" for name in cls.FONT_COLORS]
+        cls._size_tags_ = [f"[size:{name}]" for name in cls.FONT_SIZES]
+        cls._race_tags_ = [f"[race:{name}]" for name in cls.RACE_TIMES]
+        cls._picture_tags_ = [f"[icon:{name}]" for name in cls.PICTURE_NAMES]
 
     def use_fixed_buckets(self):
         return True
@@ -25,327 +52,360 @@ class SuperMarioGalaxy2Adapter(LMSAdapter):
 
     def read_tag(self, stream: BinaryMemoryIO):
         tag_position = stream.tell()
-        group_id = stream.read_u16()
-        tag_id = stream.read_u16()
-        len_data = stream.read_u16()
+        group_id, tag_id, len_data = _TAG_HEADER_STRUCT_.unpack(stream.read(6))
 
-        # System
-        if group_id == 0:
-            if tag_id == 0:
-                len_kanji = stream.read_u16()
-                len_furigana = stream.read_u16()
+        if (group_id, tag_id) in self._TAG_READERS_:
+            return self._TAG_READERS_[(group_id, tag_id)](self, stream, tag_id, len_data, tag_position)
+        if group_id in self._TAG_GROUP_READERS_:
+            return self._TAG_GROUP_READERS_[group_id](self, stream, tag_id, len_data, tag_position)
 
-                try:
-                    furigana = stream.read(len_furigana).decode(self.charset)
-                    kanji = stream.read(len_kanji).decode(self.charset)
-                except:
-                    raise LMSException(f"Couldn't decode ruby characters (tag at 0x{tag_position})")
+        data = stream.read(len_data)
+        return f"[{group_id}:{tag_id};{data.hex()}]"
 
-                return f'[ruby:{kanji};{furigana}]'
+    # System
+    def _read_tag_ruby_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        len_kanji, len_furigana = _U16_PAIR_STRUCT_.unpack(stream.read(4))
 
-            if tag_id == 3:
-                if len_data != 2:
-                    raise LMSException(f"Color tag length should be 2 (tag at 0x{tag_position})")
+        try:
+            furigana = stream.read(len_furigana).decode(self.charset)
+            kanji = stream.read(len_kanji).decode(self.charset)
+        except:
+            raise LMSException(f"Couldn't decode ruby characters (tag at 0x{tag_position})")
 
-                color_id = stream.read_u16()
+        return f'[ruby:{kanji};{furigana}]'
 
-                if color_id == 0xFFFF:
-                    return '[defcolor]'
+    def _read_tag_color_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 2:
+            raise LMSException(f"Color tag length should be 2 (tag at 0x{tag_position})")
 
-                if 0 <= color_id < len(self.FONT_COLORS):
-                    return f'[color:{self.FONT_COLORS[color_id]}]'
+        color_id = _U16_STRUCT_.unpack(stream.read(2))[0]
 
-                raise LMSException(f"Illegal Color tag color ID: {color_id} (tag at 0x{tag_position})")
+        if color_id == 0xFFFF:
+            return '[defcolor]'
 
-        # Display
-        elif group_id == 1:
-            if tag_id == 0:
-                if len_data != 2:
-                    raise LMSException(f"Wait tag length should be 2 (tag at 0x{tag_position})")
+        if color_id < len(self._color_tags_):
+            return self._color_tags_[color_id]
 
-                wait_time = stream.read_u16()
-                return f'[delay:{wait_time}]'
-            elif tag_id == 1:
-                if len_data != 0:
-                    raise LMSException(f"Page break tag length should be 0 (tag at 0x{tag_position})")
+        raise LMSException(f"Illegal Color tag color ID: {color_id} (tag at 0x{tag_position})")
 
-                return '[pagebreak]'
-            elif tag_id == 2:
-                if len_data != 0:
-                    raise LMSException(f"Offset page tag length should be 0 (tag at 0x{tag_position})")
+    # Display
+    def _read_tag_delay_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 2:
+            raise LMSException(f"Wait tag length should be 2 (tag at 0x{tag_position})")
 
-                return '[ycenter]'
-            elif tag_id == 3:
-                if len_data != 0:
-                    raise LMSException(f"Center page tag length should be 0 (tag at 0x{tag_position})")
+        wait_time = _U16_STRUCT_.unpack(stream.read(2))[0]
+        return f'[delay:{wait_time}]'
 
-                return '[xcenter]'
+    def _read_tag_pagebreak_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 0:
+            raise LMSException(f"Page break tag length should be 0 (tag at 0x{tag_position})")
 
-        # Sound
-        elif group_id == 2:
-            if len_data < 2:
-                raise LMSException(f"Minimum Sound tag length should be 2 (tag at 0x{tag_position})")
+        return '[pagebreak]'
 
-            len_sound = stream.read_u16()
-            raw_sound = stream.read(len_sound)
-            sound_name = raw_sound.decode(self.charset)
+    def _read_tag_ycenter_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 0:
+            raise LMSException(f"Offset page tag length should be 0 (tag at 0x{tag_position})")
 
-            return f'[sound:{sound_name}]'
+        return '[ycenter]'
 
-        # Picture
-        elif group_id == 3:
-            if len_data != 2:
-                raise LMSException(f"Picture group tag length should be 2 (tag at 0x{tag_position})")
+    def _read_tag_xcenter_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 0:
+            raise LMSException(f"Center page tag length should be 0 (tag at 0x{tag_position})")
 
-            picture_offset = stream.read_u16()
+        return '[xcenter]'
 
-            if 0 <= tag_id < len(self.PICTURE_NAMES):
-                return f'[icon:{self.PICTURE_NAMES[tag_id]}]'
+    # Sound
+    def _read_tag_sound_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data < 2:
+            raise LMSException(f"Minimum Sound tag length should be 2 (tag at 0x{tag_position})")
 
-            raise LMSException(f"Illegal Picture group tag ID: {tag_id} (tag at 0x{tag_position})")
+        len_sound = _U16_STRUCT_.unpack(stream.read(2))[0]
+        sound_name = stream.read(len_sound).decode(self.charset)
+        return f'[sound:{sound_name}]'
 
-        # FontSize
-        elif group_id == 4:
-            if len_data != 0:
-                raise LMSException(f"FontSize group tag length should be 0 (tag at 0x{tag_position})")
+    # Picture
+    def _read_tag_icon_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 2:
+            raise LMSException(f"Picture group tag length should be 2 (tag at 0x{tag_position})")
 
-            if 0 <= tag_id < len(self.FONT_SIZES):
-                return f'[size:{self.FONT_SIZES[tag_id]}]'
+        stream.read(2)  # Picture code, derived from the tag ID
 
-            raise LMSException(f"Illegal FontSize group tag ID: {tag_id} (tag at 0x{tag_position})")
+        if tag_id < len(self._picture_tags_):
+            return self._picture_tags_[tag_id]
 
-        # Localize
-        elif group_id == 5:
-            if len_data != 2:
-                raise LMSException(f"Localize group tag length should be 2 (tag at 0x{tag_position})")
+        raise LMSException(f"Illegal Picture group tag ID: {tag_id} (tag at 0x{tag_position})")
 
-            if tag_id == 0:
-                preset_type = stream.read_u8()
-                unknown_arg = stream.read_u8()
-                return f'[player:{preset_type}]'
+    # FontSize
+    def _read_tag_size_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 0:
+            raise LMSException(f"FontSize group tag length should be 0 (tag at 0x{tag_position})")
 
-            raise LMSException(f"Illegal Localize group tag ID: {tag_id} (tag at 0x{tag_position})")
+        if tag_id < len(self._size_tags_):
+            return self._size_tags_[tag_id]
 
-        # Number
-        elif group_id == 6:
-            if len_data != 8:
-                raise LMSException(f"Number group tag length should be 8 (tag at 0x{tag_position})")
+        raise LMSException(f"Illegal FontSize group tag ID: {tag_id} (tag at 0x{tag_position})")
 
-            default_value = stream.read_s32()
-            va_arg_idx = stream.read_u32()
-            return f'[intvar:{tag_id};{va_arg_idx};{default_value}]'
+    # Localize
+    def _read_tag_player_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 2:
+            raise LMSException(f"Localize group tag length should be 2 (tag at 0x{tag_position})")
 
-        # String
-        elif group_id == 7:
-            if len_data != 8:
-                raise LMSException(f"String group tag length should be 8 (tag at 0x{tag_position})")
+        if tag_id == 0:
+            preset_type = stream.read(2)[0]  # Second byte is unused
+            return f'[player:{preset_type}]'
 
-            unknown_arg_1 = stream.read_u32()
-            va_arg_idx = stream.read_u32()
-            return f'[stringvar:{tag_id};{va_arg_idx};0x{unknown_arg_1:08X}]'
+        raise LMSException(f"Illegal Localize group tag ID: {tag_id} (tag at 0x{tag_position})")
 
-        # RaceTime
-        elif group_id == 9:
-            if len_data != 0:
-                raise LMSException(f"RaceTime group tag length should be 0 (tag at 0x{tag_position})")
+    # Number
+    def _read_tag_intvar_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 8:
+            raise LMSException(f"Number group tag length should be 8 (tag at 0x{tag_position})")
 
-            if 0 <= tag_id < len(self.RACE_TIMES):
-                return f'[race:{self.RACE_TIMES[tag_id]}]'
+        default_value, va_arg_idx = _NUMBER_TAG_STRUCT_.unpack(stream.read(8))
+        return f'[intvar:{tag_id};{va_arg_idx};{default_value}]'
 
-            raise LMSException(f"Illegal RaceTime group tag ID: {tag_id} (tag at 0x{tag_position})")
+    # String
+    def _read_tag_stringvar_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 8:
+            raise LMSException(f"String group tag length should be 8 (tag at 0x{tag_position})")
 
-        # Font
-        elif group_id == 10:
-            if len_data < 2:
-                raise LMSException(f"Minimum Sound tag length should be 2 (tag at 0x{tag_position})")
+        unknown_arg_1, va_arg_idx = _STRING_TAG_STRUCT_.unpack(stream.read(8))
+        return f'[stringvar:{tag_id};{va_arg_idx};0x{unknown_arg_1:08X}]'
 
-            len_sound = stream.read_u16()
-            raw_sound = stream.read(len_sound)
-            sound_name = raw_sound.decode(self.charset)
+    # RaceTime
+    def _read_tag_race_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data != 0:
+            raise LMSException(f"RaceTime group tag length should be 0 (tag at 0x{tag_position})")
 
-            return f'[numberfont:{sound_name}]'
+        if tag_id < len(self._race_tags_):
+            return self._race_tags_[tag_id]
 
-        data = stream.read(len_data)
-        return f"[{group_id}:{tag_id};{data.hex()}]"
+        raise LMSException(f"Illegal RaceTime group tag ID: {tag_id} (tag at 0x{tag_position})")
+
+    # Font
+    def _read_tag_numberfont_(self, stream: BinaryMemoryIO, tag_id: int, len_data: int, tag_position: int) -> str:
+        if len_data < 2:
+            raise LMSException(f"Minimum Sound tag length should be 2 (tag at 0x{tag_position})")
+
+        len_text = _U16_STRUCT_.unpack(stream.read(2))[0]
+        number_text = stream.read(len_text).decode(self.charset)
+        return f'[numberfont:{number_text}]'
+
+    _TAG_READERS_ = {
+        (0, 0): _read_tag_ruby_,
+        (0, 3): _read_tag_color_,
+        (1, 0): _read_tag_delay_,
+        (1, 1): _read_tag_pagebreak_,
+        (1, 2): _read_tag_ycenter_,
+        (1, 3): _read_tag_xcenter_
+    }
+
+    _TAG_GROUP_READERS_ = {
+        2: _read_tag_sound_,
+        3: _read_tag_icon_,
+        4: _read_tag_size_,
+        5: _read_tag_player_,
+        6: _read_tag_intvar_,
+        7: _read_tag_stringvar_,
+        9: _read_tag_race_,
+        10: _read_tag_numberfont_
+    }
 
     # ------------------------------------------------------------------------------------------------------------------
 
     def write_tag(self, stream: BinaryMemoryIO, tag: str):
-        if tag.find(":") >= 0:
-            tag_name, tag_attrs = tag.split(":", 1)
-            tag_name = tag_name.strip()
-            tag_attrs = tag_attrs.strip().split(";")
-        else:
-            tag_name = tag.strip()
-            tag_attrs = ()
+        tag_name, tag_attrs = split_tag(tag)
 
         if tag_name == "":
             raise LMSException("Empty tag found!")
 
-        # System
-        if tag_name == "ruby":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 2, tag)
+        if tag_name in self._TAG_WRITERS_:
+            self._TAG_WRITERS_[tag_name](self, stream, tag_name, tag_attrs, tag)
+        else:
+            self._write_tag_arbitrary_(stream, tag_name, tag_attrs, tag)
+
+    # System
+    def _write_tag_ruby_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 2, tag)
 
-            try:
-                encoded_kanji = tag_attrs[0].encode(self.charset)
-                encoded_furigana = tag_attrs[1].encode(self.charset)
-            except Exception:
-                raise LMSException(f"Couldn't write ruby tag. Full tag was '{tag}'")
+        try:
+            encoded_kanji = tag_attrs[0].encode(self.charset)
+            encoded_furigana = tag_attrs[1].encode(self.charset)
+        except Exception:
+            raise LMSException(f"Couldn't write ruby tag. Full tag was '{tag}'")
 
-            data_size = 4 + len(encoded_furigana)
+        data_size = 4 + len(encoded_furigana)
 
-            self._write_tag_info_(stream, 0, 0, data_size)
-            stream.write_u16(len(encoded_kanji))
-            stream.write_u16(len(encoded_furigana))
-            stream.write(encoded_furigana)
-            stream.write(encoded_kanji)
+        self._write_tag_info_(stream, 0, 0, data_size)
+        stream.write_u16(len(encoded_kanji))
+        stream.write_u16(len(encoded_furigana))
+        stream.write(encoded_furigana)
+        stream.write(encoded_kanji)
 
-        elif tag_name == "defcolor":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
-            self._write_tag_info_(stream, 0, 3, 2)
-            stream.write_u16(0xFFFF)
+    def _write_tag_defcolor_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
+        self._write_tag_info_(stream, 0, 3, 2)
+        stream.write_u16(0xFFFF)
 
-        elif tag_name == "color":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
-            color_name = tag_attrs[0]
+    def _write_tag_color_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        color_name = tag_attrs[0]
 
-            if color_name in self.FONT_COLORS:
-                color_id = self.FONT_COLORS.index(color_name)
-            else:
-                raise LMSException(f"Invalid text color '{color_name}', full tag was '{tag}'")
+        if color_name in self._font_color_ids_:
+            color_id = self._font_color_ids_[color_name]
+        else:
+            raise LMSException(f"Invalid text color '{color_name}', full tag was '{tag}'")
 
-            self._write_tag_info_(stream, 0, 3, 2)
-            stream.write_u16(color_id)
+        self._write_tag_info_(stream, 0, 3, 2)
+        stream.write_u16(color_id)
 
-        # Display
-        elif tag_name == "delay":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
-            wait_time = self._get_tag_attr_u16_(tag_attrs[0], tag)
+    # Display
+    def _write_tag_delay_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        wait_time = self._get_tag_attr_u16_(tag_attrs[0], tag)
 
-            self._write_tag_info_(stream, 1, 0, 2)
-            stream.write_u16(wait_time)
+        self._write_tag_info_(stream, 1, 0, 2)
+        stream.write_u16(wait_time)
 
-        elif tag_name == "pagebreak":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
-            self._write_tag_info_(stream, 1, 1, 0)
+    def _write_tag_pagebreak_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
+        self._write_tag_info_(stream, 1, 1, 0)
 
-        elif tag_name == "ycenter":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
-            self._write_tag_info_(stream, 1, 2, 0)
+    def _write_tag_ycenter_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
+        self._write_tag_info_(stream, 1, 2, 0)
 
-        elif tag_name == "xcenter":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
-            self._write_tag_info_(stream, 1, 3, 0)
+    def _write_tag_xcenter_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
+        self._write_tag_info_(stream, 1, 3, 0)
 
-        # Sound
-        elif tag_name == "sound":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
-            sound_name = tag_attrs[0]
-            encoded_name = sound_name.encode(self.charset)
-            encoded_len = len(encoded_name)
+    # Sound
+    def _write_tag_sound_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        sound_name = tag_attrs[0]
+        encoded_name = sound_name.encode(self.charset)
+        encoded_len = len(encoded_name)
 
-            self._write_tag_info_(stream, 2, 0, 2 + encoded_len)
-            stream.write_u16(encoded_len)
-            stream.write(encoded_name)
+        self._write_tag_info_(stream, 2, 0, 2 + encoded_len)
+        stream.write_u16(encoded_len)
+        stream.write(encoded_name)
 
-        # Picture
-        elif tag_name == "icon":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
-            icon_name = tag_attrs[0]
+    # Picture
+    def _write_tag_icon_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        icon_name = tag_attrs[0]
 
-            if icon_name in self.PICTURE_NAMES:
-                tag_id = self.PICTURE_NAMES.index(icon_name)
-            else:
-                raise LMSException(f"Invalid icon name '{icon_name}', full tag was '{tag}'")
+        if icon_name in self._picture_ids_:
+            tag_id = self._picture_ids_[icon_name]
+        else:
+            raise LMSException(f"Invalid icon name '{icon_name}', full tag was '{tag}'")
 
-            self._write_tag_info_(stream, 3, tag_id, 2)
-            stream.write_u16(self.PICTURE_CODES[tag_id])
+        self._write_tag_info_(stream, 3, tag_id, 2)
+        stream.write_u16(self.PICTURE_CODES[tag_id])
 
-        # FontSize
-        elif tag_name == "size":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
-            size_name = tag_attrs[0]
+    # FontSize
+    def _write_tag_size_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        size_name = tag_attrs[0]
 
-            if size_name in self.FONT_SIZES:
-                tag_id = self.FONT_SIZES.index(size_name)
-            else:
-                raise LMSException(f"Invalid font size '{size_name}', full tag was '{tag}'")
-
-            self._write_tag_info_(stream, 4, tag_id, 0)
-
-        # Localize
-        elif tag_name == "player":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
-            preset_type = self._get_tag_attr_u8_(tag_attrs[0], tag)
-
-            self._write_tag_info_(stream, 5, 0, 2)
-            stream.write_u8(preset_type)
-            stream.write_u8(0xCD)
-
-        # Number
-        elif tag_name == "intvar":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 3, tag)
-            tag_id = self._get_tag_attr_u16_(tag_attrs[0], tag)
-            va_arg_idx = self._get_tag_attr_u32_(tag_attrs[1], tag)
-            def_val = self._get_tag_attr_s32_(tag_attrs[2], tag)
-
-            self._write_tag_info_(stream, 6, tag_id, 8)
-            stream.write_u32(def_val)
-            stream.write_u32(va_arg_idx)
-
-        # String
-        elif tag_name == "stringvar":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 3, tag)
-            tag_id = self._get_tag_attr_u16_(tag_attrs[0], tag)
-            va_arg_idx = self._get_tag_attr_u32_(tag_attrs[1], tag)
-            def_ptr = self._get_tag_attr_u32_(tag_attrs[2], tag)
-
-            self._write_tag_info_(stream, 7, tag_id, 8)
-            stream.write_u32(def_ptr)
-            stream.write_u32(va_arg_idx)
-
-        # RaceTime
-        elif tag_name == "race":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
-            race_name = tag_attrs[0]
-
-            if race_name in self.RACE_TIMES:
-                tag_id = self.RACE_TIMES.index(race_name)
-            else:
-                raise LMSException(f"Invalid race name '{race_name}', full tag was '{tag}'")
+        if size_name in self._font_size_ids_:
+            tag_id = self._font_size_ids_[size_name]
+        else:
+            raise LMSException(f"Invalid font size '{size_name}', full tag was '{tag}'")
+
+        self._write_tag_info_(stream, 4, tag_id, 0)
+
+    # Localize
+    def _write_tag_player_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        preset_type = self._get_tag_attr_u8_(tag_attrs[0], tag)
+
+        self._write_tag_info_(stream, 5, 0, 2)
+        stream.write_u8(preset_type)
+        stream.write_u8(0xCD)
+
+    # Number
+    def _write_tag_intvar_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 3, tag)
+        tag_id = self._get_tag_attr_u16_(tag_attrs[0], tag)
+        va_arg_idx = self._get_tag_attr_u32_(tag_attrs[1], tag)
+        def_val = self._get_tag_attr_s32_(tag_attrs[2], tag)
+
+        self._write_tag_info_(stream, 6, tag_id, 8)
+        stream.write_u32(def_val)
+        stream.write_u32(va_arg_idx)
+
+    # String
+    def _write_tag_stringvar_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 3, tag)
+        tag_id = self._get_tag_attr_u16_(tag_attrs[0], tag)
+        va_arg_idx = self._get_tag_attr_u32_(tag_attrs[1], tag)
+        def_ptr = self._get_tag_attr_u32_(tag_attrs[2], tag)
+
+        self._write_tag_info_(stream, 7, tag_id, 8)
+        stream.write_u32(def_ptr)
+        stream.write_u32(va_arg_idx)
+
+    # RaceTime
+    def _write_tag_race_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        race_name = tag_attrs[0]
+
+        if race_name in self._race_time_ids_:
+            tag_id = self._race_time_ids_[race_name]
+        else:
+            raise LMSException(f"Invalid race name '{race_name}', full tag was '{tag}'")
 
-            self._write_tag_info_(stream, 9, tag_id, 0)
+        self._write_tag_info_(stream, 9, tag_id, 0)
 
-        # Font
-        elif tag_name == "numberfont":
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
-            number_text = tag_attrs[0]
+    # Font
+    def _write_tag_numberfont_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        number_text = tag_attrs[0]
 
-            encoded_text = number_text.encode(self.charset)
-            encoded_len = len(encoded_text)
+        encoded_text = number_text.encode(self.charset)
+        encoded_len = len(encoded_text)
 
-            self._write_tag_info_(stream, 10, 0, 2 + encoded_len)
-            stream.write_u16(encoded_len)
-            stream.write(encoded_text)
+        self._write_tag_info_(stream, 10, 0, 2 + encoded_len)
+        stream.write_u16(encoded_len)
+        stream.write(encoded_text)
+
+    def _write_tag_arbitrary_(self, stream: BinaryMemoryIO, tag_name: str, tag_attrs: tuple[str, ...], tag: str):
+        self._verify_tag_attr_size_(tag_name, tag_attrs, 2, tag)
+        tag_id = self._get_tag_attr_u16_(tag_name, tag)
+        group_id = self._get_tag_attr_u16_(tag_attrs[0], tag)
+
+        try:
+            data = bytes.fromhex(tag_attrs[1])
+            len_data = len(data)
+        except Exception:
+            raise LMSException(f"Couldn't write arbitrary tag. Full tag was '{tag}'")
 
+        if len_data & 1:
+            self._write_tag_info_(stream, tag_id, group_id, len_data + 1)
+            stream.write(data)
+            stream.write_u8(0)
         else:
-            self._verify_tag_attr_size_(tag_name, tag_attrs, 2, tag)
-            tag_id = self._get_tag_attr_u16_(tag_name, tag)
-            group_id = self._get_tag_attr_u16_(tag_attrs[0], tag)
-
-            try:
-                data = bytes.fromhex(tag_attrs[1])
-                len_data = len(data)
-            except Exception:
-                raise LMSException(f"Couldn't write arbitrary tag. Full tag was '{tag}'")
-
-            if len_data & 1:
-                self._write_tag_info_(stream, tag_id, group_id, len_data + 1)
-                stream.write(data)
-                stream.write_u8(0)
-            else:
-                self._write_tag_info_(stream, tag_id, group_id, len(data))
-                stream.write(data)
+            self._write_tag_info_(stream, tag_id, group_id, len(data))
+            stream.write(data)
+
+    _TAG_WRITERS_ = {
+        "ruby": _write_tag_ruby_,
+        "defcolor": _write_tag_defcolor_,
+        "color": _write_tag_color_,
+        "delay": _write_tag_delay_,
+        "pagebreak": _write_tag_pagebreak_,
+        "ycenter": _write_tag_ycenter_,
+        "xcenter": _write_tag_xcenter_,
+        "sound": _write_tag_sound_,
+        "icon": _write_tag_icon_,
+        "size": _write_tag_size_,
+        "player": _write_tag_player_,
+        "intvar": _write_tag_intvar_,
+        "stringvar": _write_tag_stringvar_,
+        "race": _write_tag_race_,
+        "numberfont": _write_tag_numberfont_
+    }
 
     def _write_tag_info_(self, stream: BinaryMemoryIO, group_id: int, tag_id: int, data_size: int):
         self.write_chars(stream, "\u000E")
@@ -430,16 +490,7 @@ class SuperMarioGalaxy2Adapter(LMSAdapter):
         off_comment = stream.read_u32()
 
         # Read comment string
-        stream.seek(root_offset + off_comment)
-        comment = ""
-
-        while root_offset < end_offset:
-            ch = self.read_char(stream)
-
-            if ch == "\0":
-                break
-            else:
-                comment += ch
+        comment = self._read_comment_(stream, root_offset + off_comment, end_offset)
 
         # Pack and return result
         return {
@@ -453,6 +504,44 @@ class SuperMarioGalaxy2Adapter(LMSAdapter):
             "comment": comment
         }
 
+    def _read_comment_(self, stream: BinaryMemoryIO, comment_offset: int, end_offset: int) -> str:
+        if comment_offset >= end_offset:
+            raise LMSException(f"Comment at 0x{comment_offset:X} starts outside of the attributes section ending at "
+                               f"0x{end_offset:X}")
+
+        # Read growing chunks until the NUL terminator is found, which has to start at an even position
+        stream.seek(comment_offset)
+        raw_comment = bytearray()
+        chunk_size = 64
+        search_offset = 0
+
+        while True:
+            terminator_offset = raw_comment.find(b"\0\0", search_offset)
+
+            if terminator_offset < 0:
+                search_offset = len(raw_comment) & ~1
+            elif terminator_offset & 1:
+                search_offset = terminator_offset + 1
+                continue
+            else:
+                break
+
+            chunk = stream.read(min(chunk_size, end_offset - comment_offset - len(raw_comment)))
+
+            if len(chunk) == 0:
+                raise LMSException(f"Comment at 0x{comment_offset:X} is not terminated before the end of the "
+                                   f"attributes section at 0x{end_offset:X}")
+
+            raw_comment += chunk
+            chunk_size = min(chunk_size * 2, 0x1000)
+
+        stream.seek(comment_offset + terminator_offset + 2)
+
+        try:
+            return raw_comment[:terminator_offset].decode(self.charset)
+        except UnicodeDecodeError:
+            raise LMSException(f"Couldn't decode comment at 0x{comment_offset:X}")
+
     def write_attributes(self, stream: BinaryMemoryIO, attributes: dict):
         stream.write_u8(attributes.get("sound_id", 1))
         stream.write_u8(attributes.get("camera_type", 0))
@@ -461,13 +550,27 @@ class SuperMarioGalaxy2Adapter(LMSAdapter):
         stream.write_u16(attributes.get("camera_id", 0))
         stream.write_u8(attributes.get("msg_link_id", 255))
         stream.write_u8(attributes.get("unk7", 255))
+        comment = attributes.get("comment", "")
+
+        # Let identical comments share one string in the same attributes section
+        if self.POOL_COMMENTS:
+            comment_pool = self._comment_pools_.setdefault(stream, {})
+
+            if comment in comment_pool:
+                stream.write_u32(comment_pool[comment])
+                stream.seek(0, io.SEEK_END)
+                return
+
+            comment_pool[comment] = stream.size
+
         stream.write_u32(stream.size)
 
         stream.seek(0, io.SEEK_END)
-        self.write_chars(stream, attributes.get("comment", "") + "\0")
+        self.write_chars(stream, comment + "\0")
 
     # ------------------------------------------------------------------------------------------------------------------
 
+    POOL_COMMENTS = False  # If True, identical comments are stored only once instead of once per message
     FONT_COLORS = ["black", "red", "green", "blue", "yellow", "purple", "orange", "grey"]
     FONT_SIZES = ["small", "normal", "large"]
     RACE_TIMES = ["jungle_glider", "challenge_glider", "reserved2", "reserved3", "reserved4", "last"]
@@ -755,3 +858,19 @@ class SuperMarioGalaxy2Adapter(LMSAdapter):
         "SE_SV_HINT_TV_TALK_OK",
         "SE_SV_PEACH_NPC_THANK_YOU"
     ]
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Helper functions for tags
+
+def _create_name_ids_(names: list[str]) -> dict[str, int]:
+    # Like list.index, the first occurrence of a name determines its ID
+    name_ids = {}
+
+    for name_id, name in enumerate(names):
+        name_ids.setdefault(name, name_id)
+
+    return name_ids
+
+
+SuperMarioGalaxy2Adapter.compile_tag_tables()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+from pyjkernel import JKRArchive, JKRCompression
+
+import pyjkernel
+
+__all__ = ["read_archive_file", "pack_archive", "compress_archive_buffer", "write_file_atomic", "write_archive_file",
+           "COMPRESSION_LEVELS", "DEFAULT_COMPRESSION_LEVEL"]
+
+# SZS compression levels, from fastest to smallest output. "store" only wraps the data in Yaz0 literal blocks, the other
+# levels are passed to oead's Yaz0 encoder, whose levels range from 6 (fastest) to 9 (slowest).
+COMPRESSION_LEVELS = ["store", "fast", "normal", "best"]
+DEFAULT_COMPRESSION_LEVEL = "normal"
+_SZS_ENCODER_LEVELS_ = {"fast": 6, "normal": 7, "best": 9}
+
+
+def read_archive_file(arc_path: str, memory_map: bool = True) -> JKRArchive:
+    """
+    Reads the RARC archive from the specified file. If memory_map is True and the archive is not compressed, the file is
+    memory-mapped instead of being read into memory first, so that only the contained files' data is copied. The
+    mapping is closed before returning. Compressed archives and files that can't be mapped are read as a whole.
+
+    :param arc_path: the archive file.
+    :param memory_map: True if uncompressed archives should be memory-mapped.
+    :return: the archive.
+    """
+    with open(arc_path, "rb") as f:
+        if memory_map:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):  # Empty files or file systems that don't support mappings
+                mapped = None
+
+            if mapped is not None:
+                with mapped:
+                    if len(mapped) < 4 or pyjkernel.check_compression(mapped) == JKRCompression.NONE:
+                        return pyjkernel.from_archive_buffer(mapped)
+
+        return pyjkernel.from_archive_buffer(f.read())
+
+
+def pack_archive(archive: JKRArchive) -> bytes:
+    """
+    Packs the RARC archive into an uncompressed buffer.
+
+    :param archive: the archive.
+    :return: the packed archive.
+    """
+    return pyjkernel.write_archive_buffer(archive, compression=JKRCompression.NONE)
+
+
+def compress_archive_buffer(buffer: bytes, compression: JKRCompression,
+                            level: str = DEFAULT_COMPRESSION_LEVEL) -> bytes:
+    """
+    Compresses a packed archive using the specified compression format. If no compression is specified, the buffer is
+    returned as it is. The level is one of ``COMPRESSION_LEVELS`` and only applies to SZS compression. If the level is
+    unknown, a ValueError will be thrown.
+
+    :param buffer: the packed archive.
+    :param compression: the compression format.
+    :param level: the SZS compression level.
+    :return: the compressed archive.
+    """
+    if compression != JKRCompression.SZS:
+        return pyjkernel.compress(buffer, compression)
+
+    if level == "store":
+        return _store_szs_(buffer)
+    if level not in _SZS_ENCODER_LEVELS_:
+        raise ValueError(f"Unknown compression level {level}")
+
+    return pyjkernel.compress_szs(buffer, _SZS_ENCODER_LEVELS_[level])
+
+
+def _store_szs_(buffer: bytes) -> bytes:
+    # Every group consists of a flag byte with all bits set, which marks the following eight bytes as literals
+    len_buffer = len(buffer)
+    num_groups = (len_buffer + 7) // 8
+    padded = bytes(buffer) + bytes(num_groups * 8 - len_buffer)
+    groups = bytearray(num_groups * 9)
+    groups[0::9] = b"\xFF" * num_groups
+
+    for i in range(8):
+        groups[1 + i::9] = padded[i::8]
+
+    # The last group only has to hold the remaining bytes
+    return struct.pack(">4sI8x", b"Yaz0", len_buffer) + groups[:num_groups + len_buffer]
+
+
+def write_file_atomic(file_path: str, data: bytes):
+    """
+    Writes the data to the specified file. The data is written to a temporary file in the same folder first, which
+    then replaces the actual file. Therefore, the file is never left partially written if an error occurs.
+
+    :param file_path: the file to write.
+    :param data: the data to be written.
+    """
+    file_dir, file_name = os.path.split(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{file_name}.", suffix=".tmp", dir=file_dir)
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Temporary files are only accessible by the owner, so keep the permissions of the replaced file
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temp_path)
+        else:
+            os.chmod(temp_path, 0o644)
+
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def write_archive_file(archive: JKRArchive, arc_path: str, compression: JKRCompression = JKRCompression.NONE,
+                       level: str = DEFAULT_COMPRESSION_LEVEL):
+    """
+    Packs and compresses the RARC archive and writes it to the specified file using ``write_file_atomic``.
+
+    :param archive: the archive.
+    :param arc_path: the archive file.
+    :param compression: the compression format.
+    :param level: the SZS compression level.
+    """
+    write_file_atomic(arc_path, compress_archive_buffer(pack_archive(archive), compression, level))
@@ -1,3 +1,4 @@
+import multiprocessing
 import sys
 import traceback
 
@@ -10,6 +11,9 @@ from PyQt5.QtWidgets import QApplication
 
 
 if __name__ == "__main__":
+    # Required for the parse worker processes in frozen executables
+    multiprocessing.freeze_support()
+
     app = QApplication([])
     app.setWindowIcon(QIcon(resolve_asset("assets/icon.ico")))
     app.setStyleSheet(qdarkstyle.load_stylesheet_pyqt5())
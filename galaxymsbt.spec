@@ -12,8 +12,11 @@ a = Analysis(
         ('assets/dialog_intvar.ui', 'assets'),
         ('assets/dialog_picture.ui', 'assets'),
         ('assets/dialog_ruby.ui', 'assets'),
+        ('assets/dialog_replace.ui', 'assets'),
+        ('assets/dialog_search.ui', 'assets'),
         ('assets/dialog_stringvar.ui', 'assets'),
         ('assets/dialog_text.ui', 'assets'),
+        ('assets/dialog_validate.ui', 'assets'),
         ('assets/editor.ui', 'assets'),
         ('assets/icon.ico', 'assets'),
         ('assets/tag_delay.png', 'assets'),
@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from pyjkernel import JKRArchive, JKRCompression
+from adapter_smg2 import SuperMarioGalaxy2Adapter
+from adapter_config import initialize_custom_smg2_adapter_maker
+from msbtaccess import LMSAccessor, load_lms_accessors, create_parse_pool, create_msbt_file_path, create_msbf_file_path
+from archiveio import read_archive_file, write_archive_file, pack_archive, compress_archive_buffer
+from archiveio import COMPRESSION_LEVELS, DEFAULT_COMPRESSION_LEVEL
+from msbtexport import iter_message_rows, write_message_rows, read_message_rows, import_message_rows
+from msbtsearch import MessageSearchIndex
+from msbtreplace import ReplaceRule, replace_in_accessors
+from msbtvalidate import validate_accessors
+from msbtbenchmark import BenchmarkResult, benchmark_label_lookup, benchmark_index_relinking, benchmark_flow_traversal
+from msbtbenchmark import benchmark_parallel_loading, benchmark_text_encoding, benchmark_tag_encoding
+from msbtbenchmark import benchmark_tag_decoding
+from pymsb import LMSException
+
+__all__ = ["main"]
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Commands
+# ----------------------------------------------------------------------------------------------------------------------
+def list_archive(arc_path: str, adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace):
+    archive = read_archive_file(arc_path)
+    print(f"{arc_path} ({archive.root_name})")
+
+    for lms_accessor in load_lms_accessors(archive, adapter, args.workers, executor=args.executor):
+        print(f"  {lms_accessor.name}: {len(lms_accessor.messages)} messages, "
+              f"{len(lms_accessor.flowcharts)} flowcharts")
+
+
+def export_archive(arc_path: str, adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace):
+    archive = read_archive_file(arc_path)
+    export_dir = os.path.join(args.directory, _get_archive_name_(arc_path))
+    os.makedirs(export_dir, exist_ok=True)
+
+    for file in filter(_is_lms_file_, archive.list_files(archive.root_name)):
+        with open(os.path.join(export_dir, file.name), "wb") as f:
+            f.write(file.data)
+
+    print(f"{arc_path}: exported to {export_dir}")
+
+
+def import_archive(arc_path: str, adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace):
+    archive = read_archive_file(arc_path)
+    import_dir = os.path.join(args.directory, _get_archive_name_(arc_path))
+
+    if not os.path.isdir(import_dir):
+        raise FileNotFoundError(f"No folder {import_dir} to import from")
+
+    for file_name in filter(lambda n: n.endswith(".msbt") or n.endswith(".msbf"), os.listdir(import_dir)):
+        file_path = f"{archive.root_name}/{file_name}"
+
+        if archive.directory_exists(file_path):
+            file = archive.get_file(file_path)
+        else:
+            file = archive.create_file(file_path)
+
+        with open(os.path.join(import_dir, file_name), "rb") as f:
+            file.data = f.read()
+
+    # Make sure that the imported files can be parsed before writing the archive
+    load_lms_accessors(archive, adapter, args.workers, executor=args.executor)
+    _write_archive_(archive, arc_path, args)
+
+
+def validate_archive(arc_path: str, adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace):
+    archive = read_archive_file(arc_path)
+    lms_accessors = load_lms_accessors(archive, adapter, args.workers, executor=args.executor)
+    issues = validate_accessors(lms_accessors, adapter, args.workers, arc_path, args.executor)
+
+    for issue in issues:
+        print(f"{issue.archive}: {issue.accessor.name}: {issue.message.label}: position {issue.position}: "
+              f"{issue.description}")
+
+    if len(issues) > 0:
+        raise LMSException(f"{len(issues)} invalid tags or characters found")
+
+    if args.pack:
+        for lms_accessor in lms_accessors:
+            _pack_accessor_(lms_accessor)
+
+    print(f"{arc_path}: OK")
+
+
+def repack_archive(arc_path: str, adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace):
+    archive = read_archive_file(arc_path)
+
+    for lms_accessor in load_lms_accessors(archive, adapter, args.workers, executor=args.executor):
+        _pack_accessor_(lms_accessor)
+
+    _write_archive_(archive, arc_path, args)
+
+
+def benchmark_compression(arc_path: str, adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace):
+    buffer = pack_archive(read_archive_file(arc_path))
+    print(f"{arc_path}: {len(buffer)} bytes uncompressed")
+
+    for level in COMPRESSION_LEVELS:
+        start_time = time.perf_counter()
+        compressed = compress_archive_buffer(buffer, JKRCompression.SZS, level)
+        elapsed_time = max(time.perf_counter() - start_time, 1e-9)
+
+        ratio = len(compressed) / max(len(buffer), 1)
+        throughput = len(buffer) / elapsed_time / 0x100000
+        print(f"  {level:<6} {len(compressed):>10} bytes  ratio {ratio:6.3f}  {throughput:8.1f} MiB/s  "
+              f"{elapsed_time:7.3f} s")
+
+
+def benchmark_text(arc_path: str, adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace):
+    archive = read_archive_file(arc_path)
+    lms_accessors = load_lms_accessors(archive, adapter, args.workers, executor=args.executor)
+    message_count = sum(len(lms_accessor.messages) for lms_accessor in lms_accessors)
+    print(f"{arc_path}: {len(lms_accessors)} text files, {message_count} messages")
+
+    # The accessors were parsed by the shared pool already, so its workers are running by now
+    results = [
+        benchmark_parallel_loading(archive, adapter, args.executor, args.repeat),
+        benchmark_label_lookup(lms_accessors, args.repeat),
+        benchmark_index_relinking(lms_accessors, args.repeat),
+        benchmark_flow_traversal(lms_accessors, args.repeat),
+        benchmark_text_encoding(lms_accessors, adapter, args.repeat),
+        benchmark_tag_encoding(lms_accessors, adapter, args.repeat),
+        benchmark_tag_decoding(lms_accessors, adapter, args.repeat)
+    ]
+
+    for result in results:
+        _print_benchmark_result_(result)
+
+
+def replace_archive(arc_path: str, adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace):
+    archive = read_archive_file(arc_path)
+    lms_accessors = load_lms_accessors(archive, adapter, args.workers, reuse_binary=args.reuse_binary,
+                                       executor=args.executor)
+    rules = [ReplaceRule(args.find, args.replace, args.tag)]
+    changes = replace_in_accessors(lms_accessors, rules, args.dry_run, args.workers, arc_path, args.executor)
+
+    for change in changes:
+        print(f"{change.archive}: {change.file}: {change.label} ({change.count})")
+
+    replaced_count = sum(change.count for change in changes)
+    print(f"{arc_path}: {replaced_count} occurrences in {len(changes)} messages", file=sys.stderr)
+
+    if args.dry_run or len(changes) == 0:
+        return
+
+    for lms_accessor in lms_accessors:
+        lms_accessor.save()
+
+    _write_archive_(archive, arc_path, args)
+
+
+def search_messages(adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace) -> int:
+    search_index = MessageSearchIndex()
+
+    for arc_path in args.archives:
+        lms_accessors = load_lms_accessors(read_archive_file(arc_path), adapter, args.workers, executor=args.executor)
+
+        for lms_accessor in lms_accessors:
+            search_index.add_accessor(lms_accessor, arc_path)
+
+    start_time = time.perf_counter()
+    hits = search_index.search(args.query, not args.text_only, not args.labels_only)
+    elapsed_time = time.perf_counter() - start_time
+
+    for hit in hits:
+        print(f"{hit.archive}: {hit.accessor.name}: {hit.message.label}")
+
+    print(f"{len(hits)} of {len(search_index)} messages match ({elapsed_time * 1000:.1f} ms)", file=sys.stderr)
+    return 0 if len(hits) > 0 else 1
+
+
+def export_text(adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace) -> int:
+    with open(args.file, "w", encoding="utf-8") as f:
+        row_count = write_message_rows(iter_message_rows(args.archives, adapter), f)
+
+    print(f"Exported {row_count} messages to {args.file}")
+    return 0
+
+
+def import_text(adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace) -> int:
+    compression = JKRCompression.SZS if args.compress else JKRCompression.NONE
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        rows = read_message_rows(f)
+
+        for arc_path, row_count in import_message_rows(rows, adapter, compression, args.base_dir, args.reuse_binary,
+                                                       args.level):
+            print(f"{arc_path}: imported {row_count} messages")
+
+    return 0
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Helpers
+# ----------------------------------------------------------------------------------------------------------------------
+def _is_lms_file_(file) -> bool:
+    return file.name.endswith(".msbt") or file.name.endswith(".msbf")
+
+
+def _get_archive_name_(arc_path: str) -> str:
+    return os.path.splitext(os.path.basename(arc_path))[0]
+
+
+def _pack_accessor_(lms_accessor: LMSAccessor):
+    try:
+        lms_accessor.mark_modified()
+        lms_accessor.save()
+    except Exception as e:
+        msbt_path = create_msbt_file_path(lms_accessor.archive, lms_accessor.name)
+        msbf_path = create_msbf_file_path(lms_accessor.archive, lms_accessor.name)
+        raise Exception(f"Couldn't pack {msbt_path} or {msbf_path}: {repr(e)}")
+
+
+def _print_benchmark_result_(result: BenchmarkResult):
+    after = f"after {result.after_seconds:8.4f} s"
+
+    if result.before_seconds is None:
+        print(f"  {result.name:<18} {result.count:>8} items  {'':<17}  {after}")
+    else:
+        print(f"  {result.name:<18} {result.count:>8} items  before {result.before_seconds:8.4f} s  {after}  "
+              f"{result.speedup:7.1f}x")
+
+
+def _write_archive_(archive: JKRArchive, arc_path: str, args: argparse.Namespace):
+    if args.output is not None:
+        os.makedirs(args.output, exist_ok=True)
+        out_path = os.path.join(args.output, os.path.basename(arc_path))
+    else:
+        out_path = arc_path
+
+    compression = JKRCompression.SZS if args.compress else JKRCompression.NONE
+    write_archive_file(archive, out_path, compression=compression, level=args.level)
+    print(f"{arc_path}: written to {out_path}")
+
+
+def _create_argument_parser_() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="galaxymsbt_cli",
+                                     description="Batch processing of Super Mario Galaxy 2 text archives.")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="number of processes that parse text files of an archive (default: 1)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    parser_list = subparsers.add_parser("list", help="list text files and their entry counts")
+    parser_list.add_argument("archives", nargs="+", help="archive files")
+    parser_list.set_defaults(command_func=list_archive)
+
+    parser_export = subparsers.add_parser("export", help="extract MSBT/MSBF files into one folder per archive")
+    parser_export.add_argument("directory", help="folder to export to")
+    parser_export.add_argument("archives", nargs="+", help="archive files")
+    parser_export.set_defaults(command_func=export_archive)
+
+    parser_import = subparsers.add_parser("import", help="replace MSBT/MSBF files with those from the export folder")
+    parser_import.add_argument("directory", help="folder to import from")
+    parser_import.add_argument("archives", nargs="+", help="archive files")
+
+    parser_validate = subparsers.add_parser("validate", help="check all tags and report every invalid one")
+    parser_validate.add_argument("archives", nargs="+", help="archive files")
+    parser_validate.add_argument("--pack", action="store_true",
+                                 help="also pack all text files to check attributes and flowcharts")
+    parser_validate.set_defaults(command_func=validate_archive)
+
+    parser_benchmark = subparsers.add_parser("benchmark-compression",
+                                             help="report ratio and throughput of every SZS compression level")
+    parser_benchmark.add_argument("archives", nargs="+", help="archive files")
+    parser_benchmark.set_defaults(command_func=benchmark_compression)
+
+    parser_benchmark_text = subparsers.add_parser("benchmark-text",
+                                                  help="compare text processing against the previous implementations")
+    parser_benchmark_text.add_argument("archives", nargs="+", help="archive files")
+    parser_benchmark_text.add_argument("-r", "--repeat", type=int, default=5,
+                                       help="number of runs per measurement, the fastest is reported (default: "
+                                            "%(default)s)")
+    parser_benchmark_text.set_defaults(command_func=benchmark_text)
+
+    parser_search = subparsers.add_parser("search", help="list messages whose label or text contains a substring")
+    parser_search.add_argument("query", help="substring to search for, letter case is ignored")
+    parser_search.add_argument("archives", nargs="+", help="archive files")
+    parser_search_fields = parser_search.add_mutually_exclusive_group()
+    parser_search_fields.add_argument("--labels-only", action="store_true", help="only search labels")
+    parser_search_fields.add_argument("--text-only", action="store_true", help="only search text")
+    parser_search.set_defaults(batch_func=search_messages)
+
+    parser_replace = subparsers.add_parser("replace", help="replace text or tags in all messages")
+    parser_replace.add_argument("find", help="text to find, or a tag such as [color:red] with --tag")
+    parser_replace.add_argument("replace", help="replacement text, or the replacement tag with --tag")
+    parser_replace.add_argument("archives", nargs="+", help="archive files")
+    parser_replace.add_argument("-t", "--tag", action="store_true",
+                                help="replace whole tags instead of text outside of tags")
+    parser_replace.add_argument("-n", "--dry-run", action="store_true",
+                                help="only list the messages that would be changed")
+    parser_replace.add_argument("--reuse-binary", action="store_true",
+                                help="copy untouched messages from the original files instead of encoding them")
+
+    parser_export_text = subparsers.add_parser("export-text", help="export all messages to a JSON lines file")
+    parser_export_text.add_argument("file", help="JSON lines file to write")
+    parser_export_text.add_argument("archives", nargs="+", help="archive files")
+    parser_export_text.set_defaults(batch_func=export_text)
+
+    parser_import_text = subparsers.add_parser("import-text", help="import messages from a JSON lines file")
+    parser_import_text.add_argument("file", help="JSON lines file to read")
+    parser_import_text.add_argument("-d", "--base-dir", default="",
+                                    help="folder that relative archive paths are resolved against")
+    parser_import_text.add_argument("-c", "--compress", action="store_true", help="compress the archives using SZS")
+    parser_import_text.add_argument("--reuse-binary", action="store_true",
+                                    help="copy untouched messages from the original files instead of encoding them")
+    parser_import_text.set_defaults(batch_func=import_text)
+
+    parser_repack = subparsers.add_parser("repack", help="pack all text files again and write the archives")
+    parser_repack.add_argument("archives", nargs="+", help="archive files")
+
+    for subparser in [parser_import, parser_repack, parser_replace]:
+        subparser.add_argument("-o", "--output", default=None,
+                               help="folder to write the archives to instead of overwriting them")
+        subparser.add_argument("-c", "--compress", action="store_true", help="compress the archives using SZS")
+
+    for subparser in [parser_import, parser_repack, parser_import_text, parser_replace]:
+        subparser.add_argument("-l", "--level", choices=COMPRESSION_LEVELS, default=DEFAULT_COMPRESSION_LEVEL,
+                               help="SZS compression level used with --compress (default: %(default)s)")
+        subparser.add_argument("--pool-comments", action="store_true",
+                               help="store identical attribute comments only once per text file")
+
+    parser_import.set_defaults(command_func=import_archive)
+    parser_repack.set_defaults(command_func=repack_archive)
+    parser_replace.set_defaults(command_func=replace_archive)
+    return parser
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Entry point
+# ----------------------------------------------------------------------------------------------------------------------
+def main(argv: list[str] | None = None) -> int:
+    """
+    Runs the command specified by the arguments on every given archive. Errors are reported per archive, so that one
+    broken archive doesn't stop the remaining ones from being processed.
+
+    :param argv: the command line arguments, or None to use ``sys.argv``.
+    :return: 0 if all archives were processed successfully, otherwise 1.
+    """
+    args = _create_argument_parser_().parse_args(argv)
+
+    try:
+        adapter = initialize_custom_smg2_adapter_maker()
+    except Exception as e:
+        print(f"Couldn't load adapter config data: {repr(e)}", file=sys.stderr)
+        return 1
+
+    if getattr(args, "pool_comments", False):
+        adapter.POOL_COMMENTS = True
+
+    # All archives share one pool of worker processes, so that the workers are started only once per run. The workers
+    # are started on first use, so commands that don't need them don't pay for them
+    args.executor = create_parse_pool(adapter, args.workers) if args.workers > 1 else None
+
+    try:
+        return _run_command_(adapter, args)
+    finally:
+        if args.executor is not None:
+            args.executor.shutdown()
+
+
+def _run_command_(adapter: type[SuperMarioGalaxy2Adapter], args: argparse.Namespace) -> int:
+    # Commands that stream over all archives at once
+    if "batch_func" in args:
+        try:
+            return args.batch_func(adapter, args)
+        except Exception as e:
+            print(repr(e), file=sys.stderr)
+            return 1
+
+    failed_count = 0
+
+    for arc_path in args.archives:
+        try:
+            args.command_func(arc_path, adapter, args)
+        except Exception as e:
+            print(f"{arc_path}: {repr(e)}", file=sys.stderr)
+            failed_count += 1
+
+    if failed_count > 0:
+        print(f"{failed_count} of {len(args.archives)} archives failed.", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
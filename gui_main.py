@@ -2,17 +2,29 @@ from __future__ import annotations
 
 from pyjkernel import JKRArchive, JKRCompression
 from pymsb import LMSMessage, LMSEntryNode, LMSException
-from msbtaccess import LMSAccessor
+from msbtaccess import LMSAccessor, load_lms_accessors, prefetch_lms_accessors, create_parse_pool
+from archiveio import read_archive_file, pack_archive, compress_archive_buffer, write_file_atomic, COMPRESSION_LEVELS
 from gui_text import GalaxyTextEditor
+from gui_models import MessageListModel, MessageFilterProxyModel
+from gui_search import MessageSearchDialog
+from gui_replace import MessageReplaceDialog
+from gui_validate import MessageValidationDialog
+from msbtsearch import MessageSearchIndex
+from msbtreplace import ReplaceRule, ReplaceChange, replace_in_accessors
+from msbtvalidate import ValidationIssue, validate_accessors
+from msbtworkspace import WorkspaceArchive, find_workspace_archives, load_workspace_archives, save_workspace_archives
 from guihelpers import SettingsHolder, WorkerThread, resolve_asset, PROGRAM_TITLE
 from adapter_smg2 import SuperMarioGalaxy2Adapter
 from adapter_config import initialize_custom_smg2_adapter_maker
 
+import os
 import pyjkernel
+import time
 
 from PyQt5 import uic
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
+from PyQt5.QtGui import QTextCursor
 
 __all__ = ["GalaxyMsbtEditor"]
 
@@ -33,27 +45,53 @@ class GalaxyMsbtEditor(QMainWindow):
         self.current_accessor: LMSAccessor = None       # Currently edited text file
         self.current_message: LMSMessage = None         # Currently edited LMS message
         self.current_flowchart: LMSEntryNode = None     # Currently edited LMS flowchart
+        self.workspace: list[WorkspaceArchive] = None   # Archives of the opened workspace, None if there's none
+        self.workspace_archive: WorkspaceArchive = None  # Currently edited archive of the workspace
 
         # Data helpers
         self.adapter: type[SuperMarioGalaxy2Adapter] = None     # Active adapter for parsing text files
         self.rarc_reader_thread: RarcReaderThread = None        # Reads RARC file and parses text files
         self.rarc_writer_thread: RarcWriterThread = None        # Packs text files and writes RARC file
+        self.lms_reader_thread: LmsAccessorReaderThread = None  # Parses text files of lazily loaded accessor
+        self.lms_prefetch_thread: LmsAccessorPrefetchThread = None  # Parses lazily loaded text files in parallel
+        self.workspace_reader_thread: WorkspaceReaderThread = None  # Reads all archives of a workspace
+        self.workspace_writer_thread: WorkspaceWriterThread = None  # Saves all modified archives of a workspace
+        self.save_progress_dialog: QProgressDialog = None       # Shows the writer thread's progress
         self.model_lms_accessor_names: QStringListModel = None  # Model reflecting text file names
-        self.model_message_names: QStringListModel = None       # Model reflecting message names
+        self.model_message_names: MessageListModel = None       # Model reflecting message names
+        self.model_message_filter: MessageFilterProxyModel = None  # Filters the message names
+        self.timer_message_filter: QTimer = None                # Delays filtering while typing
         self.model_flowchart_names: QStringListModel = None     # Model reflecting flowchart names
         self.unsaved_changes: bool = False                      # True if there are some edits
+        self.search_index: MessageSearchIndex = None            # Searches all messages, built on first use
+        self.search_index_thread: SearchIndexBuilderThread = None  # Builds the search index
+        self.pending_search_updates: list = []                  # Edits made while the search index is built
+        self.replace_thread: MessageReplaceThread = None        # Finds the messages to be changed by replacing
+        self.validation_thread: MessageValidationThread = None  # Checks the tags of all messages
 
         # Helper forms
         self._gui_text_editor_: GalaxyTextEditor = None
+        self._gui_search_dialog_: MessageSearchDialog = None
+        self._gui_replace_dialog_: MessageReplaceDialog = None
+        self._gui_validation_dialog_: MessageValidationDialog = None
 
         # UI elements (initialized by UI loader)
         self.statusBar: QStatusBar = None
         self.actionNew: QAction = None
         self.actionOpen: QAction = None
+        self.actionOpenWorkspace: QAction = None
         self.actionSave: QAction = None
         self.actionOptionCompression: QAction = None
+        self.actionOptionCompressionLevel: QAction = None
+        self.actionOptionLazyLoad: QAction = None
+        self.actionOptionLoadWorkers: QAction = None
+        self.actionOptionReuseBinary: QAction = None
         self.actionAbout: QAction = None
+        self.actionSearchMessages: QAction = None
+        self.actionReplaceMessages: QAction = None
+        self.actionValidateMessages: QAction = None
 
+        self.comboWorkspaceArchive: QComboBox = None
         self.lineArchivePath: QLineEdit = None
         self.lineArchiveRoot: QLineEdit = None
         self.buttonChangeRoot: QPushButton = None
@@ -67,6 +105,8 @@ class GalaxyMsbtEditor(QMainWindow):
         self.buttonMessagesDuplicate: QPushButton = None
         self.buttonMessagesSort: QPushButton = None
         self.listMessages: QListView = None
+        self.lineMessageFilter: QLineEdit = None
+        self.checkMessageFilterText: QCheckBox = None
 
         self.buttonFlowchartsAdd: QPushButton = None
         self.buttonFlowchartsRemove: QPushButton = None
@@ -93,15 +133,27 @@ class GalaxyMsbtEditor(QMainWindow):
         self.setWindowTitle(PROGRAM_TITLE)
 
         self.model_lms_accessor_names = QStringListModel()
-        self.model_message_names = QStringListModel()
+        self.model_message_names = MessageListModel()
         self.model_flowchart_names = QStringListModel()
         self.listLmsAccessors.setModel(self.model_lms_accessor_names)
-        self.listMessages.setModel(self.model_message_names)
+        self.model_message_filter = MessageFilterProxyModel()
+        self.model_message_filter.setSourceModel(self.model_message_names)
+        self.listMessages.setModel(self.model_message_filter)
+        self.timer_message_filter = QTimer(self)
+        self.timer_message_filter.setSingleShot(True)
+        self.timer_message_filter.setInterval(200)
         self.listFlowcharts.setModel(self.model_flowchart_names)
+        self.comboWorkspaceArchive.setVisible(False)
 
         self.actionOptionCompression.blockSignals(True)
         self.actionOptionCompression.setChecked(SettingsHolder.is_compress_arc())
         self.actionOptionCompression.blockSignals(False)
+        self.actionOptionLazyLoad.blockSignals(True)
+        self.actionOptionLazyLoad.setChecked(SettingsHolder.is_lazy_load())
+        self.actionOptionLazyLoad.blockSignals(False)
+        self.actionOptionReuseBinary.blockSignals(True)
+        self.actionOptionReuseBinary.setChecked(SettingsHolder.is_reuse_binary())
+        self.actionOptionReuseBinary.blockSignals(False)
 
         self.set_lms_file_components_enabled(False)
         self.set_archive_components_enabled(False)
@@ -141,17 +193,28 @@ class GalaxyMsbtEditor(QMainWindow):
         # File menu events
         self.actionNew.triggered.connect(self.new_arc)
         self.actionOpen.triggered.connect(self.open_arc)
+        self.actionOpenWorkspace.triggered.connect(self.open_workspace)
         self.actionSave.triggered.connect(lambda: self.save_arc(False))
         self.actionSaveAs.triggered.connect(lambda: self.save_arc(True))
 
         # Options menu events
         self.actionOptionCompression.triggered.connect(SettingsHolder.set_compress_arc)
+        self.actionOptionCompressionLevel.triggered.connect(self.set_compression_level)
+        self.actionOptionLazyLoad.triggered.connect(SettingsHolder.set_lazy_load)
+        self.actionOptionLoadWorkers.triggered.connect(self.set_load_workers)
+        self.actionOptionReuseBinary.triggered.connect(SettingsHolder.set_reuse_binary)
 
         # About menu events
         self.actionAbout.triggered.connect(self.show_about)
 
+        # Tools menu events
+        self.actionSearchMessages.triggered.connect(self.open_search_dialog)
+        self.actionReplaceMessages.triggered.connect(self.open_replace_dialog)
+        self.actionValidateMessages.triggered.connect(self.open_validation_dialog)
+
         # Archive events
         self.buttonChangeRoot.clicked.connect(self.change_archive_root)
+        self.comboWorkspaceArchive.currentIndexChanged.connect(self.switch_workspace_archive)
 
         # LMS accessor events
         self.buttonLmsAccessorNew.clicked.connect(self.new_accessor)
@@ -164,6 +227,9 @@ class GalaxyMsbtEditor(QMainWindow):
         self.buttonMessagesDuplicate.clicked.connect(self.duplicate_message)
         self.buttonMessagesSort.clicked.connect(self.sort_messages)
         self.listMessages.selectionModel().selectionChanged.connect(self.on_message_selected)
+        self.lineMessageFilter.textChanged.connect(self.timer_message_filter.start)
+        self.checkMessageFilterText.toggled.connect(self.apply_message_filter)
+        self.timer_message_filter.timeout.connect(self.apply_message_filter)
 
         # Flowchart events
         self.buttonFlowchartsAdd.clicked.connect(self.create_flowchart)
@@ -194,6 +260,36 @@ class GalaxyMsbtEditor(QMainWindow):
     def show_wip(self):
         QMessageBox.information(self, PROGRAM_TITLE, "This action is not supported yet!")
 
+    def set_compression_level(self):
+        description = "Specify how thoroughly RARC files are compressed when saving.\n" \
+                      "store: no actual compression, quickest for testing builds\n" \
+                      "fast: quick compression for iteration builds\n" \
+                      "normal: balanced compression\n" \
+                      "best: smallest files for release builds"
+        compression_level = SettingsHolder.get_compression_level()
+        current_index = COMPRESSION_LEVELS.index(compression_level) if compression_level in COMPRESSION_LEVELS else 0
+        compression_level, valid = QInputDialog.getItem(self, "Compression level", description, COMPRESSION_LEVELS,
+                                                        current_index, False, flags=self.windowFlags())
+
+        if valid:
+            SettingsHolder.set_compression_level(compression_level)
+
+    def set_load_workers(self):
+        description = "Specify how many processes parse, search, validate and pack text files.\n" \
+                      "1 processes all text files one after another without extra processes.\n" \
+                      "With more, text files that are loaded on demand are also parsed in the background after opening."
+        load_workers, valid = QInputDialog.getInt(self, "Worker processes", description,
+                                                  SettingsHolder.get_load_workers(), 1, os.cpu_count() or 1,
+                                                  flags=self.windowFlags())
+
+        if valid:
+            SettingsHolder.set_load_workers(load_workers)
+
+    def closeEvent(self, event):
+        # The worker processes have to be shut down before the window is destroyed
+        self.stop_prefetch(wait=True)
+        super().closeEvent(event)
+
     # ------------------------------------------------------------------------------------------------------------------
     # UI helpers
     # ------------------------------------------------------------------------------------------------------------------
@@ -213,10 +309,20 @@ class GalaxyMsbtEditor(QMainWindow):
         self.reset_messages_model()
         self.reset_flowcharts_model()
         self.reset_message_entry_values()
+        self.reset_workspace()
+        self.reset_search_index()
+        self.stop_prefetch()
+
+        if self._gui_replace_dialog_ is not None:
+            self._gui_replace_dialog_.hide()
+
+        if self._gui_validation_dialog_ is not None:
+            self._gui_validation_dialog_.hide()
 
     def set_file_menu_components_enabled(self, state: bool):
         self.actionNew.blockSignals(not state)
         self.actionOpen.blockSignals(not state)
+        self.actionOpenWorkspace.blockSignals(not state)
         self.actionSave.blockSignals(not state)
 
     def set_archive_components_enabled(self, state: bool):
@@ -226,12 +332,17 @@ class GalaxyMsbtEditor(QMainWindow):
         self.lineArchivePath.setEnabled(state)
         self.lineArchiveRoot.setEnabled(state)
         self.buttonChangeRoot.setEnabled(False)  # This should be adjusted in the future!
+        self.actionSearchMessages.setEnabled(state)
+        self.actionReplaceMessages.setEnabled(state)
+        self.actionValidateMessages.setEnabled(state)
 
     def set_lms_file_components_enabled(self, state: bool):
         self.buttonLmsAccessorNew.blockSignals(not state)
         self.buttonLmsAccessorDelete.blockSignals(not state)
         self.listLmsAccessors.selectionModel().blockSignals(not state)
+        self.comboWorkspaceArchive.blockSignals(not state)
 
+        self.comboWorkspaceArchive.setEnabled(state)
         self.buttonLmsAccessorNew.setEnabled(state)
         self.buttonLmsAccessorDelete.setEnabled(state)
         self.listLmsAccessors.setEnabled(state)
@@ -248,6 +359,8 @@ class GalaxyMsbtEditor(QMainWindow):
         self.buttonMessagesDuplicate.setEnabled(state)
         self.buttonMessagesSort.setEnabled(state)
         self.listMessages.setEnabled(state)
+        self.lineMessageFilter.setEnabled(state)
+        self.checkMessageFilterText.setEnabled(state)
 
     def set_flowcharts_components_enabled(self, state: bool):
         self.buttonFlowchartsAdd.blockSignals(not state)
@@ -302,15 +415,10 @@ class GalaxyMsbtEditor(QMainWindow):
         self.model_lms_accessor_names.removeRows(0, self.model_lms_accessor_names.rowCount())
 
     def populate_messages_model(self):
-        start_row = self.model_message_names.rowCount()
-        self.model_message_names.insertRows(start_row, len(self.current_accessor.messages))
-
-        for message in self.current_accessor.messages:
-            self.model_message_names.setData(self.model_message_names.index(start_row), message.label)
-            start_row += 1
+        self.model_message_names.set_accessor(self.current_accessor)
 
     def reset_messages_model(self):
-        self.model_message_names.removeRows(0, self.model_message_names.rowCount())
+        self.model_message_names.set_accessor(None)
 
     def populate_flowcharts_model(self):
         start_row = self.model_flowchart_names.rowCount()
@@ -419,6 +527,9 @@ class GalaxyMsbtEditor(QMainWindow):
             self.set_archive_components_enabled(True)
             self.set_lms_file_components_enabled(True)
             self.status_info("Successfully loaded the text files.")
+
+            if self.rarc_reader_thread.lazy_load:
+                self.start_prefetch(self.lms_accessors, self.rarc_reader_thread.load_workers)
         else:
             self.set_archive_components_enabled(False)
             self.set_lms_file_components_enabled(False)
@@ -435,6 +546,11 @@ class GalaxyMsbtEditor(QMainWindow):
         if self.archive is None or self.lms_accessors is None:
             return
 
+        # Save all modified archives of a workspace, "Save as" only applies to the current archive
+        if self.workspace is not None and not force_new_path:
+            self.save_workspace()
+            return
+
         # Select file to save to if no path has been specified yet
         if force_new_path or self.current_arc_path == "":
             arc_file_path, valid = self.select_save_arc_file()
@@ -449,25 +565,236 @@ class GalaxyMsbtEditor(QMainWindow):
         self.set_file_menu_components_enabled(False)
         self.rarc_writer_thread\
             = RarcWriterThread(self, self.current_arc_path, self.archive, self.lms_accessors)
+        self.show_save_progress_dialog(self.rarc_writer_thread)
         self.rarc_writer_thread.finished.connect(self.on_arc_saved)
         self.rarc_writer_thread.start()
 
+    def show_save_progress_dialog(self, writer_thread: WorkerThread):
+        # Report progress and allow cancelling between the stages
+        self.save_progress_dialog = QProgressDialog("Saving archive...", "Cancel", 0, 0, self)
+        self.save_progress_dialog.setWindowTitle("Saving")
+        self.save_progress_dialog.setWindowModality(Qt.WindowModal)
+        self.save_progress_dialog.setMinimumDuration(500)
+        self.save_progress_dialog.setAutoClose(False)
+        self.save_progress_dialog.setAutoReset(False)
+        self.save_progress_dialog.canceled.connect(writer_thread.requestInterruption)
+        writer_thread.progress.connect(self.on_arc_save_progress)
+
+    def on_arc_save_progress(self, stage: str, step: int, total_steps: int):
+        if self.save_progress_dialog.wasCanceled():
+            return
+
+        self.save_progress_dialog.setLabelText(stage)
+        self.save_progress_dialog.setMaximum(total_steps)
+        self.save_progress_dialog.setValue(step)
+
     def on_arc_saved(self):
-        if not self.rarc_writer_thread.has_exception:
-            self.unsaved_changes = False
-            self.show_info_dialog("Successfully saved all text files and the archive!")
-        else:
+        self.save_progress_dialog.canceled.disconnect()
+        self.save_progress_dialog.close()
+
+        # The encoded accessors consider themselves saved, but the archive file was not written if saving failed
+        if self.rarc_writer_thread.has_exception or self.rarc_writer_thread.cancelled:
+            for lms_accessor in self.rarc_writer_thread.encoded_accessors:
+                lms_accessor.mark_modified()
+
+        if self.rarc_writer_thread.has_exception:
             exception = self.rarc_writer_thread.exception
             description = f"Archive couldn't be saved because an error occurred:\n\n{repr(exception)}"
             self.show_error_dialog(description)
+        elif self.rarc_writer_thread.cancelled:
+            self.status_warn("Saving was cancelled. The archive file was not changed.")
+        elif self.workspace_archive is not None:
+            # The current archive of the workspace was saved to a new path
+            self.workspace_archive.arc_path = self.current_arc_path
+            self.workspace_archive.mark_saved()
+            self.comboWorkspaceArchive.setItemText(self.workspace.index(self.workspace_archive),
+                                                   self.workspace_archive.name)
+            self.unsaved_changes = any(workspace_archive.is_modified for workspace_archive in self.workspace)
+            self.show_info_dialog("Successfully saved all text files and the archive!")
+        else:
+            self.unsaved_changes = False
+            self.show_info_dialog("Successfully saved all text files and the archive!")
 
         del self.rarc_writer_thread
+        del self.save_progress_dialog
         self.set_file_menu_components_enabled(True)
 
     def change_archive_root(self):
         # pyjkernel does not support this yet...
         pass
 
+    # ------------------------------------------------------------------------------------------------------------------
+    # Workspace opening, switching & saving
+    # ------------------------------------------------------------------------------------------------------------------
+    def open_workspace(self):
+        if not self.try_prompt_ignore_unsaved_changes():
+            return
+
+        # Try select the folder that contains the archives
+        workspace_path = QFileDialog.getExistingDirectory(self, "Open workspace from ...",
+                                                          SettingsHolder.get_last_workspace_path())
+
+        if len(workspace_path) == 0:
+            return
+
+        SettingsHolder.set_last_workspace_path(workspace_path)
+
+        try:
+            arc_paths = find_workspace_archives(workspace_path)
+        except OSError as e:
+            self.show_error_dialog(f"The folder couldn't be read because an error occurred:\n\n{repr(e)}")
+            return
+
+        if len(arc_paths) == 0:
+            self.show_error_dialog("The folder does not contain any ARC or RARC files!")
+            return
+
+        # Reset editor & storage
+        self.reset_editor()
+
+        self.current_arc_path = ""
+        self.archive = None
+        self.lms_accessors = None
+        self.current_accessor = None
+        self.current_message = None
+
+        # Read all archives on the shared pool of workers
+        self.set_file_menu_components_enabled(False)
+        self.status_info(f"Loading {len(arc_paths)} archives...", 0)
+        self.workspace_reader_thread = WorkspaceReaderThread(self, arc_paths, self.adapter)
+        self.workspace_reader_thread.progress.connect(self.on_workspace_load_progress)
+        self.workspace_reader_thread.finished.connect(self.on_workspace_opened)
+        self.workspace_reader_thread.start()
+
+    def on_workspace_load_progress(self, stage: str, step: int, total_steps: int):
+        self.status_info(f"{stage} ({step}/{total_steps})", 0)
+
+    def on_workspace_opened(self):
+        thread = self.workspace_reader_thread
+        self.workspace_reader_thread = None
+        self.set_file_menu_components_enabled(True)
+
+        if thread.has_exception:
+            description = f"Workspace couldn't be loaded because an error occurred:\n\n{repr(thread.exception)}"
+            self.show_error_dialog(description)
+            self.status_error("An error occurred while loading the workspace.")
+            return
+
+        if len(thread.failures) > 0:
+            details = "\n".join(f"{os.path.basename(arc_path)}: {repr(e)}" for arc_path, e in thread.failures)
+            self.show_error_dialog(f"Some archives couldn't be loaded because an error occurred:\n\n{details}")
+
+        if len(thread.workspace_archives) == 0:
+            self.status_error("No archive of the workspace could be loaded.")
+            return
+
+        self.workspace = thread.workspace_archives
+
+        self.comboWorkspaceArchive.blockSignals(True)
+
+        for workspace_archive in self.workspace:
+            self.comboWorkspaceArchive.addItem(workspace_archive.name)
+
+        self.comboWorkspaceArchive.setCurrentIndex(0)
+        self.comboWorkspaceArchive.blockSignals(False)
+        self.comboWorkspaceArchive.setVisible(True)
+
+        self.switch_workspace_archive(0)
+        self.status_info(f"Successfully loaded {len(self.workspace)} archives.")
+
+        if thread.lazy_load:
+            lms_accessors = [a for workspace_archive in self.workspace for a in workspace_archive.lms_accessors]
+            self.start_prefetch(lms_accessors, thread.load_workers)
+
+    def switch_workspace_archive(self, index: int):
+        if self.workspace is None or not 0 <= index < len(self.workspace):
+            return
+
+        self.set_lms_file_components_enabled(False)
+        self.set_message_components_enabled(False)
+        self.set_flowcharts_components_enabled(False)
+        self.set_message_entry_components_enabled(False)
+        self.reset_lms_accessors_model()
+        self.reset_messages_model()
+        self.reset_flowcharts_model()
+        self.reset_message_entry_values()
+
+        # The search index and the unsaved changes cover the entire workspace, so they are kept
+        self.workspace_archive = self.workspace[index]
+        self.current_arc_path = self.workspace_archive.arc_path
+        self.archive = self.workspace_archive.archive
+        self.lms_accessors = self.workspace_archive.lms_accessors
+        self.current_accessor = None
+        self.current_message = None
+
+        self.lineArchivePath.setText(self.current_arc_path)
+        self.lineArchiveRoot.setText(self.archive.root_name)
+        self.populate_lms_files_model()
+        self.set_archive_components_enabled(True)
+        self.set_lms_file_components_enabled(True)
+
+    def save_workspace(self):
+        modified_archives = [workspace_archive for workspace_archive in self.workspace if workspace_archive.is_modified]
+
+        if len(modified_archives) == 0:
+            self.status_info("There are no changes to be saved.")
+            return
+
+        self.set_file_menu_components_enabled(False)
+        self.workspace_writer_thread = WorkspaceWriterThread(self, modified_archives)
+        self.show_save_progress_dialog(self.workspace_writer_thread)
+        self.workspace_writer_thread.finished.connect(self.on_workspace_saved)
+        self.workspace_writer_thread.start()
+
+    def on_workspace_saved(self):
+        thread = self.workspace_writer_thread
+        self.workspace_writer_thread = None
+
+        self.save_progress_dialog.canceled.disconnect()
+        self.save_progress_dialog.close()
+        del self.save_progress_dialog
+        self.set_file_menu_components_enabled(True)
+
+        self.unsaved_changes = any(workspace_archive.is_modified for workspace_archive in self.workspace)
+        saved_count = len(thread.saved_archives)
+        total_count = len(thread.workspace_archives)
+
+        if thread.has_exception:
+            description = f"Workspace couldn't be saved because an error occurred:\n\n{repr(thread.exception)}"
+            self.show_error_dialog(description)
+        elif len(thread.failures) > 0:
+            details = "\n".join(f"{w.name}: {repr(e)}" for w, e in thread.failures)
+            self.show_error_dialog(f"{len(thread.failures)} of {total_count} archives couldn't be saved because an "
+                                   f"error occurred:\n\n{details}")
+        elif thread.cancelled:
+            self.status_warn(f"Saving was cancelled after {saved_count} of {total_count} archives were saved.")
+        else:
+            self.show_info_dialog("Successfully saved all modified archives!")
+
+    def reset_workspace(self):
+        self.workspace = None
+        self.workspace_archive = None
+
+        self.comboWorkspaceArchive.blockSignals(True)
+        self.comboWorkspaceArchive.clear()
+        self.comboWorkspaceArchive.blockSignals(False)
+        self.comboWorkspaceArchive.setVisible(False)
+
+    def get_archive_name(self) -> str:
+        # Names the current archive in search results, which is only needed if there are several archives
+        return self.workspace_archive.name if self.workspace_archive is not None else ""
+
+    def get_archive_scope(self) -> list[tuple[str, list[LMSAccessor]]]:
+        # All archives whose text files are searched and replaced in, together with their names
+        if self.workspace is not None:
+            return [(workspace_archive.name, workspace_archive.lms_accessors) for workspace_archive in self.workspace]
+
+        return [("", self.lms_accessors)]
+
+    def is_current_scope(self, scope: list[tuple[str, list[LMSAccessor]]]) -> bool:
+        current_scope = self.get_archive_scope()
+        return len(scope) == len(current_scope) and all(s[1] is c[1] for s, c in zip(scope, current_scope))
+
     # ------------------------------------------------------------------------------------------------------------------
     # Text file creation & deletion
     # ------------------------------------------------------------------------------------------------------------------
@@ -523,6 +850,7 @@ class GalaxyMsbtEditor(QMainWindow):
                 if lms_accessor.name in remove_file_names:
                     remove_accessors.add(lms_accessor)
                     lms_accessor.delete()
+                    self.update_search_index(lambda index, a=lms_accessor: index.remove_accessor(a))
 
                     # If currently selected accessor is removed, respective components need to be cleared
                     if self.current_accessor == lms_accessor:
@@ -538,6 +866,10 @@ class GalaxyMsbtEditor(QMainWindow):
             for remove_accessor in remove_accessors:
                 self.lms_accessors.remove(remove_accessor)
 
+            # The removed accessors can't tell anymore that the archive has to be saved
+            if self.workspace_archive is not None:
+                self.workspace_archive.mark_modified()
+
             self.unsaved_changes = True
 
     # ------------------------------------------------------------------------------------------------------------------
@@ -554,19 +886,18 @@ class GalaxyMsbtEditor(QMainWindow):
             self.show_error_dialog(f"No valid name specified!")
             return
 
-        # Try to create new entry
+        # Try to create new entry, the model inserts its row
         try:
-            self.current_accessor.new_message(message_label)
+            message = self.model_message_names.new_message(message_label)
         except LMSException:
             self.show_error_dialog(f"A message with the label {message_label} already exists!")
             return
 
-        self.unsaved_changes = True
+        accessor = self.current_accessor
+        archive_name = self.get_archive_name()
+        self.update_search_index(lambda index: index.update_message(accessor, message, archive_name))
 
-        # Insert message label in list model
-        start_row = self.model_message_names.rowCount()
-        self.model_message_names.insertRow(start_row)
-        self.model_message_names.setData(self.model_message_names.index(start_row), message_label, 0)
+        self.unsaved_changes = True
 
     def remove_message(self):
         selected_indices = self.listMessages.selectionModel().selectedIndexes()
@@ -576,37 +907,22 @@ class GalaxyMsbtEditor(QMainWindow):
         if not self.show_yes_no_prompt("Do you really want to remove the selected message(s)?"):
             return
 
-        # Collect labels and indices to be removed
-        remove_label_rows = {}
-
-        for selected_index in reversed(selected_indices):
-            label = self.model_message_names.data(selected_index, 0)
-            remove_label_rows[label] = selected_index.row()
+        # Collect labels to be removed, starting at the bottom so that the rows of the remaining ones don't move
+        selected_indices = sorted(selected_indices, key=lambda selected_index: selected_index.row(), reverse=True)
+        remove_labels = [self.model_message_filter.data(selected_index, 0) for selected_index in selected_indices]
 
-        # Remove messages
+        # Remove messages, the model removes their rows
         failed_labels = []
+        self.listMessages.selectionModel().clearSelection()
 
-        for label in remove_label_rows.keys():
-            if self.current_accessor.delete_message(label):
-                if self.current_message is not None and self.current_message.label == label:
-                    self.set_message_entry_components_enabled(False)
-                    self.reset_message_entry_values()
-                    self.current_message = None
+        for label in remove_labels:
+            message = self.current_accessor.get_message(label)
 
+            if self.model_message_names.delete_message(label):
+                self.update_search_index(lambda index, m=message: index.remove_message(m))
                 self.unsaved_changes = True
-
             else:
                 failed_labels.append(label)
-                remove_label_rows[label] = -2  # Invalid row to prevent it from deletion
-
-        # Remove labels from model
-        were_blocked = self.model_message_names.signalsBlocked()
-        self.model_message_names.blockSignals(True)
-
-        for row in filter(lambda i: i >= 0, remove_label_rows.values()):
-            self.model_message_names.removeRow(row)
-
-        self.model_message_names.blockSignals(were_blocked)
 
         # Notify about failed labels
         if len(failed_labels) > 0:
@@ -627,22 +943,17 @@ class GalaxyMsbtEditor(QMainWindow):
         if len(selected_indices) < 1:
             return
 
-        self.model_message_names.blockSignals(True)
-
         # Implement remaining logic, duh
 
-        self.model_message_names.blockSignals(False)
         # self.unsaved_changes = True
 
-    def sort_messages(self):
-        self.current_accessor.sort_messages()
-        self.model_message_names.blockSignals(True)
+    def apply_message_filter(self):
+        self.timer_message_filter.stop()
+        self.model_message_filter.set_filter(self.lineMessageFilter.text(), self.checkMessageFilterText.isChecked())
 
-        # Repopulate model without sort function to retain exact natural order of elements
-        self.listMessages.selectionModel().clearSelection()
-        self.reset_messages_model()
-        self.model_message_names.blockSignals(False)
-        self.populate_messages_model()
+    def sort_messages(self):
+        # The model moves the rows along with the messages, so the selection is kept
+        self.model_message_names.sort_messages()
         self.unsaved_changes = True
 
     # ------------------------------------------------------------------------------------------------------------------
@@ -724,11 +1035,69 @@ class GalaxyMsbtEditor(QMainWindow):
                 self.current_accessor = lms_accessor
                 break
 
-        if self.current_accessor is not None:
-            self.populate_messages_model()
-            self.populate_flowcharts_model()
-            self.set_message_components_enabled(True)
-            self.set_flowcharts_components_enabled(True)
+        if self.current_accessor is None:
+            return
+
+        if self.current_accessor.is_loaded:
+            self.populate_from_current_accessor()
+            return
+
+        # Parse text files in the background, the selection can't change until parsing is done
+        self.set_file_menu_components_enabled(False)
+        self.set_lms_file_components_enabled(False)
+        self.status_info(f"Loading {self.current_accessor.name}...")
+        self.lms_reader_thread = LmsAccessorReaderThread(self, self.current_accessor)
+        self.lms_reader_thread.finished.connect(self.on_accessor_loaded)
+        self.lms_reader_thread.start()
+
+    def on_accessor_loaded(self):
+        if not self.lms_reader_thread.has_exception:
+            self.populate_from_current_accessor()
+            self.status_info(f"Successfully loaded {self.current_accessor.name}.")
+        else:
+            exception = self.lms_reader_thread.exception
+            description = f"{self.current_accessor.name} couldn't be loaded because an error occurred:\n\n" \
+                          f"{repr(exception)}"
+            self.current_accessor = None
+            self.show_error_dialog(description)
+            self.status_error("An error occurred while loading the text file.")
+
+        del self.lms_reader_thread
+        self.set_lms_file_components_enabled(True)
+        self.set_file_menu_components_enabled(True)
+
+    def start_prefetch(self, lms_accessors: list[LMSAccessor], load_workers: int):
+        # Text files are parsed on demand without parallel workers, so let them parse the remaining ones in the meantime
+        if load_workers <= 1:
+            return
+
+        thread = LmsAccessorPrefetchThread(self, lms_accessors, self.adapter, load_workers)
+        thread.finished.connect(lambda: self.on_prefetch_finished(thread))
+        self.lms_prefetch_thread = thread
+        thread.start()
+
+    def on_prefetch_finished(self, thread: LmsAccessorPrefetchThread):
+        if thread is self.lms_prefetch_thread:
+            self.lms_prefetch_thread = None
+
+    def stop_prefetch(self, wait: bool = False):
+        if self.lms_prefetch_thread is None:
+            return
+
+        thread = self.lms_prefetch_thread
+        thread.requestInterruption()
+        thread.finished.disconnect()
+        thread.finished.connect(thread.deleteLater)
+        self.lms_prefetch_thread = None
+
+        if wait:
+            thread.wait()
+
+    def populate_from_current_accessor(self):
+        self.populate_messages_model()
+        self.populate_flowcharts_model()
+        self.set_message_components_enabled(True)
+        self.set_flowcharts_components_enabled(True)
 
     def on_message_selected(self):
         selection = self.listMessages.selectionModel().selection()
@@ -739,7 +1108,7 @@ class GalaxyMsbtEditor(QMainWindow):
         if len(selection.indexes()) != 1:
             return
 
-        label: str = self.model_message_names.data(selection.indexes()[0], 0)
+        label: str = self.model_message_filter.data(selection.indexes()[0], 0)
         self.current_message = self.current_accessor.get_message(label)
 
         self.populate_from_current_message()
@@ -803,17 +1172,12 @@ class GalaxyMsbtEditor(QMainWindow):
             self.show_error_dialog(f"No valid name specified!")
             return
 
-        # Check if label is already used
-        if not self.current_accessor.rename_message(old_label, new_label):
+        # Check if label is already used, the model updates the renamed row
+        if not self.model_message_names.rename_message(old_label, new_label):
             self.show_error_dialog(f"A message with the label {new_label} already exists!")
             return
 
-        # Update entry and model
-        self.current_message.label = new_label
-        self.unsaved_changes = True
-
-        row = self.model_message_names.stringList().index(old_label)
-        self.model_message_names.setData(self.model_message_names.index(row), new_label)
+        self.set_current_message_modified()
         self.lineChangeLabel.setText(new_label)
 
     def open_message_entry_text_editor(self):
@@ -821,7 +1185,7 @@ class GalaxyMsbtEditor(QMainWindow):
 
         if valid and result != self.current_message.text:
             self.current_message.text = result
-            self.unsaved_changes = True
+            self.set_current_message_modified()
 
             self.textMessageText.blockSignals(True)
             self.textMessageText.setPlainText(self.current_message.text)
@@ -829,40 +1193,280 @@ class GalaxyMsbtEditor(QMainWindow):
 
     def set_message_entry_talk_type(self, talk_type: int):
         self.current_message.attributes["talk_type"] = talk_type
-        self.unsaved_changes = True
+        self.set_current_message_modified()
 
     def set_message_entry_balloon_type(self, balloon_type: int):
         self.current_message.attributes["balloon_type"] = balloon_type
-        self.unsaved_changes = True
+        self.set_current_message_modified()
 
     def set_message_entry_sound_id(self, sound_id: int):
         self.current_message.attributes["sound_id"] = sound_id
-        self.unsaved_changes = True
+        self.set_current_message_modified()
 
     def set_message_entry_camera_type(self, camera_type: int):
         self.current_message.attributes["camera_type"] = camera_type
-        self.unsaved_changes = True
+        self.set_current_message_modified()
 
     def set_message_entry_camera_id(self, camera_id: int):
         self.current_message.attributes["camera_id"] = camera_id
-        self.unsaved_changes = True
+        self.set_current_message_modified()
 
     def set_message_entry_msg_link_id(self, msg_link_id: int):
         self.current_message.attributes["msg_link_id"] = msg_link_id
-        self.unsaved_changes = True
+        self.set_current_message_modified()
 
     def set_message_entry_unk_7(self, unk7: int):
         self.current_message.attributes["unk7"] = unk7
-        self.unsaved_changes = True
+        self.set_current_message_modified()
 
     def set_message_entry_text(self):
         self.current_message.text = self.textMessageText.toPlainText()
-        self.unsaved_changes = True
+        self.set_current_message_modified()
 
     def set_message_entry_comment(self):
         self.current_message.attributes["comment"] = self.textComment.toPlainText()
+        self.set_current_message_modified()
+
+    def set_current_message_modified(self):
+        self.current_accessor.mark_modified()
         self.unsaved_changes = True
 
+        accessor = self.current_accessor
+        message = self.current_message
+        archive_name = self.get_archive_name()
+        self.update_search_index(lambda index: index.update_message(accessor, message, archive_name))
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Searching all messages
+    # ------------------------------------------------------------------------------------------------------------------
+    def open_search_dialog(self):
+        if self.lms_accessors is None:
+            return
+
+        if self._gui_search_dialog_ is None:
+            self._gui_search_dialog_ = MessageSearchDialog(self)
+            self._gui_search_dialog_.result_selected.connect(self.select_search_result)
+
+        # Build the index on first use, this parses all text files that were not loaded yet
+        if self.search_index is None and self.search_index_thread is None:
+            thread = SearchIndexBuilderThread(self, self.get_archive_scope())
+            thread.finished.connect(lambda: self.on_search_index_built(thread))
+            self.search_index_thread = thread
+            thread.start()
+
+        self._gui_search_dialog_.set_index(self.search_index)
+        self._gui_search_dialog_.show()
+        self._gui_search_dialog_.raise_()
+        self._gui_search_dialog_.activateWindow()
+        self._gui_search_dialog_.lineSearchQuery.setFocus()
+
+    def on_search_index_built(self, thread: SearchIndexBuilderThread):
+        # Ignore threads that were stopped because the index was reset in the meantime
+        if thread is not self.search_index_thread:
+            return
+
+        self.search_index_thread = None
+
+        # Discard the index if another archive was opened in the meantime
+        if not self.is_current_scope(thread.scope):
+            self.pending_search_updates.clear()
+            return
+
+        if thread.has_exception:
+            self.pending_search_updates.clear()
+            self.show_error_dialog(f"Messages couldn't be indexed because an error occurred:\n\n"
+                                   f"{repr(thread.exception)}")
+            self._gui_search_dialog_.hide()
+            return
+
+        self.search_index = thread.search_index
+
+        for pending_update in self.pending_search_updates:
+            pending_update(self.search_index)
+
+        self.pending_search_updates.clear()
+        self._gui_search_dialog_.set_index(self.search_index)
+
+    def update_search_index(self, update):
+        if self.search_index is not None:
+            update(self.search_index)
+        elif self.search_index_thread is not None:
+            self.pending_search_updates.append(update)
+
+    def reset_search_index(self):
+        # Stop building the outdated index, so that the next search builds a new one right away
+        if self.search_index_thread is not None:
+            thread = self.search_index_thread
+            thread.requestInterruption()
+            thread.finished.disconnect()
+            thread.finished.connect(thread.deleteLater)
+            self.search_index_thread = None
+
+        self.search_index = None
+        self.pending_search_updates.clear()
+
+        if self._gui_search_dialog_ is not None:
+            self._gui_search_dialog_.hide()
+
+    def select_search_result(self, accessor: LMSAccessor, message: LMSMessage):
+        # Switch to the archive that holds the text file first
+        if accessor not in self.lms_accessors and self.workspace is not None:
+            for index, workspace_archive in enumerate(self.workspace):
+                if accessor in workspace_archive.lms_accessors:
+                    self.comboWorkspaceArchive.setCurrentIndex(index)
+                    break
+
+        if accessor not in self.lms_accessors:
+            return
+
+        # Select the text file first, its messages were loaded while indexing
+        if self.current_accessor is not accessor:
+            row = self.model_lms_accessor_names.stringList().index(accessor.name)
+            self.listLmsAccessors.setCurrentIndex(self.model_lms_accessor_names.index(row))
+
+        # Make sure the message is not hidden by the filter
+        if not self.model_message_filter.filterAcceptsRow(self.model_message_names.index_of(message.label).row(),
+                                                          QModelIndex()):
+            self.lineMessageFilter.clear()
+            self.apply_message_filter()
+
+        index = self.model_message_filter.mapFromSource(self.model_message_names.index_of(message.label))
+        self.listMessages.setCurrentIndex(index)
+        self.listMessages.scrollTo(index)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Replacing in all messages
+    # ------------------------------------------------------------------------------------------------------------------
+    def open_replace_dialog(self):
+        if self.lms_accessors is None:
+            return
+
+        if self._gui_replace_dialog_ is None:
+            self._gui_replace_dialog_ = MessageReplaceDialog(self)
+            self._gui_replace_dialog_.replace_requested.connect(self.replace_in_messages)
+
+        self._gui_replace_dialog_.show()
+        self._gui_replace_dialog_.raise_()
+        self._gui_replace_dialog_.activateWindow()
+        self._gui_replace_dialog_.lineReplaceFind.setFocus()
+
+    def replace_in_messages(self, rule: ReplaceRule, dry_run: bool):
+        if self.lms_accessors is None or self.replace_thread is not None:
+            return
+
+        # The changes are determined in the background, this parses all text files that were not loaded yet
+        self.replace_thread = MessageReplaceThread(self, self.get_archive_scope(), self.adapter, rule, dry_run)
+        self.replace_thread.finished.connect(self.on_replace_finished)
+        self.replace_thread.start()
+
+    def on_replace_finished(self):
+        thread = self.replace_thread
+        self.replace_thread = None
+
+        # Discard the changes if another archive was opened in the meantime
+        if not self.is_current_scope(thread.scope):
+            self._gui_replace_dialog_.set_busy(False)
+            return
+
+        if thread.has_exception:
+            self._gui_replace_dialog_.show_error(f"Messages couldn't be processed: {repr(thread.exception)}")
+            return
+
+        changes = thread.changes
+
+        if not thread.dry_run:
+            changes = self.apply_replace_changes(changes)
+
+        self._gui_replace_dialog_.show_changes(changes, thread.dry_run)
+
+    def apply_replace_changes(self, changes: list[ReplaceChange]) -> list[ReplaceChange]:
+        # Messages edited while the changes were determined are skipped
+        accessors = {(archive_name, lms_accessor.name): lms_accessor
+                     for archive_name, lms_accessors in self.get_archive_scope() for lms_accessor in lms_accessors}
+        applied_changes = []
+
+        for change in changes:
+            accessor = accessors.get((change.archive, change.file))
+
+            try:
+                message = accessor.get_message(change.label) if accessor is not None else None
+            except KeyError:
+                message = None
+
+            if message is None or message.text != change.old_text:
+                continue
+
+            message.text = change.new_text
+            accessor.mark_modified()
+            archive_name = change.archive
+            self.update_search_index(lambda index, a=accessor, m=message, n=archive_name: index.update_message(a, m, n))
+            applied_changes.append(change)
+
+            if message is self.current_message:
+                self.textMessageText.blockSignals(True)
+                self.textMessageText.setPlainText(message.text)
+                self.textMessageText.blockSignals(False)
+
+        if len(applied_changes) > 0:
+            self.unsaved_changes = True
+
+        return applied_changes
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Validating all messages
+    # ------------------------------------------------------------------------------------------------------------------
+    def open_validation_dialog(self):
+        if self.lms_accessors is None:
+            return
+
+        if self._gui_validation_dialog_ is None:
+            self._gui_validation_dialog_ = MessageValidationDialog(self)
+            self._gui_validation_dialog_.validation_requested.connect(self.validate_messages)
+            self._gui_validation_dialog_.issue_selected.connect(self.select_validation_issue)
+
+        self._gui_validation_dialog_.show()
+        self._gui_validation_dialog_.raise_()
+        self._gui_validation_dialog_.activateWindow()
+        self.validate_messages()
+
+    def validate_messages(self):
+        if self.lms_accessors is None or self.validation_thread is not None:
+            return
+
+        # The messages are checked in the background, this parses all text files that were not loaded yet
+        self._gui_validation_dialog_.set_busy()
+        self.validation_thread = MessageValidationThread(self, self.get_archive_scope(), self.adapter)
+        self.validation_thread.finished.connect(self.on_validation_finished)
+        self.validation_thread.start()
+
+    def on_validation_finished(self):
+        thread = self.validation_thread
+        self.validation_thread = None
+
+        # Discard the issues if another archive was opened in the meantime
+        if not self.is_current_scope(thread.scope):
+            self._gui_validation_dialog_.show_issues([], thread.elapsed_ms)
+            return
+
+        if thread.has_exception:
+            self._gui_validation_dialog_.show_error(f"Messages couldn't be checked: {repr(thread.exception)}")
+            return
+
+        self._gui_validation_dialog_.show_issues(thread.issues, thread.elapsed_ms)
+
+    def select_validation_issue(self, issue: ValidationIssue):
+        self.select_search_result(issue.accessor, issue.message)
+
+        if self.current_message is not issue.message:
+            return
+
+        # Highlight the offending part of the text
+        cursor = self.textMessageText.textCursor()
+        cursor.setPosition(min(issue.position, len(issue.message.text)))
+        cursor.setPosition(min(issue.position + issue.length, len(issue.message.text)), QTextCursor.KeepAnchor)
+        self.textMessageText.setTextCursor(cursor)
+        self.textMessageText.setFocus()
+
     # ------------------------------------------------------------------------------------------------------------------
     # Dialogs & prompts
     # ------------------------------------------------------------------------------------------------------------------
@@ -933,13 +1537,188 @@ class RarcReaderThread(WorkerThread):
         self.arc_path: str = arc_path
         self.archive: JKRArchive | None = None
         self.lms_accessors: list[LMSAccessor] = []
+        self.load_workers: int = SettingsHolder.get_load_workers()
+        self.lazy_load: bool = SettingsHolder.is_lazy_load()
+        self.reuse_binary: bool = SettingsHolder.is_reuse_binary()
 
     def run(self):
         try:
-            self.archive = pyjkernel.from_archive_file(self.arc_path)
+            self.archive = read_archive_file(self.arc_path)
+            self.lms_accessors = load_lms_accessors(self.archive, self.adapter, self.load_workers, self.lazy_load,
+                                                    self.reuse_binary)
+        except Exception as e:
+            self._exception_ = e
 
-            for file in filter(lambda f: f.name.endswith(".msbt"), self.archive.list_files(self.archive.root_name)):
-                self.lms_accessors.append(LMSAccessor(file.name.removesuffix(".msbt"), self.archive, self.adapter))
+
+class LmsAccessorReaderThread(WorkerThread):
+    def __init__(self, parent: QMainWindow, lms_accessor: LMSAccessor):
+        super().__init__(parent)
+        self.lms_accessor: LMSAccessor = lms_accessor
+
+    def run(self):
+        try:
+            self.lms_accessor.load()
+        except Exception as e:
+            self._exception_ = e
+
+
+class LmsAccessorPrefetchThread(WorkerThread):
+    def __init__(self, parent: QMainWindow, lms_accessors: list[LMSAccessor], adapter: type[SuperMarioGalaxy2Adapter],
+                 load_workers: int):
+        super().__init__(parent)
+        self.lms_accessors: list[LMSAccessor] = lms_accessors
+        self.adapter: type[SuperMarioGalaxy2Adapter] = adapter
+        self.load_workers: int = load_workers
+
+    def run(self):
+        prefetched = prefetch_lms_accessors(self.lms_accessors, self.adapter, self.load_workers)
+
+        try:
+            for _ in prefetched:
+                if self.check_cancelled():
+                    break
+        except Exception as e:
+            self._exception_ = e
+        finally:
+            prefetched.close()
+
+
+class SearchIndexBuilderThread(WorkerThread):
+    def __init__(self, parent: QMainWindow, scope: list[tuple[str, list[LMSAccessor]]]):
+        super().__init__(parent)
+        self.scope: list[tuple[str, list[LMSAccessor]]] = scope
+        self.search_index: MessageSearchIndex = MessageSearchIndex()
+
+    def run(self):
+        try:
+            for archive_name, lms_accessors in self.scope:
+                for lms_accessor in list(lms_accessors):
+                    if self.check_cancelled():
+                        return
+
+                    self.search_index.add_accessor(lms_accessor, archive_name)
+        except Exception as e:
+            self._exception_ = e
+
+
+class MessageReplaceThread(WorkerThread):
+    def __init__(self, parent: QMainWindow, scope: list[tuple[str, list[LMSAccessor]]],
+                 adapter: type[SuperMarioGalaxy2Adapter], rule: ReplaceRule, dry_run: bool):
+        super().__init__(parent)
+        self.scope: list[tuple[str, list[LMSAccessor]]] = scope
+        self.adapter: type[SuperMarioGalaxy2Adapter] = adapter
+        self.rule: ReplaceRule = rule
+        self.dry_run: bool = dry_run
+        self.changes: list[ReplaceChange] = []
+        self.replace_workers: int = SettingsHolder.get_load_workers()
+
+    def run(self):
+        # All archives of the workspace share one pool of worker processes
+        executor = create_parse_pool(self.adapter, self.replace_workers) if self.replace_workers > 1 else None
+
+        try:
+            # Nothing is changed here, the main thread applies the changes to avoid interfering with edits
+            for archive_name, lms_accessors in self.scope:
+                self.changes += replace_in_accessors(list(lms_accessors), [self.rule], True, self.replace_workers,
+                                                     archive_name, executor)
+        except Exception as e:
+            self._exception_ = e
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+
+class MessageValidationThread(WorkerThread):
+    def __init__(self, parent: QMainWindow, scope: list[tuple[str, list[LMSAccessor]]],
+                 adapter: type[SuperMarioGalaxy2Adapter]):
+        super().__init__(parent)
+        self.scope: list[tuple[str, list[LMSAccessor]]] = scope
+        self.adapter: type[SuperMarioGalaxy2Adapter] = adapter
+        self.issues: list[ValidationIssue] = []
+        self.elapsed_ms: float = 0.0
+        self.validation_workers: int = SettingsHolder.get_load_workers()
+
+    def run(self):
+        start_time = time.perf_counter()
+
+        # All archives of the workspace share one pool of worker processes
+        executor = create_parse_pool(self.adapter, self.validation_workers) if self.validation_workers > 1 else None
+
+        try:
+            for archive_name, lms_accessors in self.scope:
+                self.issues += validate_accessors(list(lms_accessors), self.adapter, self.validation_workers,
+                                                  archive_name, executor)
+
+            self.elapsed_ms = (time.perf_counter() - start_time) * 1000
+        except Exception as e:
+            self._exception_ = e
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+
+class WorkspaceReaderThread(WorkerThread):
+    def __init__(self, parent: QMainWindow, arc_paths: list[str], adapter: type[SuperMarioGalaxy2Adapter]):
+        super().__init__(parent)
+        self.adapter: type[SuperMarioGalaxy2Adapter] = adapter
+        self.arc_paths: list[str] = arc_paths
+        self.workspace_archives: list[WorkspaceArchive] = []
+        self.failures: list[tuple[str, Exception]] = []
+        self.load_workers: int = SettingsHolder.get_load_workers()
+        self.lazy_load: bool = SettingsHolder.is_lazy_load()
+        self.reuse_binary: bool = SettingsHolder.is_reuse_binary()
+
+    def run(self):
+        try:
+            total_steps = len(self.arc_paths)
+            self.report_progress("Loading archives...", 0, total_steps)
+            loaded = load_workspace_archives(self.arc_paths, self.adapter, self.load_workers, self.lazy_load,
+                                             self.reuse_binary)
+
+            for step, (arc_path, result) in enumerate(loaded, 1):
+                if isinstance(result, Exception):
+                    self.failures.append((arc_path, result))
+                else:
+                    self.workspace_archives.append(result)
+
+                self.report_progress(f"Loaded {os.path.basename(arc_path)}", step, total_steps)
+
+            # Keep the order of the folder, regardless of which archive was loaded first
+            self.workspace_archives.sort(key=lambda w: self.arc_paths.index(w.arc_path))
+        except Exception as e:
+            self._exception_ = e
+
+
+class WorkspaceWriterThread(WorkerThread):
+    def __init__(self, parent: QMainWindow, workspace_archives: list[WorkspaceArchive]):
+        super().__init__(parent)
+        self.workspace_archives: list[WorkspaceArchive] = workspace_archives
+        self.saved_archives: list[WorkspaceArchive] = []
+        self.failures: list[tuple[WorkspaceArchive, Exception]] = []
+        self.compress_rarc: bool = SettingsHolder.is_compress_arc()
+        self.compression_level: str = SettingsHolder.get_compression_level()
+        self.save_workers: int = SettingsHolder.get_load_workers()
+
+    def run(self):
+        try:
+            compression = JKRCompression.SZS if self.compress_rarc else JKRCompression.NONE
+            total_steps = len(self.workspace_archives)
+            self.report_progress("Saving archives...", 0, total_steps)
+            saved = save_workspace_archives(self.workspace_archives, compression, self.compression_level,
+                                            self.save_workers)
+
+            for step, (workspace_archive, exception) in enumerate(saved, 1):
+                if exception is None:
+                    self.saved_archives.append(workspace_archive)
+                else:
+                    self.failures.append((workspace_archive, exception))
+
+                self.report_progress(f"Saving archives... {step} of {total_steps} done", step, total_steps)
+
+                # Archives that are already being written are finished, the remaining ones are skipped
+                if self.check_cancelled():
+                    saved.close()
+                    return
         except Exception as e:
             self._exception_ = e
 
@@ -950,14 +1729,45 @@ class RarcWriterThread(WorkerThread):
         self.arc_path: str = arc_path
         self.archive: JKRArchive = archive
         self.lms_accessors: list[LMSAccessor] = lms_accessors
+        self.encoded_accessors: list[LMSAccessor] = []  # Accessors that were saved, whether the file was written or not
         self.compress_rarc: bool = SettingsHolder.is_compress_arc()
+        self.compression_level: str = SettingsHolder.get_compression_level()
 
     def run(self):
         try:
+            # Encode text files, build RARC, compress (optional) and write
+            total_steps = len(self.lms_accessors) + (4 if self.compress_rarc else 3)
+            step = 0
+
             for lms_accessor in self.lms_accessors:
+                if self.check_cancelled():
+                    return
+
+                self.report_progress(f"Encoding {lms_accessor.name}...", step, total_steps)
+                self.encoded_accessors.append(lms_accessor)
                 lms_accessor.save()
+                step += 1
 
-            compression = JKRCompression.SZS if self.compress_rarc else JKRCompression.NONE
-            pyjkernel.write_archive_file(self.archive, self.arc_path, compression=compression)
+            if self.check_cancelled():
+                return
+
+            self.report_progress("Building archive...", step, total_steps)
+            buffer = pack_archive(self.archive)
+            step += 1
+
+            if self.compress_rarc:
+                if self.check_cancelled():
+                    return
+
+                self.report_progress("Compressing archive...", step, total_steps)
+                buffer = compress_archive_buffer(buffer, JKRCompression.SZS, self.compression_level)
+                step += 1
+
+            if self.check_cancelled():
+                return
+
+            self.report_progress("Writing archive...", step, total_steps)
+            write_file_atomic(self.arc_path, buffer)
+            self.report_progress("Done", total_steps, total_steps)
         except Exception as e:
             self._exception_ = e
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+from pymsb import LMSMessage, LMSException
+from msbtaccess import LMSAccessor
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSortFilterProxyModel
+
+__all__ = ["MessageListModel", "MessageFilterProxyModel"]
+
+
+class MessageListModel(QAbstractListModel):
+    """
+    A list model that reflects the labels of an accessor's messages. It reads the labels directly from the accessor's
+    list of messages, so nothing has to be copied when an accessor is selected. All changes to the list of messages
+    have to go through this model, which emits the fine-grained signals that views need to update only affected rows.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._accessor_: LMSAccessor | None = None
+        self._search_keys_: dict[LMSMessage, tuple[str, str, str, str]] = {}  # Label, text and their lowercase forms
+        self._rows_: dict[LMSMessage, int] = {}  # Rows of the messages, only valid below the number of indexed rows
+        self._indexed_rows_: int = 0             # Number of leading rows whose entries in the row index are valid
+
+    @property
+    def accessor(self) -> LMSAccessor | None:
+        return self._accessor_
+
+    def set_accessor(self, accessor: LMSAccessor | None):
+        """
+        Replaces the accessor whose messages are reflected by this model. None clears the model. The lowercase labels
+        and texts that the filter searches are computed here once, so that filtering doesn't have to compute them for
+        every message.
+
+        :param accessor: the accessor, or None.
+        """
+        self.beginResetModel()
+        self._accessor_ = accessor
+        self._search_keys_.clear()
+        self._reset_rows_()
+
+        if accessor is not None:
+            for message in accessor.messages:
+                self._search_keys_[message] = _create_search_key_(message)
+
+        self.endResetModel()
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid() or self._accessor_ is None:
+            return 0
+
+        return len(self._accessor_.messages)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid() or self._accessor_ is None:
+            return None
+        if role == Qt.DisplayRole or role == Qt.EditRole:
+            return self._accessor_.messages[index.row()].label
+
+        return None
+
+    def message_at(self, index: QModelIndex) -> LMSMessage:
+        return self._accessor_.messages[index.row()]
+
+    def index_of(self, label: str) -> QModelIndex:
+        """
+        Retrieves the model index of the message with the specified label. If there's no associated message, a KeyError
+        will be thrown.
+
+        :param label: the message's label.
+        :return: the model index.
+        """
+        return self.index(self._row_of_(self._accessor_.get_message(label)))
+
+    def matches_filter(self, row: int, filter_text: str, include_text: bool) -> bool:
+        """
+        Checks if the message in the specified row contains the lowercase filter text in its label, or in its text if
+        include_text is True. The lowercase label and text are computed once and reused until the message changes.
+
+        :param row: the message's row.
+        :param filter_text: the lowercase text to search for.
+        :param include_text: True if the message's text should be searched as well.
+        :return: True if the message matches the filter.
+        """
+        message = self._accessor_.messages[row]
+        search_key = self._search_keys_.get(message)
+
+        if search_key is None or search_key[0] != message.label or search_key[1] != message.text:
+            search_key = _create_search_key_(message)
+            self._search_keys_[message] = search_key
+
+        return filter_text in search_key[2] or (include_text and filter_text in search_key[3])
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def new_message(self, label: str) -> LMSMessage:
+        """
+        Creates a new message using the given label and appends its row. If a message with the same label already
+        exists, an LMSException will be thrown.
+
+        :param label: the new message's label.
+        :return: the new message entry.
+        """
+        try:
+            self._accessor_.get_message(label)
+        except KeyError:
+            pass
+        else:
+            raise LMSException(f"A message with the label {label} already exists!")
+
+        row = len(self._accessor_.messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        message = self._accessor_.new_message(label)
+        self.endInsertRows()
+        return message
+
+    def delete_message(self, label: str) -> bool:
+        """
+        Tries to delete the message with the specified label and removes its row. If the message is referenced by a flow
+        node, nothing is removed. If there's no message with such label, a KeyError will be thrown.
+
+        :param label: the message's label.
+        :return: True if the message was deleted, otherwise False.
+        """
+        if self._accessor_.is_message_referenced(label):
+            return False
+
+        message = self._accessor_.get_message(label)
+        row = self._row_of_(message)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._search_keys_.pop(message, None)
+        self._accessor_.delete_message(label, row)
+
+        # The rows of all following messages moved up, so they have to be indexed again when they are looked up
+        self._rows_.pop(message, None)
+        self._indexed_rows_ = min(self._indexed_rows_, row)
+        self.endRemoveRows()
+        return True
+
+    def rename_message(self, old_label: str, new_label: str) -> bool:
+        """
+        Tries to rename the message with the specified label and updates its row. See ``LMSAccessor.rename_message``.
+
+        :param old_label: the label of the message whose name should be renamed.
+        :param new_label: the new name.
+        :return: True if the labels are the same or if renaming was successful, otherwise False.
+        """
+        if not self._accessor_.rename_message(old_label, new_label):
+            return False
+
+        index = self.index_of(new_label)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        return True
+
+    def sort_messages(self):
+        """
+        Sorts the messages by their labels and moves the rows accordingly, keeping selections on the same messages.
+        """
+        self.layoutAboutToBeChanged.emit()
+
+        # Remember which message every persistent index points to, so that they can be moved along
+        messages = self._accessor_.messages
+        persistent_indexes = self.persistentIndexList()
+        persistent_messages = [messages[index.row()] for index in persistent_indexes]
+
+        self._accessor_.sort_messages()
+
+        rows = {message: row for row, message in enumerate(messages)}
+        new_indexes = [self.index(rows[message]) for message in persistent_messages]
+        self.changePersistentIndexList(persistent_indexes, new_indexes)
+        self._reset_rows_()
+        self.layoutChanged.emit()
+
+    # ------------------------------------------------------------------------------------------------------------------
+
+    def _reset_rows_(self):
+        self._rows_.clear()
+        self._indexed_rows_ = 0
+
+    def _row_of_(self, message: LMSMessage) -> int:
+        row = self._rows_.get(message)
+
+        if row is not None and row < self._indexed_rows_:
+            return row
+
+        # Index the following rows until the message is found. Removing messages only invalidates the rows after the
+        # lowest removed one, so removing many messages doesn't have to index all messages again every time.
+        messages = self._accessor_.messages
+
+        while self._indexed_rows_ < len(messages):
+            row = self._indexed_rows_
+            current_message = messages[row]
+            self._rows_[current_message] = row
+            self._indexed_rows_ += 1
+
+            if current_message is message:
+                return row
+
+        raise KeyError(f"No row for message labeled {message.label} found!")
+
+
+class MessageFilterProxyModel(QSortFilterProxyModel):
+    """
+    A proxy model that only shows the messages of a ``MessageListModel`` whose labels, and optionally texts, contain
+    the filter text. Letter case is ignored. The source model's order is kept.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._filter_text_: str = ""
+        self._include_text_: bool = False
+
+    def set_filter(self, filter_text: str, include_text: bool):
+        """
+        Replaces the filter and updates the visible rows if the filter changed.
+
+        :param filter_text: the text to search for, or an empty string to show all messages.
+        :param include_text: True if the messages' text should be searched as well.
+        """
+        filter_text = filter_text.strip().lower()
+
+        if filter_text == self._filter_text_ and include_text == self._include_text_:
+            return
+
+        self._filter_text_ = filter_text
+        self._include_text_ = include_text
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        if self._filter_text_ == "":
+            return True
+
+        return self.sourceModel().matches_filter(source_row, self._filter_text_, self._include_text_)
+
+
+def _create_search_key_(message: LMSMessage) -> tuple[str, str, str, str]:
+    return message.label, message.text, message.label.lower(), message.text.lower()
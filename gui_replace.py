@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from msbtreplace import ReplaceRule, ReplaceChange
+from guihelpers import resolve_asset
+from pymsb import LMSException
+from PyQt5 import uic
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import Qt, pyqtSignal
+
+__all__ = ["MessageReplaceDialog"]
+
+
+class MessageReplaceDialog(QDialog):
+    replace_requested = pyqtSignal(object, bool)  # Rule, dry run
+    __MAX_LISTED_CHANGES__ = 1000
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent)
+
+        # --------------------------------------------------------------------------------------------------------------
+        # Variable declarations
+
+        self.lineReplaceFind: QLineEdit = None
+        self.lineReplaceWith: QLineEdit = None
+        self.checkReplaceTags: QCheckBox = None
+        self.listReplaceChanges: QListWidget = None
+        self.labelReplaceStatus: QLabel = None
+        self.buttonReplacePreview: QPushButton = None
+        self.buttonReplaceAll: QPushButton = None
+
+        # --------------------------------------------------------------------------------------------------------------
+
+        self._ui_ = uic.loadUi(resolve_asset("assets/dialog_replace.ui"), self)
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
+
+        self.buttonReplacePreview.clicked.connect(lambda: self.request_replace(True))
+        self.buttonReplaceAll.clicked.connect(lambda: self.request_replace(False))
+        self.lineReplaceFind.textChanged.connect(self.clear_changes)
+        self.lineReplaceWith.textChanged.connect(self.clear_changes)
+        self.checkReplaceTags.toggled.connect(self.clear_changes)
+
+    def request_replace(self, dry_run: bool):
+        rule = ReplaceRule(self.lineReplaceFind.text(), self.lineReplaceWith.text(), self.checkReplaceTags.isChecked())
+
+        try:
+            rule.validate()
+        except LMSException as e:
+            self.labelReplaceStatus.setText(str(e))
+            return
+
+        self.set_busy(True)
+        self.replace_requested.emit(rule, dry_run)
+
+    def set_busy(self, busy: bool):
+        """
+        Disables the inputs while messages are being processed.
+
+        :param busy: True if messages are being processed.
+        """
+        self.buttonReplacePreview.setEnabled(not busy)
+        self.buttonReplaceAll.setEnabled(not busy)
+
+        if busy:
+            self.listReplaceChanges.clear()
+            self.labelReplaceStatus.setText("Processing messages...")
+
+    def show_changes(self, changes: list[ReplaceChange], dry_run: bool):
+        """
+        Lists the changed messages and enables the inputs again.
+
+        :param changes: the changed messages.
+        :param dry_run: True if the changes were only previewed.
+        """
+        self.set_busy(False)
+        self.listReplaceChanges.clear()
+
+        for change in changes[:self.__MAX_LISTED_CHANGES__]:
+            prefix = f"{change.archive}: " if change.archive != "" else ""
+            self.listReplaceChanges.addItem(f"{prefix}{change.file}: {change.label} ({change.count})")
+
+        replaced_count = sum(change.count for change in changes)
+        verb = "would be replaced" if dry_run else "replaced"
+        status = f"{replaced_count} occurrences in {len(changes)} messages {verb}."
+
+        if len(changes) > self.__MAX_LISTED_CHANGES__:
+            status += f" Showing the first {self.__MAX_LISTED_CHANGES__} messages."
+
+        self.labelReplaceStatus.setText(status)
+
+    def show_error(self, cause: str):
+        self.set_busy(False)
+        self.labelReplaceStatus.setText(cause)
+
+    def clear_changes(self):
+        if self.buttonReplaceAll.isEnabled():
+            self.listReplaceChanges.clear()
+            self.labelReplaceStatus.setText("")
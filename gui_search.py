@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import time
+
+from msbtsearch import SearchHit, MessageSearchIndex
+from guihelpers import resolve_asset
+from PyQt5 import uic
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+
+__all__ = ["MessageSearchDialog"]
+
+
+class MessageSearchDialog(QDialog):
+    result_selected = pyqtSignal(object, object)  # Accessor, message
+    __MAX_RESULTS__ = 1000
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent)
+
+        # --------------------------------------------------------------------------------------------------------------
+        # Variable declarations
+
+        self.lineSearchQuery: QLineEdit = None
+        self.checkSearchLabels: QCheckBox = None
+        self.checkSearchText: QCheckBox = None
+        self.listSearchResults: QListWidget = None
+        self.labelSearchStatus: QLabel = None
+
+        self._index_: MessageSearchIndex | None = None
+        self._hits_: list[SearchHit] = []
+        self._search_timer_: QTimer = QTimer(self)
+
+        # --------------------------------------------------------------------------------------------------------------
+
+        self._ui_ = uic.loadUi(resolve_asset("assets/dialog_search.ui"), self)
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
+
+        # Search shortly after typing stopped
+        self._search_timer_.setSingleShot(True)
+        self._search_timer_.setInterval(150)
+        self._search_timer_.timeout.connect(self.run_search)
+        self.lineSearchQuery.textChanged.connect(self._search_timer_.start)
+        self.checkSearchLabels.toggled.connect(self.run_search)
+        self.checkSearchText.toggled.connect(self.run_search)
+        self.listSearchResults.itemActivated.connect(self.on_result_activated)
+
+    def set_index(self, index: MessageSearchIndex | None):
+        """
+        Replaces the search index and repeats the current search. None means that the index is still being built.
+
+        :param index: the search index, or None.
+        """
+        self._index_ = index
+        self.run_search()
+
+    def run_search(self):
+        self._search_timer_.stop()
+        self.listSearchResults.clear()
+        self._hits_ = []
+
+        if self._index_ is None:
+            self.labelSearchStatus.setText("Building search index...")
+            return
+
+        query = self.lineSearchQuery.text()
+
+        if query == "":
+            self.labelSearchStatus.setText(f"{len(self._index_)} messages indexed.")
+            return
+
+        start_time = time.perf_counter()
+        hits = self._index_.search(query, self.checkSearchLabels.isChecked(), self.checkSearchText.isChecked(),
+                                   self.__MAX_RESULTS__ + 1)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        self._hits_ = hits[:self.__MAX_RESULTS__]
+
+        for hit in self._hits_:
+            prefix = f"{hit.archive}: " if hit.archive != "" else ""
+            self.listSearchResults.addItem(f"{prefix}{hit.accessor.name}: {hit.message.label}")
+
+        if len(hits) > self.__MAX_RESULTS__:
+            self.labelSearchStatus.setText(f"More than {self.__MAX_RESULTS__} results in {elapsed_ms:.1f} ms, "
+                                           f"showing the first {self.__MAX_RESULTS__}.")
+        else:
+            self.labelSearchStatus.setText(f"{len(hits)} results in {elapsed_ms:.1f} ms.")
+
+    def on_result_activated(self, item: QListWidgetItem):
+        hit = self._hits_[self.listSearchResults.row(item)]
+        self.result_selected.emit(hit.accessor, hit.message)
@@ -4,16 +4,19 @@ import os
 import sys
 
 from adapter_smg2 import SuperMarioGalaxy2Adapter
-from guihelpers import resolve_asset, PROGRAM_TITLE
+from msbtvalidate import TextIssue, TextValidator
+from guihelpers import WorkerThread, resolve_asset, PROGRAM_TITLE
 from PyQt5 import uic
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QColor, QIcon, QTextCharFormat, QTextCursor
 
 __all__ = ["GalaxyTextEditor"]
 
 
 class GalaxyTextEditor(QDialog):
+    __MAX_MARKED_ISSUES__ = 100
+
     def __init__(self, parent: QMainWindow, adapter_maker: type[SuperMarioGalaxy2Adapter]):
         super().__init__(parent)
 
@@ -21,8 +24,13 @@ class GalaxyTextEditor(QDialog):
         # Variable declarations
 
         self._adapter_maker_: type[SuperMarioGalaxy2Adapter] = None
+        self._validator_: TextValidator = None                      # Only used by one validation thread at a time
+        self._validation_timer_: QTimer = QTimer(self)
+        self._validation_thread_: TextValidationThread = None
+        self._validation_revision_: int = 0                        # Incremented whenever the text changes
 
         self.textMessageText: QPlainTextEdit = None
+        self.labelTextStatus: QLabel = None
         self.buttonTagPageBreak: QToolButton = None
         self.buttonTagTextSize: QToolButton = None
         self.buttonTagTextColor: QToolButton = None
@@ -47,6 +55,13 @@ class GalaxyTextEditor(QDialog):
         self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
 
         self._adapter_maker_ = adapter_maker
+        self._validator_ = TextValidator(adapter_maker)
+
+        # Validate the text once the user stopped typing for a moment, so that long texts don't slow down typing
+        self._validation_timer_.setSingleShot(True)
+        self._validation_timer_.setInterval(300)
+        self._validation_timer_.timeout.connect(self._start_validation_)
+        self.textMessageText.textChanged.connect(self._on_text_changed_)
 
         self.buttonBox.accepted.connect(self.accept)
         self.buttonBox.rejected.connect(self.reject)
@@ -69,12 +84,71 @@ class GalaxyTextEditor(QDialog):
     def request(self, label: str, message: str) -> tuple[str, bool]:
         self.setWindowTitle(f"Editing {label}")
         self.textMessageText.setPlainText(message)
+        self.textMessageText.setExtraSelections([])
+        self.labelTextStatus.setText("")
+        self._validation_timer_.stop()
+        self._start_validation_()
         self.exec()
 
         edited_text = self.textMessageText.toPlainText()
         valid = self.result() == QDialog.Accepted
         return edited_text, valid
 
+    # ------------------------------------------------------------------------------------------------------------------
+    # Live validation
+    # ------------------------------------------------------------------------------------------------------------------
+    def _on_text_changed_(self):
+        self._validation_revision_ += 1
+        self._validation_timer_.start()
+
+    def _start_validation_(self):
+        # Only one text is validated at a time, the latest text will be validated once the current run finished
+        if self._validation_thread_ is not None:
+            return
+
+        self._validation_thread_ = TextValidationThread(self, self._validator_, self.textMessageText.toPlainText(),
+                                                        self._validation_revision_)
+        self._validation_thread_.finished.connect(self._on_validation_finished_)
+        self._validation_thread_.start()
+
+    def _on_validation_finished_(self):
+        thread = self._validation_thread_
+        self._validation_thread_ = None
+
+        # Discard outdated results. Validate the latest text right away if the timer expired in the meantime
+        if thread.revision != self._validation_revision_:
+            if not self._validation_timer_.isActive():
+                self._start_validation_()
+            return
+
+        if thread.has_exception:
+            self.textMessageText.setExtraSelections([])
+            self.labelTextStatus.setText(f"Text couldn't be validated: {repr(thread.exception)}")
+            return
+
+        underline_format = QTextCharFormat()
+        underline_format.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+        underline_format.setUnderlineColor(QColor(Qt.red))
+        selections = []
+
+        for position, length in thread.ranges[:self.__MAX_MARKED_ISSUES__]:
+            selection = QTextEdit.ExtraSelection()
+            selection.format = underline_format
+            selection.cursor = QTextCursor(self.textMessageText.document())
+            selection.cursor.setPosition(position)
+            selection.cursor.setPosition(position + length, QTextCursor.KeepAnchor)
+            selections.append(selection)
+
+        self.textMessageText.setExtraSelections(selections)
+        status = f"Estimated size: {thread.encoded_size} bytes"
+
+        if len(thread.issues) == 1:
+            status += f", 1 issue: {thread.issues[0].description}"
+        elif len(thread.issues) > 1:
+            status += f", {len(thread.issues)} issues, first: {thread.issues[0].description}"
+
+        self.labelTextStatus.setText(status)
+
     # ------------------------------------------------------------------------------------------------------------------
     # Event handlers
     # ------------------------------------------------------------------------------------------------------------------
@@ -360,3 +434,34 @@ class StringVarDialog(QDialog):
             default_pointer = 0
 
         return tag_id, argument_idx, default_pointer, valid
+
+
+class TextValidationThread(WorkerThread):
+    def __init__(self, parent: QWidget, validator: TextValidator, text: str, revision: int):
+        super().__init__(parent)
+        self.validator: TextValidator = validator
+        self.text: str = text
+        self.revision: int = revision
+        self.issues: list[TextIssue] = []
+        self.ranges: list[tuple[int, int]] = []  # The issues' positions and lengths in UTF-16 code units
+        self.encoded_size: int = 0
+
+    def run(self):
+        try:
+            self.issues, self.encoded_size = self.validator.validate(self.text)
+
+            # Qt counts UTF-16 code units, so characters outside the BMP occupy two positions in the document
+            utf16_position = 0
+            previous_position = 0
+
+            for issue in self.issues:
+                utf16_position += _get_utf16_length_(self.text[previous_position:issue.position])
+                utf16_length = _get_utf16_length_(self.text[issue.position:issue.position + issue.length])
+                self.ranges.append((utf16_position, utf16_length))
+                previous_position = issue.position
+        except Exception as e:
+            self._exception_ = e
+
+
+def _get_utf16_length_(text: str) -> int:
+    return len(text.encode("utf-16-le", errors="surrogatepass")) // 2
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from msbtvalidate import ValidationIssue
+from guihelpers import resolve_asset
+from PyQt5 import uic
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import Qt, pyqtSignal
+
+__all__ = ["MessageValidationDialog"]
+
+
+class MessageValidationDialog(QDialog):
+    validation_requested = pyqtSignal()
+    issue_selected = pyqtSignal(object)  # Validation issue
+    __MAX_LISTED_ISSUES__ = 1000
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent)
+
+        # --------------------------------------------------------------------------------------------------------------
+        # Variable declarations
+
+        self.listValidationIssues: QListWidget = None
+        self.labelValidationStatus: QLabel = None
+        self.buttonValidateAgain: QPushButton = None
+
+        self._issues_: list[ValidationIssue] = []
+
+        # --------------------------------------------------------------------------------------------------------------
+
+        self._ui_ = uic.loadUi(resolve_asset("assets/dialog_validate.ui"), self)
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
+
+        self.buttonValidateAgain.clicked.connect(self.validation_requested.emit)
+        self.listValidationIssues.itemActivated.connect(self.on_issue_activated)
+
+    def set_busy(self):
+        """Clears the listed issues and disables checking again while messages are being checked."""
+        self._issues_ = []
+        self.listValidationIssues.clear()
+        self.buttonValidateAgain.setEnabled(False)
+        self.labelValidationStatus.setText("Checking messages...")
+
+    def show_issues(self, issues: list[ValidationIssue], elapsed_ms: float):
+        """
+        Lists the issues and enables checking again.
+
+        :param issues: the issues that were found.
+        :param elapsed_ms: the time it took to check all messages in milliseconds.
+        """
+        self._issues_ = issues[:self.__MAX_LISTED_ISSUES__]
+        self.listValidationIssues.clear()
+        self.buttonValidateAgain.setEnabled(True)
+
+        for issue in self._issues_:
+            prefix = f"{issue.archive}: " if issue.archive != "" else ""
+            self.listValidationIssues.addItem(f"{prefix}{issue.accessor.name}: {issue.message.label}: "
+                                              f"position {issue.position}: {issue.description}")
+
+        if len(issues) == 0:
+            self.labelValidationStatus.setText(f"No issues found in {elapsed_ms:.1f} ms.")
+        elif len(issues) > self.__MAX_LISTED_ISSUES__:
+            self.labelValidationStatus.setText(f"{len(issues)} issues found in {elapsed_ms:.1f} ms, showing the first "
+                                               f"{self.__MAX_LISTED_ISSUES__}.")
+        else:
+            self.labelValidationStatus.setText(f"{len(issues)} issues found in {elapsed_ms:.1f} ms.")
+
+    def show_error(self, cause: str):
+        self.buttonValidateAgain.setEnabled(True)
+        self.labelValidationStatus.setText(cause)
+
+    def on_issue_activated(self, item: QListWidgetItem):
+        self.issue_selected.emit(self._issues_[self.listValidationIssues.row(item)])
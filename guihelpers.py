@@ -1,6 +1,6 @@
 import os
 import sys
-from PyQt5.QtCore import QSettings, QThread
+from PyQt5.QtCore import QSettings, QThread, pyqtSignal
 
 __all__ = ["SettingsHolder", "WorkerThread", "resolve_asset", "PROGRAM_VERSION", "PROGRAM_TITLE"]
 
@@ -31,6 +31,14 @@ class SettingsHolder:
     def set_last_arc_path(cls, last_arc_path: str):
         cls._settings_.setValue("last_arc_path", last_arc_path)
 
+    @classmethod
+    def get_last_workspace_path(cls) -> str:
+        return cls._settings_.value("last_workspace_path", defaultValue="", type=str)
+
+    @classmethod
+    def set_last_workspace_path(cls, last_workspace_path: str):
+        cls._settings_.setValue("last_workspace_path", last_workspace_path)
+
     @classmethod
     def is_compress_arc(cls) -> bool:
         return cls._settings_.value("compress_arc", defaultValue=False, type=bool)
@@ -39,14 +47,63 @@ class SettingsHolder:
     def set_compress_arc(cls, compress_arc: bool):
         cls._settings_.setValue("compress_arc", compress_arc)
 
+    @classmethod
+    def get_compression_level(cls) -> str:
+        return cls._settings_.value("compression_level", defaultValue="normal", type=str)
+
+    @classmethod
+    def set_compression_level(cls, compression_level: str):
+        cls._settings_.setValue("compression_level", compression_level)
+
+    @classmethod
+    def is_lazy_load(cls) -> bool:
+        return cls._settings_.value("lazy_load", defaultValue=True, type=bool)
+
+    @classmethod
+    def set_lazy_load(cls, lazy_load: bool):
+        cls._settings_.setValue("lazy_load", lazy_load)
+
+    @classmethod
+    def is_reuse_binary(cls) -> bool:
+        return cls._settings_.value("reuse_binary", defaultValue=False, type=bool)
+
+    @classmethod
+    def set_reuse_binary(cls, reuse_binary: bool):
+        cls._settings_.setValue("reuse_binary", reuse_binary)
+
+    @classmethod
+    def get_load_workers(cls) -> int:
+        return cls._settings_.value("load_workers", defaultValue=1, type=int)
+
+    @classmethod
+    def set_load_workers(cls, load_workers: int):
+        cls._settings_.setValue("load_workers", load_workers)
+
 
 # ----------------------------------------------------------------------------------------------------------------------
-# Basic service thread that may catch an exception
+# Basic service thread that may catch an exception, report its progress and be cancelled
 # ----------------------------------------------------------------------------------------------------------------------
 class WorkerThread(QThread):
+    progress = pyqtSignal(str, int, int)  # Stage description, current step, total steps
+
     def __init__(self, parent):
         super().__init__(parent)
         self._exception_: Exception = None
+        self._cancelled_: bool = False
+
+    def report_progress(self, stage: str, step: int, total_steps: int):
+        self.progress.emit(stage, step, total_steps)
+
+    def check_cancelled(self) -> bool:
+        """Returns True and marks the thread as cancelled if an interruption was requested. Call between stages."""
+        if self.isInterruptionRequested():
+            self._cancelled_ = True
+
+        return self._cancelled_
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled_
 
     @property
     def has_exception(self) -> bool:
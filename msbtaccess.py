@@ -1,45 +1,168 @@
-from typing import Generator
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from threading import RLock
+from typing import Any, Generator
+import multiprocessing
 
 from natsort import natsort_keygen
 from pyjkernel import JKRArchive, JKRArchiveFile
-from pymsb import LMSDocument, LMSMessage, LMSFlows, LMSEntryNode, LMSMessageNode, LMSBranchNode
+from pymsb import LMSDocument, LMSMessage, LMSFlows, LMSEntryNode, LMSMessageNode, LMSBranchNode, LMSException
 from adapter_smg2 import SuperMarioGalaxy2Adapter
+from adapter_config import export_adapter_maker, import_adapter_maker
+from msbttext import TextRun, TagRecord, parse_tagged_text
+from msbtbinary import MSBTSnapshot
 import pymsb
 
-__all__ = ["LMSAccessor"]
+__all__ = ["LMSAccessor", "load_lms_accessors", "prefetch_lms_accessors", "create_parse_pool", "get_worker_adapter"]
 
 
 class LMSAccessor:
     __LABEL_SORT_KEY__ = natsort_keygen(key=lambda e: e.label)
 
-    def __init__(self, name: str, archive: JKRArchive, adapter: type[SuperMarioGalaxy2Adapter]):
+    def __init__(self, name: str, archive: JKRArchive, adapter: type[SuperMarioGalaxy2Adapter],
+                 parsed: tuple[list[LMSMessage], list[LMSEntryNode]] | None = None, lazy: bool = False,
+                 reuse_binary: bool = False):
         """
         Creates a new ``LMSAccessor`` with the specified name and adapter. The given archive will be used to retrieve
         contents from and save files to. If there are no MSBT or MSBF files, blank new holders will be constructed.
-        Otherwise, the messages and flowcharts will be constructed from the files.
+        Otherwise, the messages and flowcharts will be constructed from the files. If the files were already parsed
+        elsewhere, their messages and flowcharts can be passed instead, in which case the files won't be read again.
+
+        If lazy is True, only the files' raw bytes are kept and they will be parsed the first time the messages or
+        flowcharts are needed, or when ``load`` is called.
+
+        If reuse_binary is True, the MSBT file's original bytes are kept after parsing. When the messages are saved, the
+        encoded texts of messages that did not change are copied from them instead of being encoded again, so untouched
+        messages stay byte-identical. This requires keeping one additional copy of the file in memory.
 
         :param name: the name of MSBT and MSBF files.
         :param archive: the RARC archive.
         :param adapter: the adapter maker used to construct the game-specific adapter.
+        :param parsed: the already parsed messages and flowcharts, if any.
+        :param lazy: True if the files should be parsed on first access.
+        :param reuse_binary: True if untouched messages should be copied from the original MSBT file when saving.
         """
         self._name_: str = name
         self._archive_: JKRArchive = archive
-        self._document_: LMSDocument
-        self._flows_: LMSFlows
+        self._adapter_: type[SuperMarioGalaxy2Adapter] = adapter
+        self._document_: LMSDocument | None = None
+        self._flows_: LMSFlows | None = None
+        self._msbt_buffer_: bytes | None = None
+        self._msbf_buffer_: bytes | None = None
+        self._load_lock_: RLock = RLock()
+        self._loaded_: bool = False                 # True once the contents and their lookups are complete
+        self._messages_by_label_: dict[str, LMSMessage] = {}
+        self._flowcharts_by_label_: dict[str, LMSEntryNode] = {}
+        self._message_references_: dict[str, set[LMSMessageNode]] = {}
+        self._flowchart_nodes_: dict[LMSEntryNode, list] = {}
+        self._message_indexes_linked_: bool = True  # False if flow nodes' message indexes need to be updated
+        self._modified_: bool = False               # True if the files need to be packed again
+        self._parsed_texts_: dict[LMSMessage, tuple[str, tuple[TextRun | TagRecord, ...]]] = {}
+        self._reuse_binary_: bool = reuse_binary
+        self._msbt_snapshot_: MSBTSnapshot | None = None
 
         msbt_path = create_msbt_file_path(self._archive_, self._name_)
         msbf_path = create_msbf_file_path(self._archive_, self._name_)
 
+        if parsed is not None:
+            if reuse_binary and self._archive_.directory_exists(msbt_path):
+                self._msbt_buffer_ = self._archive_.get_file(msbt_path).data
+
+            self._init_parsed_contents_(parsed)
+            return
+
         if self._archive_.directory_exists(msbt_path):
-            self._document_ = pymsb.msbt_from_buffer(adapter, self._archive_.get_file(msbt_path).data)
+            self._msbt_buffer_ = self._archive_.get_file(msbt_path).data
         else:
-            self._document_ = LMSDocument(adapter)
+            self._modified_ = True
 
         if self._archive_.directory_exists(msbf_path):
-            self._flows_ = pymsb.msbf_from_buffer(adapter, self._archive_.get_file(msbf_path).data)
-            self._link_flowcharts_with_message_labels_()
+            self._msbf_buffer_ = self._archive_.get_file(msbf_path).data
+
+        if not lazy:
+            self.load()
+
+    def load(self):
+        """
+        Parses the MSBT and MSBF files if that did not happen yet. This is safe to be called from a background thread.
+        """
+        # Accessing messages or flowcharts calls this every time, so avoid taking the lock after the files were parsed
+        if self._loaded_:
+            return
+
+        with self._load_lock_:
+            # The document is set before the lookups are built, which access the messages from this thread again
+            if self._document_ is not None:
+                return
+
+            if self._msbt_buffer_ is not None:
+                document = pymsb.msbt_from_buffer(self._adapter_, self._msbt_buffer_)
+            else:
+                document = LMSDocument(self._adapter_)
+
+            if self._msbf_buffer_ is not None:
+                flows = pymsb.msbf_from_buffer(self._adapter_, self._msbf_buffer_)
+            else:
+                flows = LMSFlows(self._adapter_)
+
+            self._init_contents_(document, flows)
+
+    def _init_parsed_contents_(self, parsed: tuple[list[LMSMessage], list[LMSEntryNode]]):
+        document = LMSDocument(self._adapter_)
+        document.messages.extend(parsed[0])
+        flows = LMSFlows(self._adapter_)
+        flows.flowcharts.extend(parsed[1])
+        self._init_contents_(document, flows)
+
+    def _get_unparsed_buffers_(self) -> tuple[bytes, bytes | None] | None:
+        with self._load_lock_:
+            if self._document_ is not None or self._msbt_buffer_ is None:
+                return None
+
+            return self._msbt_buffer_, self._msbf_buffer_
+
+    def _set_parsed_contents_(self, parsed: tuple[list[LMSMessage], list[LMSEntryNode]]):
+        # The files may have been parsed on access in the meantime, in which case those contents are kept
+        with self._load_lock_:
+            if self._document_ is None:
+                self._init_parsed_contents_(parsed)
+
+    def _init_contents_(self, document: LMSDocument, flows: LMSFlows):
+        if self._reuse_binary_ and self._msbt_buffer_ is not None:
+            self._msbt_snapshot_ = MSBTSnapshot(self._msbt_buffer_, document.messages)
         else:
-            self._flows_ = LMSFlows(adapter)
+            self._msbt_snapshot_ = None
+
+        self._msbt_buffer_ = None
+        self._msbf_buffer_ = None
+        self._flows_ = flows
+        self._document_ = document
+        self._flowchart_nodes_.clear()
+        self._parsed_texts_.clear()
+
+        self._link_flowcharts_with_message_labels_()
+        self._messages_by_label_ = {message.label: message for message in self.messages}
+        self._flowcharts_by_label_ = {flowchart.label: flowchart for flowchart in self.flowcharts}
+        self._collect_message_references_()
+        self._loaded_ = True
+
+    @property
+    def is_loaded(self) -> bool:
+        """Returns True if the MSBT and MSBF files have been parsed already."""
+        return self._loaded_
+
+    @property
+    def is_modified(self) -> bool:
+        """Returns True if the messages or flowcharts changed since they were loaded or saved the last time."""
+        return self._modified_
+
+    def mark_modified(self):
+        """
+        Marks the messages and flowcharts as modified, so that they will be packed on the next save. This has to be
+        called after editing a message's text or attributes directly. All other changes made through the accessor are
+        tracked automatically.
+        """
+        self._modified_ = True
 
     @property
     def name(self) -> str:
@@ -54,11 +177,13 @@ class LMSAccessor:
     @property
     def messages(self) -> list[LMSMessage]:
         """Returns the list of messages."""
+        self.load()
         return self._document_.messages
 
     @property
     def flowcharts(self) -> list[LMSEntryNode]:
         """Returns the list of flowcharts."""
+        self.load()
         return self._flows_.flowcharts
 
     # ------------------------------------------------------------------------------------------------------------------
@@ -70,11 +195,12 @@ class LMSAccessor:
         :param label: the message's label.
         :return: the message entry.
         """
-        for message in self.messages:
-            if message.label == label:
-                return message
+        self.load()
 
-        raise KeyError(f"No message labeled {label} found!")
+        if label not in self._messages_by_label_:
+            raise KeyError(f"No message labeled {label} found!")
+
+        return self._messages_by_label_[label]
 
     def new_message(self, label: str) -> LMSMessage:
         """
@@ -84,35 +210,42 @@ class LMSAccessor:
         :param label: the new message's label.
         :return: the new message entry.
         """
-        return self._document_.new_message(label)
+        self.load()
 
-    def delete_message(self, label: str) -> bool:
+        message = self._document_.new_message(label)
+        self._messages_by_label_[label] = message
+        self._message_indexes_linked_ = False
+        self._modified_ = True
+        return message
+
+    def delete_message(self, label: str, index: int | None = None) -> bool:
         """
         Tries to delete the message entry with the specified label. If there's at least one flow node that references
         this label, the entry won't be removed. If there's no entry with such label, a KeyError will be thrown.
 
         :param label: the message's label that should be deleted.
+        :param index: the message's index in the list of messages if it is known already, which avoids searching it.
         :return: True if the message was deleted, otherwise False.
         """
-        # Don't delete message if referenced by a flow node
-        for flowchart in self.flowcharts:
-            for node in filter(lambda n: type(n) == LMSMessageNode, flattened_nodes(flowchart)):
-                if node.message_label == label:
-                    return False
-
-        # Find index of message associated with label
-        index = -1
+        self.load()
 
-        for i, message in enumerate(self.messages):
-            if message.label == label:
-                index = i
-                break
+        # Don't delete message if referenced by a flow node
+        if self.is_message_referenced(label):
+            return False
 
-        if index == -1:
+        if label not in self._messages_by_label_:
             raise KeyError(f"No message labeled {label} found!")
 
         # If allowed, remove the actual entry
-        self.messages.pop(index)
+        message = self._messages_by_label_.pop(label)
+
+        if index is not None and 0 <= index < len(self.messages) and self.messages[index] is message:
+            del self.messages[index]
+        else:
+            self.messages.remove(message)
+        self._parsed_texts_.pop(message, None)
+        self._message_indexes_linked_ = False
+        self._modified_ = True
         return True
 
     def rename_message(self, old_label: str, new_label: str) -> bool:
@@ -126,34 +259,77 @@ class LMSAccessor:
         :param new_label: the new name.
         :return: True if the labels are the same or if renaming was successful, otherwise False.
         """
+        self.load()
+
         if old_label == new_label:
             return True
 
         # Find message entry associated with label
-        associated_message: LMSMessage | None = None
-
-        for message in self.messages:
-            if message.label == old_label:
-                associated_message = message
-            elif message.label == new_label:
-                return False
-
-        if associated_message is None:
+        if old_label not in self._messages_by_label_:
             raise KeyError(f"No message labeled {old_label} found!")
+        if new_label in self._messages_by_label_:
+            return False
 
         # Update message entry's label and flow node references
+        associated_message = self._messages_by_label_.pop(old_label)
         associated_message.label = new_label
+        self._messages_by_label_[new_label] = associated_message
+        self._modified_ = True
 
-        for flowchart in self.flowcharts:
-            for node in filter(lambda n: type(n) == LMSMessageNode, flattened_nodes(flowchart)):
-                if node.message_label == old_label:
-                    node.message_label = new_label
+        if old_label in self._message_references_:
+            referencing_nodes = self._message_references_.pop(old_label)
+
+            for node in referencing_nodes:
+                node.message_label = new_label
+
+            self._message_references_[new_label] = referencing_nodes
 
         return True
 
+    def get_message_references(self, label: str) -> set[LMSMessageNode]:
+        """
+        Retrieves all flow nodes that reference the message entry with the specified label. The returned set is a copy,
+        so it is safe to modify it.
+
+        :param label: the message's label.
+        :return: the set of referencing flow nodes, which is empty if there are no references.
+        """
+        self.load()
+        return set(self._message_references_.get(label, ()))
+
+    def is_message_referenced(self, label: str) -> bool:
+        """
+        Checks if at least one flow node references the message entry with the specified label.
+
+        :param label: the message's label.
+        :return: True if the message is referenced by a flow node, otherwise False.
+        """
+        self.load()
+        return label in self._message_references_
+
+    def get_parsed_text(self, message: LMSMessage) -> tuple[TextRun | TagRecord, ...]:
+        """
+        Retrieves the message's text split into text runs and tag records. The result is cached and reused until the
+        message's text changes. If a tag in the text is not closed, an LMSException will be thrown.
+
+        :param message: the message entry.
+        :return: the text runs and tag records in order of appearance.
+        """
+        text = message.text
+        cached = self._parsed_texts_.get(message)
+
+        if cached is not None and cached[0] == text:
+            return cached[1]
+
+        parsed_text = parse_tagged_text(text)
+        self._parsed_texts_[message] = (text, parsed_text)
+        return parsed_text
+
     def sort_messages(self):
         """Sorts all messages by their labels in natural ascending order."""
-        self._document_.messages.sort(key=self.__LABEL_SORT_KEY__)
+        self.messages.sort(key=self.__LABEL_SORT_KEY__)
+        self._message_indexes_linked_ = False
+        self._modified_ = True
 
     # ------------------------------------------------------------------------------------------------------------------
 
@@ -164,11 +340,12 @@ class LMSAccessor:
         :param label: the flowchart's label.
         :return: the flowchart.
         """
-        for flowchart in self.flowcharts:
-            if flowchart.label == label:
-                return flowchart
+        self.load()
 
-        raise KeyError(f"No flowchart labeled {label} found!")
+        if label not in self._flowcharts_by_label_:
+            raise KeyError(f"No flowchart labeled {label} found!")
+
+        return self._flowcharts_by_label_[label]
 
     def new_flowchart(self, label: str) -> LMSEntryNode:
         """
@@ -178,7 +355,13 @@ class LMSAccessor:
         :param label: the new message's label.
         :return: the new flowchart.
         """
-        return self._flows_.new_flowchart(label)
+        self.load()
+
+        flowchart = self._flows_.new_flowchart(label)
+        self._flowcharts_by_label_[label] = flowchart
+        self._message_indexes_linked_ = False
+        self._modified_ = True
+        return flowchart
 
     def delete_flowchart(self, label: str) -> bool:
         """
@@ -188,19 +371,17 @@ class LMSAccessor:
         :param label: the flowchart's label that should be deleted.
         :return: always True.
         """
-        # Find index of message associated with label
-        index = -1
-
-        for i, flowchart in enumerate(self.flowcharts):
-            if flowchart.label == label:
-                index = i
-                break
+        self.load()
 
-        if index == -1:
+        if label not in self._flowcharts_by_label_:
             raise KeyError(f"No flowchart labeled {label} found!")
 
-        # Remove the actual entry
-        self.flowcharts.pop(index)
+        # Remove the actual entry and drop the flow nodes that are no longer reachable
+        flowchart = self._flowcharts_by_label_.pop(label)
+        self.flowcharts.remove(flowchart)
+        self._flowchart_nodes_.pop(flowchart, None)
+        self._collect_message_references_()
+        self._modified_ = True
         return True
 
     def rename_flowchart(self, old_label: str, new_label: str) -> bool:
@@ -208,15 +389,50 @@ class LMSAccessor:
 
     def sort_flowcharts(self):
         """Sorts all flowcharts by their labels in natural ascending order."""
-        self._flows_.flowcharts.sort(key=self.__LABEL_SORT_KEY__)
+        self.flowcharts.sort(key=self.__LABEL_SORT_KEY__)
+        self._modified_ = True
+
+    def get_flowchart_nodes(self, flowchart: LMSEntryNode) -> list:
+        """
+        Retrieves the flow nodes of the given flowchart in breadth-first order. The order is computed once and reused
+        until the flowchart is invalidated using ``invalidate_flowchart_nodes``. The returned list must not be modified.
+
+        :param flowchart: the flowchart.
+        :return: the flow nodes in traversal order.
+        """
+        if flowchart not in self._flowchart_nodes_:
+            self._flowchart_nodes_[flowchart] = list(flattened_nodes(flowchart))
+
+        return self._flowchart_nodes_[flowchart]
+
+    def invalidate_flowchart_nodes(self, flowchart: LMSEntryNode | None = None):
+        """
+        Discards the cached traversal order of the given flowchart. This has to be called whenever nodes are linked or
+        unlinked. If no flowchart is specified, the traversal orders of all flowcharts will be discarded.
+
+        :param flowchart: the flowchart whose nodes changed, or None for all flowcharts.
+        """
+        if flowchart is None:
+            self._flowchart_nodes_.clear()
+        else:
+            self._flowchart_nodes_.pop(flowchart, None)
+
+        self._collect_message_references_()
+        self._message_indexes_linked_ = False
+        self._modified_ = True
 
     # ------------------------------------------------------------------------------------------------------------------
 
     def save(self):
         """
         Packs the messages and flowcharts and saves them to their respective MSBT/MSBF files in the archive. If either
-        has no entries, the respective files won't be created or will be removed if they exist.
+        has no entries, the respective files won't be created or will be removed if they exist. If nothing was modified
+        since the files were loaded or saved the last time, the files are kept as they are. If the accessor reuses the
+        original MSBT file, only the texts of changed messages are encoded again if possible, from their parsed texts.
         """
+        if not self._modified_:
+            return
+
         msbt_file: JKRArchiveFile
         msbf_file: JKRArchiveFile
         msbt_path = create_msbt_file_path(self._archive_, self._name_)
@@ -228,7 +444,16 @@ class LMSAccessor:
         else:
             msbt_file = self._archive_.get_file(msbt_path)
 
-        msbt_file.data = self._document_.makebin()
+        msbt_buffer = None
+
+        if self._msbt_snapshot_ is not None:
+            msbt_buffer = self._msbt_snapshot_.rebuild(self._adapter_, self.messages, self.get_parsed_text)
+        if msbt_buffer is None:
+            msbt_buffer = self._document_.makebin()
+        if self._reuse_binary_:
+            self._msbt_snapshot_ = MSBTSnapshot(msbt_buffer, self.messages)
+
+        msbt_file.data = msbt_buffer
 
         # Pack and keep MSBF if and only if there is at least one flowchart
         if len(self._flows_.flowcharts) > 0:
@@ -243,6 +468,8 @@ class LMSAccessor:
         elif self._archive_.directory_exists(msbf_path):
             self._archive_.remove_file(msbf_path)
 
+        self._modified_ = False
+
     def delete(self):
         """
         Clears all message entries, flowcharts, and removes associated MSBT and MSBF files in the archive.
@@ -250,8 +477,11 @@ class LMSAccessor:
         msbt_path = create_msbt_file_path(self._archive_, self._name_)
         msbf_path = create_msbf_file_path(self._archive_, self._name_)
 
-        self.messages.clear()
-        self.flowcharts.clear()
+        # Replace contents with blank holders, there is no need to parse the files that are about to be removed
+        with self._load_lock_:
+            self._msbt_buffer_ = None
+            self._msbf_buffer_ = None
+            self._init_contents_(LMSDocument(self._adapter_), LMSFlows(self._adapter_))
 
         if self._archive_.directory_exists(msbt_path):
             self._archive_.remove_file(msbt_path)
@@ -259,17 +489,180 @@ class LMSAccessor:
         if self._archive_.directory_exists(msbf_path):
             self._archive_.remove_file(msbf_path)
 
-    def _link_flowcharts_with_message_labels_(self):
+    def _message_nodes_(self) -> Generator:
         for flowchart in self.flowcharts:
-            for node in filter(lambda n: type(n) == LMSMessageNode, flattened_nodes(flowchart)):
-                node.message_label = self.messages[node.msbt_entry_idx].label
+            for node in self.get_flowchart_nodes(flowchart):
+                if type(node) == LMSMessageNode:
+                    yield node
+
+    def _collect_message_references_(self):
+        self._message_references_.clear()
+
+        for node in self._message_nodes_():
+            self._message_references_.setdefault(node.message_label, set()).add(node)
+
+    def _link_flowcharts_with_message_labels_(self):
+        for node in self._message_nodes_():
+            node.message_label = self.messages[node.msbt_entry_idx].label
 
     def _link_flowcharts_with_message_indexes_(self):
-        message_labels = [m.label for m in self.messages]
+        # Neither the message order nor the flow nodes changed since the indexes were last linked
+        if self._message_indexes_linked_:
+            return
+
+        message_indexes = {message.label: i for i, message in enumerate(self.messages)}
 
         for flowchart in self.flowcharts:
-            for node in filter(lambda n: type(n) == LMSMessageNode, flattened_nodes(flowchart)):
-                node.msbt_entry_idx = message_labels.index(node.message_label)
+            for node in self.get_flowchart_nodes(flowchart):
+                if type(node) != LMSMessageNode:
+                    continue
+
+                if node.message_label not in message_indexes:
+                    raise LMSException(f"Flowchart {flowchart.label} references the message {node.message_label}, "
+                                       f"which does not exist!")
+
+                node.msbt_entry_idx = message_indexes[node.message_label]
+
+        self._message_indexes_linked_ = True
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Loading all text files of an archive
+
+def load_lms_accessors(archive: JKRArchive, adapter: type[SuperMarioGalaxy2Adapter], max_workers: int = 1,
+                       lazy: bool = False, reuse_binary: bool = False,
+                       executor: Executor | None = None) -> list[LMSAccessor]:
+    """
+    Constructs an ``LMSAccessor`` for every MSBT file in the archive's root folder. If more than one worker is
+    specified, the MSBT and MSBF files are parsed concurrently by a pool of worker processes. The accessors are returned
+    in the same order as the files are listed in the archive, regardless of the number of workers. If lazy is True, no
+    files are parsed here at all and the accessors parse their files on first access instead. If reuse_binary is True,
+    the accessors keep the original MSBT files to copy untouched messages from when saving.
+
+    If an executor created by ``create_parse_pool`` is given, the files are parsed by it instead of a new pool and
+    max_workers is ignored. This allows several archives to share one pool, and the executor is not shut down here.
+
+    :param archive: the RARC archive.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param max_workers: the maximum number of worker processes. 1 or less parses the files in this process.
+    :param lazy: True if the accessors should parse their files on first access.
+    :param reuse_binary: True if untouched messages should be copied from the original MSBT files when saving.
+    :param executor: the shared pool of worker processes, if any.
+    :return: the list of accessors.
+    """
+    msbt_files = filter(lambda f: f.name.endswith(".msbt"), archive.list_files(archive.root_name))
+    lms_names = [f.name.removesuffix(".msbt") for f in msbt_files]
+
+    if lazy or len(lms_names) <= 1 or (executor is None and max_workers <= 1):
+        return [LMSAccessor(n, archive, adapter, lazy=lazy, reuse_binary=reuse_binary) for n in lms_names]
+
+    msbt_buffers = []
+    msbf_buffers = []
+
+    for lms_name in lms_names:
+        msbt_buffers.append(archive.get_file(create_msbt_file_path(archive, lms_name)).data)
+        msbf_path = create_msbf_file_path(archive, lms_name)
+        msbf_buffers.append(archive.get_file(msbf_path).data if archive.directory_exists(msbf_path) else None)
+
+    if executor is not None:
+        parsed_files = list(executor.map(_parse_lms_buffers_, msbt_buffers, msbf_buffers))
+    else:
+        with create_parse_pool(adapter, max_workers) as executor:
+            parsed_files = list(executor.map(_parse_lms_buffers_, msbt_buffers, msbf_buffers))
+
+    return [LMSAccessor(n, archive, adapter, parsed, reuse_binary=reuse_binary)
+            for n, parsed in zip(lms_names, parsed_files)]
+
+
+def prefetch_lms_accessors(lms_accessors: list[LMSAccessor], adapter: type[SuperMarioGalaxy2Adapter],
+                           max_workers: int = 1, executor: Executor | None = None) -> Generator:
+    """
+    Generator that parses the MSBT and MSBF files of lazily loaded accessors by a pool of worker processes, so that the
+    accessors don't have to parse them on first access. Every accessor is yielded as soon as its files were parsed and
+    its contents were set. Accessors that were loaded already, or that are loaded on access while their files are still
+    being parsed, keep their contents. If an accessor's files can't be parsed, it is skipped and will report the error
+    on first access instead. Closing the generator early cancels parsing the remaining files.
+
+    If an executor created by ``create_parse_pool`` is given, the files are parsed by it instead of a new pool and
+    max_workers is ignored.
+
+    :param lms_accessors: the accessors.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param max_workers: the maximum number of worker processes.
+    :param executor: the shared pool of worker processes, if any.
+    """
+    unparsed = []
+
+    for lms_accessor in lms_accessors:
+        buffers = lms_accessor._get_unparsed_buffers_()
+
+        if buffers is not None:
+            unparsed.append((lms_accessor, buffers))
+
+    if len(unparsed) == 0:
+        return
+
+    own_executor = executor is None
+
+    if own_executor:
+        executor = create_parse_pool(adapter, max_workers)
+
+    futures = {executor.submit(_parse_lms_buffers_, *buffers): lms_accessor for lms_accessor, buffers in unparsed}
+
+    try:
+        for future in as_completed(futures):
+            try:
+                parsed = future.result()
+            except Exception:
+                continue
+
+            futures[future]._set_parsed_contents_(parsed)
+            yield futures[future]
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            for future in futures:
+                future.cancel()
+
+
+def create_parse_pool(adapter: type[SuperMarioGalaxy2Adapter], max_workers: int) -> ProcessPoolExecutor:
+    """
+    Creates a pool of worker processes that can parse text files for ``load_lms_accessors``. The same pool can be shared
+    with ``validate_accessors`` and ``replace_in_accessors``, so that batch jobs start their workers only once. The
+    caller is responsible for shutting it down. The workers are spawned instead of forked, since the pool may be
+    created by a background thread of the editor and forking a multithreaded process is unsafe.
+
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param max_workers: the maximum number of worker processes.
+    :return: the pool of worker processes.
+    """
+    # Custom adapter makers can't be pickled, so the workers rebuild them from their configurable lists
+    return ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_parse_worker_, initargs=(export_adapter_maker(adapter),))
+
+
+_worker_adapter_: type[SuperMarioGalaxy2Adapter] | None = None
+
+
+def get_worker_adapter() -> type[SuperMarioGalaxy2Adapter] | None:
+    """
+    Retrieves the adapter maker of the current worker process if it belongs to a pool created by ``create_parse_pool``.
+
+    :return: the adapter maker, or None if this is not such a worker process.
+    """
+    return _worker_adapter_
+
+
+def _init_parse_worker_(adapter_data: dict[str, Any]):
+    global _worker_adapter_
+    _worker_adapter_ = import_adapter_maker(adapter_data)
+
+
+def _parse_lms_buffers_(msbt_buffer: bytes, msbf_buffer: bytes | None) -> tuple[list[LMSMessage], list[LMSEntryNode]]:
+    messages = pymsb.msbt_from_buffer(_worker_adapter_, msbt_buffer).messages
+    flowcharts = pymsb.msbf_from_buffer(_worker_adapter_, msbf_buffer).flowcharts if msbf_buffer is not None else []
+    return messages, flowcharts
 
 
 # ----------------------------------------------------------------------------------------------------------------------
@@ -278,26 +671,28 @@ class LMSAccessor:
 def flattened_nodes(flowchart: LMSEntryNode) -> Generator:
     """
     Generator that yields the flow nodes in the given flowchart. This is done using breadth-first search, starting at
-    the root node. Every flow node will be yielded exactly once, even if they are referenced more than once.
+    the root node. Every flow node will be yielded exactly once, even if they are referenced more than once. Nodes are
+    marked when they are queued, so the traversal takes linear time in the number of nodes.
 
     :param flowchart: the flowchart.
     :return: the next flow node.
     """
-    remaining = [flowchart]
-    marked = set()
+    remaining = deque([flowchart])
+    marked = {flowchart}
 
     while len(remaining) > 0:
-        current_node = remaining.pop(0)
+        current_node = remaining.popleft()
         next_node = current_node.next_node
-        marked.add(current_node)
 
         if next_node is not None and next_node not in marked:
+            marked.add(next_node)
             remaining.append(next_node)
 
         if type(current_node) == LMSBranchNode:
             next_node = current_node.next_node_else
 
             if next_node is not None and next_node not in marked:
+                marked.add(next_node)
                 remaining.append(next_node)
 
         yield current_node
@@ -0,0 +1,644 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import Executor
+from typing import Callable, NamedTuple
+
+from pyjkernel import JKRArchive
+from pymsb import LMSEntryNode, LMSMessageNode, LMSBranchNode, LMSException, BinaryMemoryIO
+from adapter_smg2 import SuperMarioGalaxy2Adapter
+from msbtaccess import LMSAccessor, load_lms_accessors, flattened_nodes
+from msbtbinary import _encode_parsed_texts_, _pack_texts_
+from msbttext import TagRecord
+
+__all__ = ["BenchmarkResult", "benchmark_parallel_loading", "benchmark_label_lookup", "benchmark_index_relinking",
+           "benchmark_flow_traversal", "benchmark_text_encoding", "benchmark_tag_encoding", "benchmark_tag_decoding"]
+
+
+class BenchmarkResult(NamedTuple):
+    """The timings of an operation, measured for the current implementation and, if available, for the previous one."""
+    name: str                      # What was measured
+    count: int                     # Number of processed items, such as messages or flow nodes
+    before_seconds: float | None   # Best time of the previous implementation, None if there is nothing to compare
+    after_seconds: float           # Best time of the current implementation
+
+    @property
+    def speedup(self) -> float | None:
+        """Returns how many times faster the current implementation is, or None if there is nothing to compare."""
+        if self.before_seconds is None:
+            return None
+
+        return self.before_seconds / max(self.after_seconds, 1e-9)
+
+
+def benchmark_parallel_loading(archive: JKRArchive, adapter: type[SuperMarioGalaxy2Adapter], executor: Executor | None,
+                               repeat: int = 5) -> BenchmarkResult:
+    """
+    Measures parsing all text files of the archive with ``load_lms_accessors``, once in this process like before and
+    once by the given pool of worker processes. The pool should have been used before, so that starting the workers is
+    not measured. If no pool is given, only the sequential parse is measured.
+
+    :param archive: the archive.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param executor: the pool of worker processes created by ``create_parse_pool``, if any.
+    :param repeat: the number of runs, the fastest of which is reported.
+    :return: the timings.
+    """
+    file_count = sum(1 for f in archive.list_files(archive.root_name) if f.name.endswith(".msbt"))
+    sequential_time = _measure_(lambda: load_lms_accessors(archive, adapter), repeat)
+
+    if executor is None:
+        return BenchmarkResult("sequential parsing", file_count, None, sequential_time)
+
+    parallel_time = _measure_(lambda: load_lms_accessors(archive, adapter, executor=executor), repeat)
+    return BenchmarkResult("parallel parsing", file_count, sequential_time, parallel_time)
+
+
+def benchmark_label_lookup(lms_accessors: list[LMSAccessor], repeat: int = 5) -> BenchmarkResult:
+    """
+    Measures looking up every message by its label, like the editor does whenever a message is selected. The previous
+    implementation scanned the messages for the label, the current one looks it up in the accessor's label index.
+
+    :param lms_accessors: the accessors.
+    :param repeat: the number of runs, the fastest of which is reported.
+    :return: the timings.
+    """
+    labels = [[message.label for message in lms_accessor.messages] for lms_accessor in lms_accessors]
+    label_count = sum(len(accessor_labels) for accessor_labels in labels)
+
+    def look_up_by_scan():
+        for lms_accessor, accessor_labels in zip(lms_accessors, labels):
+            for label in accessor_labels:
+                next(message for message in lms_accessor.messages if message.label == label)
+
+    def look_up_by_index():
+        for lms_accessor, accessor_labels in zip(lms_accessors, labels):
+            for label in accessor_labels:
+                lms_accessor.get_message(label)
+
+    return BenchmarkResult("label lookup", label_count, _measure_(look_up_by_scan, repeat),
+                           _measure_(look_up_by_index, repeat))
+
+
+def benchmark_index_relinking(lms_accessors: list[LMSAccessor], repeat: int = 5) -> BenchmarkResult:
+    """
+    Measures linking the message indexes of all flow nodes, which happens whenever a text file is saved. The previous
+    implementation looked up every message node's label with ``list.index``, which takes time proportional to the
+    number of messages times the number of message nodes. The current one builds a label to index dict once.
+
+    :param lms_accessors: the accessors.
+    :param repeat: the number of runs, the fastest of which is reported.
+    :return: the timings.
+    """
+    message_nodes = [list(_iter_message_nodes_(lms_accessor)) for lms_accessor in lms_accessors]
+    node_count = sum(len(nodes) for nodes in message_nodes)
+
+    def link_by_list_index():
+        for lms_accessor, nodes in zip(lms_accessors, message_nodes):
+            message_labels = [message.label for message in lms_accessor.messages]
+
+            for node in nodes:
+                node.msbt_entry_idx = message_labels.index(node.message_label)
+
+    def link_by_label_map():
+        for lms_accessor in lms_accessors:
+            # The accessor skips relinking if nothing changed, so force it to link the indexes every time
+            lms_accessor._message_indexes_linked_ = False
+            lms_accessor._link_flowcharts_with_message_indexes_()
+
+    return BenchmarkResult("index relinking", node_count, _measure_(link_by_list_index, repeat),
+                           _measure_(link_by_label_map, repeat))
+
+
+def benchmark_flow_traversal(lms_accessors: list[LMSAccessor], repeat: int = 5) -> BenchmarkResult:
+    """
+    Measures traversing all flowcharts in breadth-first order, which happens whenever flowcharts are loaded, linked or
+    invalidated. The previous implementation popped nodes from the front of a list and marked them when they were
+    visited, so shared nodes could be queued more than once. The current one uses a deque and marks nodes when they are
+    queued.
+
+    :param lms_accessors: the accessors.
+    :param repeat: the number of runs, the fastest of which is reported.
+    :return: the timings.
+    """
+    flowcharts = [flowchart for lms_accessor in lms_accessors for flowchart in lms_accessor.flowcharts]
+    node_count = sum(1 for flowchart in flowcharts for _ in flattened_nodes(flowchart))
+
+    def traverse_by_list():
+        for flowchart in flowcharts:
+            for _ in _flattened_nodes_by_list_(flowchart):
+                pass
+
+    def traverse_by_deque():
+        for flowchart in flowcharts:
+            for _ in flattened_nodes(flowchart):
+                pass
+
+    return BenchmarkResult("flow traversal", node_count, _measure_(traverse_by_list, repeat),
+                           _measure_(traverse_by_deque, repeat))
+
+
+def benchmark_text_encoding(lms_accessors: list[LMSAccessor], adapter: type[SuperMarioGalaxy2Adapter],
+                            repeat: int = 5) -> BenchmarkResult:
+    """
+    Measures encoding the texts of all messages for the TXT2 section, which happens for changed messages when a text
+    file is saved. The previous implementation let pymsb tokenize the texts again, the current one encodes the
+    accessors' cached parsed texts. Messages whose texts can't be encoded are skipped. If both implementations don't
+    produce the same bytes, an LMSException will be thrown.
+
+    :param lms_accessors: the accessors.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param repeat: the number of runs, the fastest of which is reported.
+    :return: the timings.
+    """
+    messages = []
+    parsed_texts = []
+
+    for lms_accessor in lms_accessors:
+        for message in lms_accessor.messages:
+            try:
+                parsed_text = lms_accessor.get_parsed_text(message)
+                _encode_parsed_texts_(adapter, [parsed_text])
+            except Exception:
+                continue
+
+            messages.append(message)
+            parsed_texts.append(parsed_text)
+
+    for message, packed_text, encoded_text in zip(messages, _pack_texts_(adapter, messages),
+                                                  _encode_parsed_texts_(adapter, parsed_texts)):
+        if packed_text != encoded_text:
+            raise LMSException(f"Encoding the parsed text of {message.label} differs from pymsb's encoding")
+
+    return BenchmarkResult("text encoding", len(messages), _measure_(lambda: _pack_texts_(adapter, messages), repeat),
+                           _measure_(lambda: _encode_parsed_texts_(adapter, parsed_texts), repeat))
+
+
+def benchmark_tag_encoding(lms_accessors: list[LMSAccessor], adapter: type[SuperMarioGalaxy2Adapter],
+                           repeat: int = 5) -> BenchmarkResult:
+    """
+    Measures encoding every tag that occurs in the messages with the adapter's ``write_tag``, which is what makes up
+    most of the work when tag-heavy text files are saved. Tags that can't be encoded are skipped. The previous
+    implementation compared the tag's name against every known name in turn and looked up color, icon, size and race
+    names with ``list.index``. The current one looks up the writers and names in tables.
+
+    :param lms_accessors: the accessors.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param repeat: the number of runs, the fastest of which is reported.
+    :return: the timings.
+    """
+    lms_adapter = adapter()
+    tags = _collect_encodable_tags_(lms_accessors, lms_adapter)
+
+    def encode_tags_by_name():
+        stream = BinaryMemoryIO()
+
+        for tag in tags:
+            _write_tag_by_name_(lms_adapter, stream, tag)
+
+    def encode_tags_by_table():
+        stream = BinaryMemoryIO()
+
+        for tag in tags:
+            lms_adapter.write_tag(stream, tag)
+
+    return BenchmarkResult("tag encoding", len(tags), _measure_(encode_tags_by_name, repeat),
+                           _measure_(encode_tags_by_table, repeat))
+
+
+def benchmark_tag_decoding(lms_accessors: list[LMSAccessor], adapter: type[SuperMarioGalaxy2Adapter],
+                           repeat: int = 5) -> BenchmarkResult:
+    """
+    Measures decoding every tag that occurs in the messages with the adapter's ``read_tag``. The tags are encoded into
+    one buffer first, tags that can't be encoded are skipped. The previous implementation compared the tag's group and
+    tag IDs in a chain of conditions and read every value from the stream on its own. The current one looks up the
+    readers in tables and unpacks the values with precompiled structs.
+
+    :param lms_accessors: the accessors.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param repeat: the number of runs, the fastest of which is reported.
+    :return: the timings.
+    """
+    lms_adapter = adapter()
+    tags = _collect_encodable_tags_(lms_accessors, lms_adapter)
+    stream = BinaryMemoryIO()
+
+    for tag in tags:
+        lms_adapter.write_tag(stream, tag)
+
+    marker_size = len("\u000E".encode(lms_adapter.charset))
+
+    def decode_tags_by_group():
+        stream.seek(0)
+
+        for _ in range(len(tags)):
+            stream.read(marker_size)
+            _read_tag_by_group_(lms_adapter, stream)
+
+    def decode_tags_by_table():
+        stream.seek(0)
+
+        for _ in range(len(tags)):
+            stream.read(marker_size)
+            lms_adapter.read_tag(stream)
+
+    return BenchmarkResult("tag decoding", len(tags), _measure_(decode_tags_by_group, repeat),
+                           _measure_(decode_tags_by_table, repeat))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Helpers
+
+def _measure_(func: Callable[[], object], repeat: int) -> float:
+    best_time = float("inf")
+
+    for _ in range(max(repeat, 1)):
+        start_time = time.perf_counter()
+        func()
+        best_time = min(best_time, time.perf_counter() - start_time)
+
+    return best_time
+
+
+def _iter_message_nodes_(lms_accessor: LMSAccessor):
+    for flowchart in lms_accessor.flowcharts:
+        for node in lms_accessor.get_flowchart_nodes(flowchart):
+            if type(node) == LMSMessageNode:
+                yield node
+
+
+def _collect_encodable_tags_(lms_accessors: list[LMSAccessor], lms_adapter: SuperMarioGalaxy2Adapter) -> list[str]:
+    tags = []
+    scratch = BinaryMemoryIO()
+
+    for lms_accessor in lms_accessors:
+        for message in lms_accessor.messages:
+            try:
+                parsed_text = lms_accessor.get_parsed_text(message)
+            except LMSException:
+                continue
+
+            for element in parsed_text:
+                if type(element) != TagRecord:
+                    continue
+
+                try:
+                    lms_adapter.write_tag(scratch, element.tag)
+                    _write_tag_by_name_(lms_adapter, scratch, element.tag)
+                except Exception:
+                    continue
+
+                tags.append(element.tag)
+
+    return tags
+
+
+def _flattened_nodes_by_list_(flowchart: LMSEntryNode):
+    # The traversal as it was before it used a deque
+    remaining = [flowchart]
+    marked = set()
+
+    while len(remaining) > 0:
+        current_node = remaining.pop(0)
+        next_node = current_node.next_node
+        marked.add(current_node)
+
+        if next_node is not None and next_node not in marked:
+            remaining.append(next_node)
+
+        if type(current_node) == LMSBranchNode:
+            next_node = current_node.next_node_else
+
+            if next_node is not None and next_node not in marked:
+                remaining.append(next_node)
+
+        yield current_node
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Previous implementations of the tag encoding and decoding, kept for comparison
+
+def _read_tag_by_group_(lms_adapter: SuperMarioGalaxy2Adapter, stream: BinaryMemoryIO) -> str:
+    # The tag decoder as it was before it looked up the readers in tables
+    tag_position = stream.tell()
+    group_id = stream.read_u16()
+    tag_id = stream.read_u16()
+    len_data = stream.read_u16()
+
+    # System
+    if group_id == 0:
+        if tag_id == 0:
+            len_kanji = stream.read_u16()
+            len_furigana = stream.read_u16()
+
+            try:
+                furigana = stream.read(len_furigana).decode(lms_adapter.charset)
+                kanji = stream.read(len_kanji).decode(lms_adapter.charset)
+            except Exception:
+                raise LMSException(f"Couldn't decode ruby characters (tag at 0x{tag_position})")
+
+            return f'[ruby:{kanji};{furigana}]'
+
+        if tag_id == 3:
+            if len_data != 2:
+                raise LMSException(f"Color tag length should be 2 (tag at 0x{tag_position})")
+
+            color_id = stream.read_u16()
+
+            if color_id == 0xFFFF:
+                return '[defcolor]'
+
+            if 0 <= color_id < len(lms_adapter.FONT_COLORS):
+                return f'[color:{lms_adapter.FONT_COLORS[color_id]}]'
+
+            raise LMSException(f"Illegal Color tag color ID: {color_id} (tag at 0x{tag_position})")
+
+    # Display
+    elif group_id == 1:
+        if tag_id == 0:
+            if len_data != 2:
+                raise LMSException(f"Wait tag length should be 2 (tag at 0x{tag_position})")
+
+            wait_time = stream.read_u16()
+            return f'[delay:{wait_time}]'
+        elif tag_id == 1:
+            if len_data != 0:
+                raise LMSException(f"Page break tag length should be 0 (tag at 0x{tag_position})")
+
+            return '[pagebreak]'
+        elif tag_id == 2:
+            if len_data != 0:
+                raise LMSException(f"Offset page tag length should be 0 (tag at 0x{tag_position})")
+
+            return '[ycenter]'
+        elif tag_id == 3:
+            if len_data != 0:
+                raise LMSException(f"Center page tag length should be 0 (tag at 0x{tag_position})")
+
+            return '[xcenter]'
+
+    # Sound
+    elif group_id == 2:
+        if len_data < 2:
+            raise LMSException(f"Minimum Sound tag length should be 2 (tag at 0x{tag_position})")
+
+        len_sound = stream.read_u16()
+        raw_sound = stream.read(len_sound)
+        sound_name = raw_sound.decode(lms_adapter.charset)
+
+        return f'[sound:{sound_name}]'
+
+    # Picture
+    elif group_id == 3:
+        if len_data != 2:
+            raise LMSException(f"Picture group tag length should be 2 (tag at 0x{tag_position})")
+
+        picture_offset = stream.read_u16()
+
+        if 0 <= tag_id < len(lms_adapter.PICTURE_NAMES):
+            return f'[icon:{lms_adapter.PICTURE_NAMES[tag_id]}]'
+
+        raise LMSException(f"Illegal Picture group tag ID: {tag_id} (tag at 0x{tag_position})")
+
+    # FontSize
+    elif group_id == 4:
+        if len_data != 0:
+            raise LMSException(f"FontSize group tag length should be 0 (tag at 0x{tag_position})")
+
+        if 0 <= tag_id < len(lms_adapter.FONT_SIZES):
+            return f'[size:{lms_adapter.FONT_SIZES[tag_id]}]'
+
+        raise LMSException(f"Illegal FontSize group tag ID: {tag_id} (tag at 0x{tag_position})")
+
+    # Localize
+    elif group_id == 5:
+        if len_data != 2:
+            raise LMSException(f"Localize group tag length should be 2 (tag at 0x{tag_position})")
+
+        if tag_id == 0:
+            preset_type = stream.read_u8()
+            unknown_arg = stream.read_u8()
+            return f'[player:{preset_type}]'
+
+        raise LMSException(f"Illegal Localize group tag ID: {tag_id} (tag at 0x{tag_position})")
+
+    # Number
+    elif group_id == 6:
+        if len_data != 8:
+            raise LMSException(f"Number group tag length should be 8 (tag at 0x{tag_position})")
+
+        default_value = stream.read_s32()
+        va_arg_idx = stream.read_u32()
+        return f'[intvar:{tag_id};{va_arg_idx};{default_value}]'
+
+    # String
+    elif group_id == 7:
+        if len_data != 8:
+            raise LMSException(f"String group tag length should be 8 (tag at 0x{tag_position})")
+
+        unknown_arg_1 = stream.read_u32()
+        va_arg_idx = stream.read_u32()
+        return f'[stringvar:{tag_id};{va_arg_idx};0x{unknown_arg_1:08X}]'
+
+    # RaceTime
+    elif group_id == 9:
+        if len_data != 0:
+            raise LMSException(f"RaceTime group tag length should be 0 (tag at 0x{tag_position})")
+
+        if 0 <= tag_id < len(lms_adapter.RACE_TIMES):
+            return f'[race:{lms_adapter.RACE_TIMES[tag_id]}]'
+
+        raise LMSException(f"Illegal RaceTime group tag ID: {tag_id} (tag at 0x{tag_position})")
+
+    # Font
+    elif group_id == 10:
+        if len_data < 2:
+            raise LMSException(f"Minimum Sound tag length should be 2 (tag at 0x{tag_position})")
+
+        len_sound = stream.read_u16()
+        raw_sound = stream.read(len_sound)
+        sound_name = raw_sound.decode(lms_adapter.charset)
+
+        return f'[numberfont:{sound_name}]'
+
+    data = stream.read(len_data)
+    return f"[{group_id}:{tag_id};{data.hex()}]"
+
+
+def _write_tag_by_name_(lms_adapter: SuperMarioGalaxy2Adapter, stream: BinaryMemoryIO, tag: str):
+    # The tag encoder as it was before it looked up the writers and names in tables
+    if tag.find(":") >= 0:
+        tag_name, tag_attrs = tag.split(":", 1)
+        tag_name = tag_name.strip()
+        tag_attrs = tag_attrs.strip().split(";")
+    else:
+        tag_name = tag.strip()
+        tag_attrs = ()
+
+    if tag_name == "":
+        raise LMSException("Empty tag found!")
+
+    # System
+    if tag_name == "ruby":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 2, tag)
+
+        try:
+            encoded_kanji = tag_attrs[0].encode(lms_adapter.charset)
+            encoded_furigana = tag_attrs[1].encode(lms_adapter.charset)
+        except Exception:
+            raise LMSException(f"Couldn't write ruby tag. Full tag was '{tag}'")
+
+        data_size = 4 + len(encoded_furigana)
+
+        lms_adapter._write_tag_info_(stream, 0, 0, data_size)
+        stream.write_u16(len(encoded_kanji))
+        stream.write_u16(len(encoded_furigana))
+        stream.write(encoded_furigana)
+        stream.write(encoded_kanji)
+
+    elif tag_name == "defcolor":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
+        lms_adapter._write_tag_info_(stream, 0, 3, 2)
+        stream.write_u16(0xFFFF)
+
+    elif tag_name == "color":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        color_name = tag_attrs[0]
+
+        if color_name in lms_adapter.FONT_COLORS:
+            color_id = lms_adapter.FONT_COLORS.index(color_name)
+        else:
+            raise LMSException(f"Invalid text color '{color_name}', full tag was '{tag}'")
+
+        lms_adapter._write_tag_info_(stream, 0, 3, 2)
+        stream.write_u16(color_id)
+
+    # Display
+    elif tag_name == "delay":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        wait_time = lms_adapter._get_tag_attr_u16_(tag_attrs[0], tag)
+
+        lms_adapter._write_tag_info_(stream, 1, 0, 2)
+        stream.write_u16(wait_time)
+
+    elif tag_name == "pagebreak":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
+        lms_adapter._write_tag_info_(stream, 1, 1, 0)
+
+    elif tag_name == "ycenter":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
+        lms_adapter._write_tag_info_(stream, 1, 2, 0)
+
+    elif tag_name == "xcenter":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 0, tag)
+        lms_adapter._write_tag_info_(stream, 1, 3, 0)
+
+    # Sound
+    elif tag_name == "sound":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        sound_name = tag_attrs[0]
+        encoded_name = sound_name.encode(lms_adapter.charset)
+        encoded_len = len(encoded_name)
+
+        lms_adapter._write_tag_info_(stream, 2, 0, 2 + encoded_len)
+        stream.write_u16(encoded_len)
+        stream.write(encoded_name)
+
+    # Picture
+    elif tag_name == "icon":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        icon_name = tag_attrs[0]
+
+        if icon_name in lms_adapter.PICTURE_NAMES:
+            tag_id = lms_adapter.PICTURE_NAMES.index(icon_name)
+        else:
+            raise LMSException(f"Invalid icon name '{icon_name}', full tag was '{tag}'")
+
+        lms_adapter._write_tag_info_(stream, 3, tag_id, 2)
+        stream.write_u16(lms_adapter.PICTURE_CODES[tag_id])
+
+    # FontSize
+    elif tag_name == "size":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        size_name = tag_attrs[0]
+
+        if size_name in lms_adapter.FONT_SIZES:
+            tag_id = lms_adapter.FONT_SIZES.index(size_name)
+        else:
+            raise LMSException(f"Invalid font size '{size_name}', full tag was '{tag}'")
+
+        lms_adapter._write_tag_info_(stream, 4, tag_id, 0)
+
+    # Localize
+    elif tag_name == "player":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        preset_type = lms_adapter._get_tag_attr_u8_(tag_attrs[0], tag)
+
+        lms_adapter._write_tag_info_(stream, 5, 0, 2)
+        stream.write_u8(preset_type)
+        stream.write_u8(0xCD)
+
+    # Number
+    elif tag_name == "intvar":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 3, tag)
+        tag_id = lms_adapter._get_tag_attr_u16_(tag_attrs[0], tag)
+        va_arg_idx = lms_adapter._get_tag_attr_u32_(tag_attrs[1], tag)
+        def_val = lms_adapter._get_tag_attr_s32_(tag_attrs[2], tag)
+
+        lms_adapter._write_tag_info_(stream, 6, tag_id, 8)
+        stream.write_u32(def_val)
+        stream.write_u32(va_arg_idx)
+
+    # String
+    elif tag_name == "stringvar":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 3, tag)
+        tag_id = lms_adapter._get_tag_attr_u16_(tag_attrs[0], tag)
+        va_arg_idx = lms_adapter._get_tag_attr_u32_(tag_attrs[1], tag)
+        def_ptr = lms_adapter._get_tag_attr_u32_(tag_attrs[2], tag)
+
+        lms_adapter._write_tag_info_(stream, 7, tag_id, 8)
+        stream.write_u32(def_ptr)
+        stream.write_u32(va_arg_idx)
+
+    # RaceTime
+    elif tag_name == "race":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        race_name = tag_attrs[0]
+
+        if race_name in lms_adapter.RACE_TIMES:
+            tag_id = lms_adapter.RACE_TIMES.index(race_name)
+        else:
+            raise LMSException(f"Invalid race name '{race_name}', full tag was '{tag}'")
+
+        lms_adapter._write_tag_info_(stream, 9, tag_id, 0)
+
+    # Font
+    elif tag_name == "numberfont":
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 1, tag)
+        number_text = tag_attrs[0]
+
+        encoded_text = number_text.encode(lms_adapter.charset)
+        encoded_len = len(encoded_text)
+
+        lms_adapter._write_tag_info_(stream, 10, 0, 2 + encoded_len)
+        stream.write_u16(encoded_len)
+        stream.write(encoded_text)
+
+    else:
+        lms_adapter._verify_tag_attr_size_(tag_name, tag_attrs, 2, tag)
+        tag_id = lms_adapter._get_tag_attr_u16_(tag_name, tag)
+        group_id = lms_adapter._get_tag_attr_u16_(tag_attrs[0], tag)
+
+        try:
+            data = bytes.fromhex(tag_attrs[1])
+            len_data = len(data)
+        except Exception:
+            raise LMSException(f"Couldn't write arbitrary tag. Full tag was '{tag}'")
+
+        if len_data & 1:
+            lms_adapter._write_tag_info_(stream, tag_id, group_id, len_data + 1)
+            stream.write(data)
+            stream.write_u8(0)
+        else:
+            lms_adapter._write_tag_info_(stream, tag_id, group_id, len(data))
+            stream.write(data)
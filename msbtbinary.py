@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import struct
+from typing import Callable
+
+from pymsb import LMSDocument, LMSMessage, LMSException, BinaryMemoryIO
+from adapter_smg2 import SuperMarioGalaxy2Adapter
+from msbttext import TextRun, TagRecord
+
+__all__ = ["MSBTSnapshot"]
+
+_MSBT_MAGIC_ = b"MsgStdBn"
+_HEADER_SIZE_ = 0x20
+_SECTION_HEADER_SIZE_ = 0x10
+_SECTION_ALIGNMENT_ = 0x10
+_SECTION_PADDING_ = b"\xAB"
+
+# Whether encoding parsed texts produced the same bytes as pymsb for an adapter maker, checked on first use
+_parsed_encoding_verified_: dict[type[SuperMarioGalaxy2Adapter], bool] = {}
+
+
+class MSBTSnapshot:
+    """
+    The original encoded form of an MSBT file together with the labels, texts and attributes it was decoded to. It is
+    used to rebuild the file without encoding the messages that did not change since then.
+    """
+    def __init__(self, buffer: bytes, messages: list[LMSMessage]):
+        """
+        Splits the given MSBT file into its sections and remembers the current contents of the given messages. The
+        messages have to be the ones that were decoded from the file. If the file is malformed, an LMSException will be
+        thrown.
+
+        :param buffer: the MSBT file's raw bytes.
+        :param messages: the messages decoded from the file.
+        """
+        self._buffer_: bytes = bytes(buffer)
+        self._endian_: str = _get_endian_(self._buffer_)
+        self._sections_: list[tuple[bytes, memoryview]] = _split_sections_(self._buffer_, self._endian_)
+        self._labels_: list[str] = [message.label for message in messages]
+        self._texts_: list[str] = [message.text for message in messages]
+        self._attributes_: list[dict] = [dict(message.attributes) for message in messages]
+        self._text_entries_: list[bytes] | None = None  # Split from TXT2 on first use
+
+    def rebuild(self, adapter: type[SuperMarioGalaxy2Adapter], messages: list[LMSMessage],
+                get_parsed_text: Callable[[LMSMessage], tuple[TextRun | TagRecord, ...]] | None = None) -> bytes | None:
+        """
+        Rebuilds the MSBT file for the given messages. Only the texts of changed messages are encoded, the encoded texts
+        of all other messages are copied from the original file. Attributes are copied as a whole section if none of
+        them changed and packed again otherwise. All remaining sections are always copied. If messages were added,
+        removed, renamed or reordered, the file can't be rebuilt this way and None is returned.
+
+        If get_parsed_text is given, usually ``LMSAccessor.get_parsed_text``, the changed texts are encoded from their
+        cached text runs and tag records instead of letting pymsb tokenize them again. The first time this is done for
+        an adapter maker, the result is compared to pymsb's encoding, and pymsb is used from then on if they differ.
+
+        :param adapter: the adapter maker used to construct the game-specific adapter.
+        :param messages: the current messages.
+        :param get_parsed_text: the function that retrieves a message's parsed text, if any.
+        :return: the rebuilt MSBT file, or None if it has to be packed entirely.
+        """
+        if len(messages) != len(self._labels_) or any(m.label != l for m, l in zip(messages, self._labels_)):
+            return None
+
+        changed_texts = [i for i, message in enumerate(messages) if message.text != self._texts_[i]]
+        changed_attributes = any(message.attributes != self._attributes_[i] for i, message in enumerate(messages))
+
+        if len(changed_texts) == 0 and not changed_attributes:
+            return self._buffer_
+
+        sections = list(self._sections_)
+        section_indexes = {magic: i for i, (magic, data) in enumerate(sections)}
+
+        if len(changed_texts) > 0:
+            if b"TXT2" not in section_indexes:
+                return None
+
+            text_entries = self._get_text_entries_()
+
+            # Texts that share their encoded form or are stored out of order can't be replaced separately
+            if text_entries is None or len(text_entries) != len(messages):
+                return None
+
+            text_entries = list(text_entries)
+            encoded_texts = _encode_texts_(adapter, [messages[i] for i in changed_texts], get_parsed_text)
+
+            for i, encoded_text in zip(changed_texts, encoded_texts):
+                text_entries[i] = encoded_text
+
+            sections[section_indexes[b"TXT2"]] = (b"TXT2", _join_text_entries_(text_entries, self._endian_))
+
+        if changed_attributes:
+            if b"ATR1" not in section_indexes:
+                return None
+
+            attributes_section = _pack_attributes_(adapter, messages)
+            sections[section_indexes[b"ATR1"]] = (b"ATR1", attributes_section)
+
+        return _join_sections_(self._buffer_[:_HEADER_SIZE_], sections, self._endian_)
+
+    def _get_text_entries_(self) -> list[bytes] | None:
+        if self._text_entries_ is None:
+            text_section = next((data for magic, data in self._sections_ if magic == b"TXT2"), None)
+
+            if text_section is None:
+                raise LMSException("MSBT file has no TXT2 section")
+
+            self._text_entries_ = _split_text_entries_(text_section, self._endian_)
+
+        return self._text_entries_
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Helper functions for MSBT sections
+
+def _get_endian_(buffer: bytes) -> str:
+    if len(buffer) < _HEADER_SIZE_ or buffer[:8] != _MSBT_MAGIC_:
+        raise LMSException("Not an MSBT file")
+
+    return ">" if buffer[8:10] == b"\xFE\xFF" else "<"
+
+
+def _split_sections_(buffer: bytes, endian: str) -> list[tuple[bytes, memoryview]]:
+    view = memoryview(buffer)
+    section_count = struct.unpack_from(endian + "H", buffer, 0x0E)[0]
+    sections = []
+    offset = _HEADER_SIZE_
+
+    for _ in range(section_count):
+        if offset + _SECTION_HEADER_SIZE_ > len(buffer):
+            raise LMSException(f"Section header at 0x{offset:X} exceeds the MSBT file")
+
+        magic = bytes(buffer[offset:offset + 4])
+        section_size = struct.unpack_from(endian + "I", buffer, offset + 4)[0]
+        data_offset = offset + _SECTION_HEADER_SIZE_
+
+        if data_offset + section_size > len(buffer):
+            raise LMSException(f"Section {magic} at 0x{offset:X} exceeds the MSBT file")
+
+        sections.append((magic, view[data_offset:data_offset + section_size]))
+        offset = _align_(data_offset + section_size)
+
+    return sections
+
+
+def _join_sections_(header: bytes, sections: list[tuple[bytes, bytes | memoryview]], endian: str) -> bytes:
+    stream = bytearray(header)
+
+    for magic, data in sections:
+        stream += magic
+        stream += struct.pack(endian + "I8x", len(data))
+        stream += data
+        stream += _SECTION_PADDING_ * (_align_(len(stream)) - len(stream))
+
+    struct.pack_into(endian + "H", stream, 0x0E, len(sections))
+    struct.pack_into(endian + "I", stream, 0x12, len(stream))
+    return bytes(stream)
+
+
+def _split_text_entries_(text_section: memoryview, endian: str) -> list[bytes] | None:
+    # Returns None if the offsets are not strictly increasing within the section, since the entries can't be told apart
+    if len(text_section) < 4:
+        return None
+
+    entry_count = struct.unpack_from(endian + "I", text_section, 0)[0]
+    table_end = 4 + 4 * entry_count
+
+    if table_end > len(text_section):
+        return None
+
+    offsets = list(struct.unpack_from(f"{endian}{entry_count}I", text_section, 4))
+    offsets.append(len(text_section))
+
+    if entry_count > 0 and offsets[0] < table_end:
+        return None
+    if any(offsets[i] >= offsets[i + 1] for i in range(entry_count)):
+        return None
+
+    return [bytes(text_section[offsets[i]:offsets[i + 1]]) for i in range(entry_count)]
+
+
+def _join_text_entries_(text_entries: list[bytes], endian: str) -> bytes:
+    offset = 4 + 4 * len(text_entries)
+    offsets = []
+
+    for text_entry in text_entries:
+        offsets.append(offset)
+        offset += len(text_entry)
+
+    return struct.pack(f"{endian}{len(offsets) + 1}I", len(offsets), *offsets) + b"".join(text_entries)
+
+
+def _encode_texts_(adapter: type[SuperMarioGalaxy2Adapter], messages: list[LMSMessage],
+                   get_parsed_text: Callable[[LMSMessage], tuple[TextRun | TagRecord, ...]] | None) -> list[bytes]:
+    if get_parsed_text is None or not _parsed_encoding_verified_.get(adapter, True):
+        return _pack_texts_(adapter, messages)
+
+    encoded_texts = _encode_parsed_texts_(adapter, [get_parsed_text(message) for message in messages])
+
+    if adapter not in _parsed_encoding_verified_:
+        packed_texts = _pack_texts_(adapter, messages)
+        _parsed_encoding_verified_[adapter] = encoded_texts == packed_texts
+        return packed_texts
+
+    return encoded_texts
+
+
+def _encode_parsed_texts_(adapter: type[SuperMarioGalaxy2Adapter],
+                          parsed_texts: list[tuple[TextRun | TagRecord, ...]]) -> list[bytes]:
+    # Encode the runs and tags like pymsb does, which passes every tag to the adapter and terminates every text
+    lms_adapter = adapter()
+    encoded_texts = []
+
+    for parsed_text in parsed_texts:
+        stream = BinaryMemoryIO()
+
+        for element in parsed_text:
+            if type(element) == TextRun:
+                lms_adapter.write_chars(stream, element.text)
+            else:
+                lms_adapter.write_tag(stream, element.tag)
+
+        lms_adapter.write_chars(stream, "\0")
+        encoded_texts.append(stream.getvalue())
+
+    return encoded_texts
+
+
+def _pack_texts_(adapter: type[SuperMarioGalaxy2Adapter], messages: list[LMSMessage]) -> list[bytes]:
+    # Let pymsb encode only the given texts, so that they are encoded exactly like in a fully packed file
+    document = LMSDocument(adapter)
+
+    for message in messages:
+        document.new_message(message.label).text = message.text
+
+    buffer = document.makebin()
+    endian = _get_endian_(buffer)
+    text_section = next(data for magic, data in _split_sections_(buffer, endian) if magic == b"TXT2")
+    return _split_text_entries_(text_section, endian)
+
+
+def _pack_attributes_(adapter: type[SuperMarioGalaxy2Adapter], messages: list[LMSMessage]) -> bytes:
+    # Let pymsb pack the attributes into an otherwise empty file, so that they are packed exactly like in a fully packed
+    # file, including the adapter's byte order and the padding of the attributes section
+    document = LMSDocument(adapter)
+
+    for message in messages:
+        document.new_message(message.label).attributes.update(message.attributes)
+
+    buffer = document.makebin()
+    endian = _get_endian_(buffer)
+    attributes_section = next((data for magic, data in _split_sections_(buffer, endian) if magic == b"ATR1"), None)
+
+    if attributes_section is None:
+        raise LMSException("Packed MSBT file has no ATR1 section")
+
+    return bytes(attributes_section)
+
+
+def _align_(offset: int) -> int:
+    return (offset + _SECTION_ALIGNMENT_ - 1) & ~(_SECTION_ALIGNMENT_ - 1)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, Generator, Iterable, TextIO
+
+from pyjkernel import JKRArchive, JKRCompression
+from adapter_smg2 import SuperMarioGalaxy2Adapter
+from msbtaccess import LMSAccessor, load_lms_accessors
+from archiveio import read_archive_file, write_archive_file, DEFAULT_COMPRESSION_LEVEL
+
+__all__ = ["iter_message_rows", "write_message_rows", "read_message_rows", "import_message_rows"]
+
+
+def iter_message_rows(arc_paths: Iterable[str], adapter: type[SuperMarioGalaxy2Adapter]) -> Generator:
+    """
+    Generator that yields one row for every message in the given archives. A row is a dict that holds the archive path,
+    the text file's name, the message's label, attributes and tagged text. Archives are opened one after another and
+    text files are parsed only when they are reached, so only one archive is held in memory at a time.
+
+    :param arc_paths: the archive files.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :return: the next message row.
+    """
+    for arc_path in arc_paths:
+        archive = read_archive_file(arc_path)
+
+        for lms_accessor in load_lms_accessors(archive, adapter, lazy=True):
+            for message in lms_accessor.messages:
+                yield {
+                    "archive": arc_path,
+                    "file": lms_accessor.name,
+                    "label": message.label,
+                    "attributes": dict(message.attributes),
+                    "text": message.text
+                }
+
+
+def write_message_rows(rows: Iterable[dict[str, Any]], stream: TextIO) -> int:
+    """
+    Writes the given message rows to the stream, one JSON object per line.
+
+    :param rows: the message rows.
+    :param stream: the text stream to write to.
+    :return: the number of written rows.
+    """
+    row_count = 0
+
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False))
+        stream.write("\n")
+        row_count += 1
+
+    return row_count
+
+
+def read_message_rows(stream: TextIO) -> Generator:
+    """
+    Generator that parses message rows from a stream that was written by ``write_message_rows``. Blank lines are
+    skipped. If a row lacks the archive, file or label, a ValueError will be thrown.
+
+    :param stream: the text stream to read from.
+    :return: the next message row.
+    """
+    for line_number, line in enumerate(stream, 1):
+        if line.strip() == "":
+            continue
+
+        row = json.loads(line)
+
+        if type(row) != dict or any(type(row.get(key)) != str for key in ("archive", "file", "label")):
+            raise ValueError(f"Line {line_number} is not a valid message row")
+
+        yield row
+
+
+def import_message_rows(rows: Iterable[dict[str, Any]], adapter: type[SuperMarioGalaxy2Adapter],
+                        compression: JKRCompression = JKRCompression.NONE, base_dir: str = "",
+                        reuse_binary: bool = False, level: str = DEFAULT_COMPRESSION_LEVEL) -> Generator:
+    """
+    Generator that applies message rows to their archives and writes the archives back. Consecutive rows of the same
+    archive are applied together, so rows should be grouped by archive, which is the case for exported rows. Missing
+    text files and messages are created. Text and attributes are only replaced if they are present in a row. If
+    reuse_binary is True, messages that the rows leave unchanged are copied from the original MSBT files.
+
+    :param rows: the message rows.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param compression: the compression used when writing the archives.
+    :param base_dir: the folder that relative archive paths are resolved against.
+    :param reuse_binary: True if untouched messages should be copied from the original MSBT files.
+    :param level: the SZS compression level.
+    :return: the next written archive's path and the number of rows that were applied to it.
+    """
+    arc_path: str | None = None
+    archive_file_path = ""
+    archive: JKRArchive | None = None
+    lms_accessors: dict[str, LMSAccessor] = {}
+    row_count = 0
+
+    for row in rows:
+        if row["archive"] != arc_path:
+            if archive is not None:
+                _write_imported_archive_(archive, archive_file_path, lms_accessors, compression, level)
+                yield archive_file_path, row_count
+
+            arc_path = row["archive"]
+            archive_file_path = os.path.join(base_dir, arc_path)
+            archive = read_archive_file(archive_file_path)
+            lms_accessors = {a.name: a for a in load_lms_accessors(archive, adapter, lazy=True,
+                                                                   reuse_binary=reuse_binary)}
+            row_count = 0
+
+        if row["file"] not in lms_accessors:
+            lms_accessors[row["file"]] = LMSAccessor(row["file"], archive, adapter)
+
+        lms_accessor = lms_accessors[row["file"]]
+
+        try:
+            message = lms_accessor.get_message(row["label"])
+        except KeyError:
+            message = lms_accessor.new_message(row["label"])
+
+        if "attributes" in row:
+            message.attributes.update(row["attributes"])
+        if "text" in row:
+            message.text = row["text"]
+
+        lms_accessor.mark_modified()
+        row_count += 1
+
+    if archive is not None:
+        _write_imported_archive_(archive, archive_file_path, lms_accessors, compression, level)
+        yield archive_file_path, row_count
+
+
+def _write_imported_archive_(archive: JKRArchive, arc_path: str, lms_accessors: dict[str, LMSAccessor],
+                             compression: JKRCompression, level: str):
+    for lms_accessor in lms_accessors.values():
+        lms_accessor.save()
+
+    write_archive_file(archive, arc_path, compression=compression, level=level)
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import NamedTuple
+import multiprocessing
+
+from pymsb import LMSException
+from msbtaccess import LMSAccessor
+from msbttext import TextRun, TagRecord, parse_tagged_text, split_tag
+
+__all__ = ["ReplaceRule", "ReplaceChange", "replace_in_text", "replace_in_accessors"]
+
+
+class ReplaceRule(NamedTuple):
+    """
+    Describes what to replace in messages. Plain rules replace text outside of tags only, so they never change a tag.
+    Tag rules replace whole tags, such as ``[color:red]`` with ``[color:orange]``. Tags are compared by their name and
+    attributes, so surrounding whitespace does not matter. The brackets may be omitted for tag rules.
+    """
+    find: str
+    replace: str
+    match_tags: bool = False
+
+    def validate(self):
+        """Checks that the rule can be applied. If it can't, an LMSException will be thrown."""
+        if self.find == "":
+            raise LMSException("Text to find must not be empty")
+
+        if self.match_tags:
+            _parse_single_tag_(self.find)
+            _parse_single_tag_(self.replace)
+        elif any(bracket in self.find + self.replace for bracket in "[]"):
+            raise LMSException("Plain rules must not contain brackets, use a tag rule to replace tags")
+
+
+class ReplaceChange(NamedTuple):
+    """A message whose text is changed by replacing."""
+    archive: str     # The archive's name or path, empty if not specified
+    file: str        # The accessor's name
+    label: str       # The message's label
+    count: int       # The number of replaced occurrences
+    old_text: str
+    new_text: str
+
+
+def replace_in_text(text: str, rules: list[ReplaceRule], parsed_text: tuple[TextRun | TagRecord, ...] | None = None
+                    ) -> tuple[str, int]:
+    """
+    Applies the rules to the tagged text one after another. If the text contains a tag that is not closed, an
+    LMSException will be thrown. If the text was already parsed, for example by ``LMSAccessor.get_parsed_text``, the
+    parsed text can be given so that it is not parsed again. The text is only parsed again after a rule changed it.
+
+    :param text: the tagged text.
+    :param rules: the rules to be applied.
+    :param parsed_text: the text's runs and tag records, if available.
+    :return: the new text and the number of replaced occurrences.
+    """
+    total_count = 0
+    elements = parsed_text if parsed_text is not None else parse_tagged_text(text)
+
+    for rule in rules:
+        parts = []
+        count = 0
+
+        if rule.match_tags:
+            find_tag = _parse_single_tag_(rule.find)
+            replace_tag = _parse_single_tag_(rule.replace)
+
+        for element in elements:
+            if type(element) == TextRun:
+                if not rule.match_tags and rule.find in element.text:
+                    count += element.text.count(rule.find)
+                    parts.append(element.text.replace(rule.find, rule.replace))
+                else:
+                    parts.append(element.text)
+            elif rule.match_tags and (element.name, _strip_tag_attrs_(element.attributes)) == find_tag[:2]:
+                count += 1
+                parts.append(f"[{replace_tag[2]}]")
+            else:
+                parts.append(f"[{element.tag}]")
+
+        if count > 0:
+            text = "".join(parts)
+            elements = parse_tagged_text(text)
+            total_count += count
+
+    return text, total_count
+
+
+def replace_in_accessors(lms_accessors: list[LMSAccessor], rules: list[ReplaceRule], dry_run: bool = False,
+                         max_workers: int = 1, archive: str = "", executor: Executor | None = None
+                         ) -> list[ReplaceChange]:
+    """
+    Applies the rules to every message of the given accessors and reports every changed message. If more than one
+    worker is specified, the accessors' messages are processed concurrently by a pool of worker processes, one batch per
+    accessor. Otherwise, the messages are processed in this process and the accessors' cached parsed texts are reused.
+    If dry_run is True, nothing is changed and the report shows what would be changed. Otherwise, the new texts are
+    assigned and the changed accessors are marked as modified. If any text can't be processed, an LMSException will be
+    thrown before anything is changed. If a shared executor, such as one created by ``create_parse_pool``, is given,
+    the messages are processed by it instead of a new pool and max_workers is ignored.
+
+    :param lms_accessors: the accessors.
+    :param rules: the rules to be applied.
+    :param dry_run: True if the messages should not be changed.
+    :param max_workers: the maximum number of worker processes. 1 or less processes the messages in this process.
+    :param archive: the archive's name or path, which is reported in the changes.
+    :param executor: the shared pool of worker processes, if any.
+    :return: the changed messages in order of the accessors and their messages.
+    """
+    for rule in rules:
+        rule.validate()
+
+    if len(lms_accessors) <= 1 or (executor is None and max_workers <= 1):
+        results = [_replace_in_accessor_(lms_accessor, rules) for lms_accessor in lms_accessors]
+    else:
+        batches = [[message.text for message in lms_accessor.messages] for lms_accessor in lms_accessors]
+
+        if executor is not None:
+            results = list(executor.map(_replace_in_batch_, batches, [rules] * len(batches)))
+        else:
+            with ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+                results = list(executor.map(_replace_in_batch_, batches, [rules] * len(batches)))
+
+    changes = []
+
+    for lms_accessor, batch_changes in zip(lms_accessors, results):
+        for message_index, new_text, count in batch_changes:
+            message = lms_accessor.messages[message_index]
+            changes.append(ReplaceChange(archive, lms_accessor.name, message.label, count, message.text, new_text))
+
+            if not dry_run:
+                message.text = new_text
+
+        if not dry_run and len(batch_changes) > 0:
+            lms_accessor.mark_modified()
+
+    return changes
+
+
+def _replace_in_accessor_(lms_accessor: LMSAccessor, rules: list[ReplaceRule]) -> list[tuple[int, str, int]]:
+    batch_changes = []
+
+    for message_index, message in enumerate(lms_accessor.messages):
+        new_text, count = replace_in_text(message.text, rules, lms_accessor.get_parsed_text(message))
+
+        if count > 0 and new_text != message.text:
+            batch_changes.append((message_index, new_text, count))
+
+    return batch_changes
+
+
+def _replace_in_batch_(texts: list[str], rules: list[ReplaceRule]) -> list[tuple[int, str, int]]:
+    batch_changes = []
+
+    for message_index, text in enumerate(texts):
+        new_text, count = replace_in_text(text, rules)
+
+        if count > 0 and new_text != text:
+            batch_changes.append((message_index, new_text, count))
+
+    return batch_changes
+
+
+def _parse_single_tag_(tag: str) -> tuple[str, tuple[str, ...], str]:
+    tag = tag.strip()
+
+    if not tag.startswith("["):
+        tag = f"[{tag}]"
+
+    elements = parse_tagged_text(tag)
+
+    if len(elements) != 1 or type(elements[0]) != TagRecord:
+        raise LMSException(f"'{tag}' is not a single tag")
+
+    tag_name, tag_attrs = split_tag(elements[0].tag)
+    return tag_name, _strip_tag_attrs_(tag_attrs), elements[0].tag
+
+
+def _strip_tag_attrs_(tag_attrs: tuple[str, ...]) -> tuple[str, ...]:
+    # Tags are matched regardless of the whitespace around their attributes. Ideographic spaces are kept, since they
+    # may be part of the text, and the tags themselves are encoded as they are written.
+    return tuple(tag_attr.strip(" \t\r\n") for tag_attr in tag_attrs)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+from typing import NamedTuple
+
+from pymsb import LMSMessage
+from msbtaccess import LMSAccessor
+
+__all__ = ["SearchHit", "MessageSearchIndex"]
+
+
+class SearchHit(NamedTuple):
+    """A message that matches a search query."""
+    archive: str            # The archive's name or path, empty if only one archive is indexed
+    accessor: LMSAccessor  # The accessor that holds the message
+    message: LMSMessage    # The matching message
+
+
+class MessageSearchIndex:
+    """
+    An inverted index over the labels and texts of messages in any number of accessors, which may belong to different
+    archives. Every lowercase trigram points to the messages that contain it, so that substring queries only have to
+    check the few messages that contain all of the query's trigrams. Tags are part of a message's text, so queries such
+    as ``[icon:star_chip]`` work like any other substring. Letter case is ignored.
+
+    The index does not notice changes to messages by itself. ``update_message`` has to be called after a message's
+    label or text changed or after a message was created, and ``remove_message`` after a message was deleted.
+    """
+    def __init__(self):
+        self._next_id_: int = 0
+        self._ids_: dict[LMSMessage, int] = {}
+        self._entries_: dict[int, tuple[str, LMSAccessor, LMSMessage, str, str]] = {}  # Lowercase label and text
+        self._entry_trigrams_: dict[int, set[str]] = {}
+        self._trigrams_: dict[str, set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries_)
+
+    def add_accessor(self, accessor: LMSAccessor, archive: str = ""):
+        """
+        Adds or updates all messages of the given accessor. The accessor's files will be parsed if that did not happen
+        yet. This may be called from a background thread, as long as the index is not used elsewhere at the same time.
+
+        :param accessor: the accessor.
+        :param archive: the archive's name or path, which is reported in search hits.
+        """
+        for message in list(accessor.messages):
+            self.update_message(accessor, message, archive)
+
+    def remove_accessor(self, accessor: LMSAccessor):
+        """
+        Removes all messages of the given accessor.
+
+        :param accessor: the accessor.
+        """
+        for entry_id, entry in list(self._entries_.items()):
+            if entry[1] is accessor:
+                self._remove_entry_(entry_id)
+
+    def remove_archive(self, archive: str):
+        """
+        Removes all messages of the specified archive.
+
+        :param archive: the archive's name or path.
+        """
+        for entry_id, entry in list(self._entries_.items()):
+            if entry[0] == archive:
+                self._remove_entry_(entry_id)
+
+    def update_message(self, accessor: LMSAccessor, message: LMSMessage, archive: str = ""):
+        """
+        Adds the message to the index or updates its label and text. Only the trigrams that changed are updated.
+
+        :param accessor: the accessor that holds the message.
+        :param message: the message.
+        :param archive: the archive's name or path, which is reported in search hits.
+        """
+        label = message.label.lower()
+        text = message.text.lower()
+        entry_id = self._ids_.get(message)
+
+        if entry_id is None:
+            entry_id = self._next_id_
+            self._next_id_ += 1
+            self._ids_[message] = entry_id
+            old_trigrams = set()
+        else:
+            old_entry = self._entries_[entry_id]
+
+            if old_entry[3] == label and old_entry[4] == text:
+                return
+
+            old_trigrams = self._entry_trigrams_[entry_id]
+
+        new_trigrams = _collect_trigrams_(label) | _collect_trigrams_(text)
+
+        for trigram in old_trigrams - new_trigrams:
+            postings = self._trigrams_[trigram]
+            postings.discard(entry_id)
+
+            if len(postings) == 0:
+                del self._trigrams_[trigram]
+
+        for trigram in new_trigrams - old_trigrams:
+            self._trigrams_.setdefault(trigram, set()).add(entry_id)
+
+        self._entries_[entry_id] = (archive, accessor, message, label, text)
+        self._entry_trigrams_[entry_id] = new_trigrams
+
+    def remove_message(self, message: LMSMessage):
+        """
+        Removes the message from the index. Nothing happens if the message is not indexed.
+
+        :param message: the message.
+        """
+        entry_id = self._ids_.get(message)
+
+        if entry_id is not None:
+            self._remove_entry_(entry_id)
+
+    def search(self, query: str, include_labels: bool = True, include_text: bool = True,
+               limit: int | None = None) -> list[SearchHit]:
+        """
+        Retrieves the messages whose labels or texts contain the query, ignoring letter case. The hits are returned in
+        the order in which the messages were indexed.
+
+        :param query: the substring to search for.
+        :param include_labels: True if labels should be searched.
+        :param include_text: True if texts should be searched.
+        :param limit: the maximum number of hits, or None for all hits.
+        :return: the matching messages.
+        """
+        query = query.lower()
+
+        if query == "" or not (include_labels or include_text):
+            return []
+
+        # Only messages that contain all trigrams of the query can contain the query itself
+        query_trigrams = _collect_trigrams_(query)
+
+        if len(query_trigrams) > 0:
+            postings = sorted((self._trigrams_.get(trigram, set()) for trigram in query_trigrams), key=len)
+            candidate_ids = set(postings[0]).intersection(*postings[1:])
+        else:
+            candidate_ids = self._entries_.keys()
+
+        hits = []
+
+        for entry_id in sorted(candidate_ids):
+            archive, accessor, message, label, text = self._entries_[entry_id]
+
+            if (include_labels and query in label) or (include_text and query in text):
+                hits.append(SearchHit(archive, accessor, message))
+
+                if limit is not None and len(hits) >= limit:
+                    break
+
+        return hits
+
+    def _remove_entry_(self, entry_id: int):
+        entry = self._entries_.pop(entry_id)
+        del self._ids_[entry[2]]
+
+        for trigram in self._entry_trigrams_.pop(entry_id):
+            postings = self._trigrams_[trigram]
+            postings.discard(entry_id)
+
+            if len(postings) == 0:
+                del self._trigrams_[trigram]
+
+
+def _collect_trigrams_(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
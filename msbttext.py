@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import NamedTuple
+
+from pymsb import LMSException
+
+__all__ = ["TextRun", "TagRecord", "parse_tagged_text", "split_tag"]
+
+
+class TextRun(NamedTuple):
+    """A run of plain text inside a message's tagged text."""
+    text: str      # The plain text
+    position: int  # Index of the first character in the tagged text
+
+
+class TagRecord(NamedTuple):
+    """A tag inside a message's tagged text, such as ``[color:red]``."""
+    name: str                    # The tag's name, for example "color"
+    attributes: tuple[str, ...]  # The tag's attributes, for example ("red",)
+    tag: str                     # The full tag without brackets, for example "color:red"
+    position: int                # Index of the opening bracket in the tagged text
+
+    @property
+    def end_position(self) -> int:
+        """Returns the index after the closing bracket in the tagged text."""
+        return self.position + len(self.tag) + 2
+
+
+def parse_tagged_text(text: str) -> tuple[TextRun | TagRecord, ...]:
+    """
+    Splits the given tagged text into runs of plain text and tag records. Tags are enclosed in square brackets. If a
+    tag is not closed, an LMSException will be thrown.
+
+    :param text: the tagged text.
+    :return: the text runs and tag records in order of appearance.
+    """
+    elements = []
+    position = 0
+
+    while position < len(text):
+        tag_start = text.find("[", position)
+
+        if tag_start < 0:
+            elements.append(TextRun(text[position:], position))
+            break
+
+        if tag_start > position:
+            elements.append(TextRun(text[position:tag_start], position))
+
+        tag_end = text.find("]", tag_start + 1)
+
+        if tag_end < 0:
+            raise LMSException(f"Tag at position {tag_start} is not closed")
+
+        tag = text[tag_start + 1:tag_end]
+        tag_name, tag_attrs = split_tag(tag)
+        elements.append(TagRecord(tag_name, tag_attrs, tag, tag_start))
+        position = tag_end + 1
+
+    return tuple(elements)
+
+
+@lru_cache(maxsize=4096)
+def split_tag(tag: str) -> tuple[str, tuple[str, ...]]:
+    """
+    Splits the given tag, without brackets, into its name and attributes. The results are cached since the same tags
+    occur over and over again.
+
+    :param tag: the tag without brackets.
+    :return: the tag's name and attributes.
+    """
+    if tag.find(":") >= 0:
+        tag_name, tag_attrs = tag.split(":", 1)
+        return tag_name.strip(), tuple(tag_attrs.strip().split(";"))
+    else:
+        return tag.strip(), ()
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from typing import NamedTuple
+
+from pymsb import LMSMessage, LMSException, BinaryMemoryIO
+from adapter_smg2 import SuperMarioGalaxy2Adapter
+from msbtaccess import LMSAccessor, create_parse_pool, get_worker_adapter
+from msbttext import TextRun, TagRecord, parse_tagged_text
+
+__all__ = ["TextIssue", "ValidationIssue", "TextValidator", "validate_accessors"]
+
+
+class TextIssue(NamedTuple):
+    """A part of a tagged text that can't be encoded."""
+    position: int     # Index of the first offending character in the tagged text
+    length: int       # Number of offending characters, for example the length of a tag including its brackets
+    description: str  # What is wrong with it
+
+
+class ValidationIssue(NamedTuple):
+    """A part of a message's text that can't be encoded."""
+    archive: str            # The archive's name or path, empty if not specified
+    accessor: LMSAccessor  # The accessor that holds the message
+    message: LMSMessage    # The message
+    position: int          # Index of the first offending character in the message's text
+    length: int            # Number of offending characters
+    description: str       # What is wrong with it
+
+
+class TextValidator:
+    """
+    Checks tagged texts against the adapter's tag tables without encoding any MSBT file. Every tag is passed to the
+    adapter's ``write_tag``, so exactly the tags that would be rejected when saving are reported, together with the
+    reasons given by the adapter. Unlike saving, checking does not stop at the first error. A validator is not thread
+    safe, so every thread needs its own.
+    """
+    def __init__(self, adapter: type[SuperMarioGalaxy2Adapter]):
+        """
+        Creates a new validator that uses the specified adapter.
+
+        :param adapter: the adapter maker used to construct the game-specific adapter.
+        """
+        self._adapter_: SuperMarioGalaxy2Adapter = adapter()
+        self._scratch_: BinaryMemoryIO = BinaryMemoryIO()  # Receives the encoded tags, which are only measured
+        self._terminator_size_: int = len("\0".encode(self._adapter_.charset))
+
+    def validate(self, text: str, parsed_text: tuple[TextRun | TagRecord, ...] | None = None
+                 ) -> tuple[list[TextIssue], int]:
+        """
+        Checks every tag and every text character of the tagged text. Besides the issues, the number of bytes that the
+        text occupies in the TXT2 section is estimated, including the terminator. Invalid tags don't contribute to the
+        size. If the text was already parsed, for example by ``LMSAccessor.get_parsed_text``, the parsed text can be
+        given so that it is not parsed again.
+
+        :param text: the tagged text.
+        :param parsed_text: the text's runs and tag records, if available.
+        :return: the issues in order of appearance and the estimated encoded size.
+        """
+        issues = []
+        encoded_size = self._terminator_size_
+
+        # Only the last opening bracket without a closing one can be left unclosed, everything before it is checked
+        if parsed_text is not None:
+            unclosed_start = -1
+            elements = parsed_text
+        else:
+            unclosed_start = text.find("[", text.rfind("]") + 1)
+
+            if unclosed_start >= 0:
+                elements = parse_tagged_text(text[:unclosed_start])
+            else:
+                elements = parse_tagged_text(text)
+
+        self._scratch_.seek(0)
+        self._scratch_.truncate()
+
+        for element in elements:
+            if type(element) == TextRun:
+                try:
+                    encoded_size += len(element.text.encode(self._adapter_.charset))
+                except UnicodeEncodeError as e:
+                    issues.append(TextIssue(element.position + e.start, e.end - e.start,
+                                            f"Character can't be encoded as {self._adapter_.charset}"))
+                    encoded_size += len(element.text.encode(self._adapter_.charset, errors="replace"))
+                continue
+
+            tag_start = self._scratch_.tell()
+
+            try:
+                self._adapter_.write_tag(self._scratch_, element.tag)
+            except Exception as e:
+                issues.append(TextIssue(element.position, element.end_position - element.position, str(e)))
+                self._scratch_.seek(tag_start)
+            else:
+                encoded_size += self._scratch_.tell() - tag_start
+
+        if unclosed_start >= 0:
+            issues.append(TextIssue(unclosed_start, len(text) - unclosed_start, "Tag is not closed"))
+
+        return issues, encoded_size
+
+
+def validate_accessors(lms_accessors: list[LMSAccessor], adapter: type[SuperMarioGalaxy2Adapter], max_workers: int = 1,
+                       archive: str = "", executor: Executor | None = None) -> list[ValidationIssue]:
+    """
+    Checks the texts of all messages of the given accessors using a ``TextValidator``, see there. If more than one
+    worker is specified, the accessors' texts are checked concurrently by a pool of worker processes, one batch per
+    accessor. Only the texts are sent to the workers and only the issues are sent back. Otherwise, the texts are checked
+    in this process and the accessors' cached parsed texts are reused. If an executor created by ``create_parse_pool``
+    for the same adapter is given, the texts are checked by it instead of a new pool and max_workers is ignored.
+
+    :param lms_accessors: the accessors.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param max_workers: the maximum number of worker processes. 1 or less checks the texts in this process.
+    :param archive: the archive's name or path, which is reported in the issues.
+    :param executor: the shared pool of worker processes, if any.
+    :return: the issues in order of the accessors, their messages and the positions in the texts.
+    """
+    if len(lms_accessors) <= 1 or (executor is None and max_workers <= 1):
+        validator = TextValidator(adapter)
+        results = [_validate_accessor_(lms_accessor, validator) for lms_accessor in lms_accessors]
+    else:
+        batches = [[message.text for message in lms_accessor.messages] for lms_accessor in lms_accessors]
+
+        if executor is not None:
+            results = list(executor.map(_validate_batch_, batches))
+        else:
+            with create_parse_pool(adapter, max_workers) as executor:
+                results = list(executor.map(_validate_batch_, batches))
+
+    issues = []
+
+    for lms_accessor, batch_issues in zip(lms_accessors, results):
+        for message_index, text_issue in batch_issues:
+            message = lms_accessor.messages[message_index]
+            issues.append(ValidationIssue(archive, lms_accessor, message, *text_issue))
+
+    return issues
+
+
+def _validate_accessor_(lms_accessor: LMSAccessor, validator: TextValidator) -> list[tuple[int, TextIssue]]:
+    batch_issues = []
+
+    for message_index, message in enumerate(lms_accessor.messages):
+        try:
+            parsed_text = lms_accessor.get_parsed_text(message)
+        except LMSException:
+            parsed_text = None  # Let the validator report the unclosed tag
+
+        for text_issue in validator.validate(message.text, parsed_text)[0]:
+            batch_issues.append((message_index, text_issue))
+
+    return batch_issues
+
+
+_worker_validator_: TextValidator | None = None
+
+
+def _validate_batch_(texts: list[str]) -> list[tuple[int, TextIssue]]:
+    global _worker_validator_
+
+    # Every worker process builds its validator once, from the adapter that the pool was created with
+    if _worker_validator_ is None:
+        _worker_validator_ = TextValidator(get_worker_adapter())
+
+    batch_issues = []
+
+    for message_index, text in enumerate(texts):
+        for text_issue in _worker_validator_.validate(text)[0]:
+            batch_issues.append((message_index, text_issue))
+
+    return batch_issues
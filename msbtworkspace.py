@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Generator
+
+from natsort import natsorted
+from pyjkernel import JKRArchive, JKRCompression
+from adapter_smg2 import SuperMarioGalaxy2Adapter
+from msbtaccess import LMSAccessor, load_lms_accessors, create_parse_pool
+from archiveio import read_archive_file, pack_archive, compress_archive_buffer, write_file_atomic
+from archiveio import DEFAULT_COMPRESSION_LEVEL
+
+__all__ = ["WorkspaceArchive", "find_workspace_archives", "load_workspace_archives", "save_workspace_archives"]
+
+
+class WorkspaceArchive:
+    """
+    An archive file that belongs to a workspace, together with its text files. A workspace is a folder of archive files
+    that are edited at the same time, such as the message archives of all languages.
+    """
+    def __init__(self, arc_path: str, archive: JKRArchive, lms_accessors: list[LMSAccessor]):
+        self.arc_path: str = arc_path
+        self.archive: JKRArchive = archive
+        self.lms_accessors: list[LMSAccessor] = lms_accessors
+        self._modified_: bool = False  # True if the archive changed in a way that no accessor knows about
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.arc_path)
+
+    @property
+    def is_modified(self) -> bool:
+        """True if the archive or any of its text files need to be saved."""
+        return self._modified_ or any(lms_accessor.is_modified for lms_accessor in self.lms_accessors)
+
+    def mark_modified(self):
+        """
+        Marks the archive as modified. This is only needed for changes that don't modify any of the current accessors,
+        such as removing a text file.
+        """
+        self._modified_ = True
+
+    def mark_saved(self):
+        """Marks the archive as saved. The accessors keep track of this by themselves when they are saved."""
+        self._modified_ = False
+
+    def pack(self) -> bytes:
+        """
+        Encodes all modified text files and packs the archive into an uncompressed buffer.
+
+        :return: the packed archive.
+        """
+        for lms_accessor in self.lms_accessors:
+            lms_accessor.save()
+
+        return pack_archive(self.archive)
+
+
+def find_workspace_archives(directory: str) -> list[str]:
+    """
+    Lists the ARC and RARC files in the specified folder in natural order. Subfolders are not searched.
+
+    :param directory: the workspace folder.
+    :return: the paths of the archive files.
+    """
+    arc_paths = []
+
+    for file_name in os.listdir(directory):
+        file_path = os.path.join(directory, file_name)
+
+        if file_name.lower().endswith((".arc", ".rarc")) and os.path.isfile(file_path):
+            arc_paths.append(file_path)
+
+    return natsorted(arc_paths)
+
+
+def load_workspace_archives(arc_paths: list[str], adapter: type[SuperMarioGalaxy2Adapter], max_workers: int = 1,
+                            lazy: bool = False, reuse_binary: bool = False
+                            ) -> Generator[tuple[str, WorkspaceArchive | Exception], None, None]:
+    """
+    Reads the specified archive files and their text files. Up to max_workers archives are read at the same time, and
+    the text files of all archives are parsed by one shared pool of max_workers processes, so that the pool stays busy
+    until the last archive is done. Every archive is yielded together with its path as soon as it is loaded, which is
+    not necessarily the order of the given paths. If an archive can't be loaded, the exception is yielded instead and
+    the remaining archives are still loaded. If the generator is closed early, archives that did not start loading yet
+    are skipped. See ``load_lms_accessors`` for lazy and reuse_binary.
+
+    :param arc_paths: the archive files.
+    :param adapter: the adapter maker used to construct the game-specific adapter.
+    :param max_workers: the maximum number of archives loaded at once and of worker processes.
+    :param lazy: True if the accessors should parse their files on first access.
+    :param reuse_binary: True if untouched messages should be copied from the original MSBT files when saving.
+    :return: a generator of archive paths and their loaded archives or exceptions.
+    """
+    max_workers = max(max_workers, 1)
+    parse_pool = create_parse_pool(adapter, max_workers) if max_workers > 1 and not lazy else None
+    executor = ThreadPoolExecutor(max_workers)
+
+    try:
+        futures = {}
+
+        for arc_path in arc_paths:
+            future = executor.submit(_load_workspace_archive_, arc_path, adapter, lazy, reuse_binary, parse_pool)
+            futures[future] = arc_path
+
+        for future in as_completed(futures):
+            yield futures[future], _get_result_or_exception_(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+
+        executor.shutdown()
+
+
+def save_workspace_archives(workspace_archives: list[WorkspaceArchive], compression: JKRCompression,
+                            level: str = DEFAULT_COMPRESSION_LEVEL, max_workers: int = 1
+                            ) -> Generator[tuple[WorkspaceArchive, Exception | None], None, None]:
+    """
+    Encodes, packs, compresses and writes the specified archives using ``write_file_atomic``. The text files are encoded
+    in the calling thread one archive after another. Meanwhile, the archives that are already packed are compressed by
+    one shared pool of max_workers processes and written by up to max_workers threads. Every archive is yielded as soon
+    as it was written or failed, together with the exception if there was one. Successfully written archives are marked
+    as saved, failed archives stay modified. If the generator is closed early, archives that were not packed yet are not
+    written, and archives that were packed but not reported as written stay modified.
+
+    :param workspace_archives: the archives to be saved.
+    :param compression: the compression format.
+    :param level: the SZS compression level.
+    :param max_workers: the maximum number of archives compressed and written at once.
+    :return: a generator of the archives and the exceptions that occurred while saving them.
+    """
+    max_workers = max(max_workers, 1)
+    use_pool = max_workers > 1 and compression != JKRCompression.NONE and len(workspace_archives) > 1
+    compress_pool = None
+    executor = ThreadPoolExecutor(max_workers)
+    futures: dict[Future, WorkspaceArchive] = {}  # Archives that were packed but not reported yet
+
+    # Spawn the workers instead of forking them, since the editor saves from a background thread
+    if use_pool:
+        compress_pool = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    try:
+        for workspace_archive in workspace_archives:
+            try:
+                buffer = workspace_archive.pack()
+            except Exception as e:
+                workspace_archive.mark_modified()
+                yield workspace_archive, e
+                continue
+
+            future = executor.submit(_write_workspace_archive_, workspace_archive.arc_path, buffer, compression, level,
+                                     compress_pool)
+            futures[future] = workspace_archive
+
+            # Report archives that are done while the next ones are still being encoded
+            for done_future in [f for f in futures if f.done()]:
+                yield _finish_saving_(futures.pop(done_future), done_future)
+
+        for done_future in as_completed(list(futures)):
+            yield _finish_saving_(futures.pop(done_future), done_future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        # The accessors were already saved when packing, so archives whose writes were skipped or not reported because
+        # the generator was closed early have to be saved again next time
+        for workspace_archive in futures.values():
+            workspace_archive.mark_modified()
+
+        if compress_pool is not None:
+            compress_pool.shutdown(cancel_futures=True)
+
+        executor.shutdown()
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Helpers for the worker threads
+
+def _load_workspace_archive_(arc_path: str, adapter: type[SuperMarioGalaxy2Adapter], lazy: bool, reuse_binary: bool,
+                             parse_pool: ProcessPoolExecutor | None) -> WorkspaceArchive:
+    archive = read_archive_file(arc_path)
+    lms_accessors = load_lms_accessors(archive, adapter, lazy=lazy, reuse_binary=reuse_binary, executor=parse_pool)
+    return WorkspaceArchive(arc_path, archive, lms_accessors)
+
+
+def _write_workspace_archive_(arc_path: str, buffer: bytes, compression: JKRCompression, level: str,
+                              compress_pool: ProcessPoolExecutor | None):
+    if compress_pool is not None:
+        buffer = compress_pool.submit(compress_archive_buffer, buffer, compression, level).result()
+    else:
+        buffer = compress_archive_buffer(buffer, compression, level)
+
+    write_file_atomic(arc_path, buffer)
+
+
+def _finish_saving_(workspace_archive: WorkspaceArchive, future: Future) -> tuple[WorkspaceArchive, Exception | None]:
+    exception = future.exception()
+
+    # The accessors were already saved when packing, so make sure a failed archive is saved again next time
+    if exception is None:
+        workspace_archive.mark_saved()
+    else:
+        workspace_archive.mark_modified()
+
+    return workspace_archive, exception
+
+
+def _get_result_or_exception_(future: Future):
+    try:
+        return future.result()
+    except Exception as e:
+        return e